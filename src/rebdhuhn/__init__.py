@@ -2,6 +2,7 @@
 contains the conversion logic
 """
 
+from rebdhuhn.batch_conversion import EbdConversionResult, convert_tables_to_graphs
 from rebdhuhn.graph_conversion import convert_table_to_digraph, convert_table_to_graph
 from rebdhuhn.graphviz import convert_dot_to_svg_kroki, convert_graph_to_dot
 from rebdhuhn.plantuml import convert_graph_to_plantuml, convert_plantuml_to_svg_kroki
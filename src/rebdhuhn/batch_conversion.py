@@ -0,0 +1,101 @@
+"""
+This module contains logic to convert many EbdTables at once (e.g. all EBDs of one format version).
+The conversions are independent of each other and run in parallel on a (process) pool.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, List, Optional
+
+import attrs
+
+from rebdhuhn.graph_conversion import convert_table_to_graph
+from rebdhuhn.graphviz import convert_graph_to_dot
+from rebdhuhn.models import EbdGraph, EbdTable
+from rebdhuhn.plantuml import convert_graph_to_plantuml
+
+
+# pylint:disable=too-few-public-methods
+@attrs.define(auto_attribs=True, kw_only=True)
+class EbdConversionResult:
+    """
+    The result of converting a single EbdTable in a batch.
+    If anything went wrong, the error is stored in `error` instead of being raised.
+    """
+
+    ebd_code: str = attrs.field(validator=attrs.validators.instance_of(str))
+    """
+    ID of the converted EBD; e.g. 'E_0053'
+    """
+    graph: Optional[EbdGraph] = attrs.field(
+        validator=attrs.validators.optional(attrs.validators.instance_of(EbdGraph)), default=None
+    )
+    """
+    the converted graph; None if the table could not be converted
+    """
+    dot_code: Optional[str] = attrs.field(
+        validator=attrs.validators.optional(attrs.validators.instance_of(str)), default=None
+    )
+    """
+    the dot code of the graph; None if it has not been requested or could not be created
+    """
+    plantuml_code: Optional[str] = attrs.field(
+        validator=attrs.validators.optional(attrs.validators.instance_of(str)), default=None
+    )
+    """
+    the plantuml code of the graph; None if it has not been requested or could not be created
+    """
+    error: Optional[Exception] = attrs.field(
+        validator=attrs.validators.optional(attrs.validators.instance_of(Exception)), default=None
+    )
+    """
+    the error that occurred during the conversion (e.g. an OutcomeCodeAmbiguousError); None if there was none
+    """
+
+    def is_successful(self) -> bool:
+        """
+        returns true iff all requested conversions succeeded
+        """
+        return self.error is None
+
+
+def _convert_single_table(table: EbdTable, convert_to_dot: bool, convert_to_plantuml: bool) -> EbdConversionResult:
+    """
+    Converts a single table and captures all errors in the result. This function runs inside the worker processes.
+    """
+    result = EbdConversionResult(ebd_code=table.metadata.ebd_code)
+    # pylint:disable=broad-exception-caught
+    # a single broken table must not abort the entire batch
+    try:
+        result.graph = convert_table_to_graph(table)
+        # both renderers share the analysis of the graph that is cached on the EbdGraph
+        if convert_to_dot:
+            result.dot_code = convert_graph_to_dot(result.graph)
+        if convert_to_plantuml:
+            result.plantuml_code = convert_graph_to_plantuml(result.graph)
+    except Exception as error:
+        result.error = error
+    return result
+
+
+# pylint:disable=too-many-arguments
+def convert_tables_to_graphs(
+    tables: Iterable[EbdTable],
+    convert_to_dot: bool = False,
+    convert_to_plantuml: bool = False,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    chunksize: int = 1,
+) -> List[EbdConversionResult]:
+    """
+    Converts all the given tables into graphs and (optionally) into dot and/or plantuml code.
+    The conversions run on a process pool with `max_workers` processes (defaults to the number of CPUs).
+    Alternatively you may pass your own `executor`; it is not shut down by this function.
+    The results are returned in the same order as the tables. Errors are not raised but stored in the respective
+    result, so that a single broken table does not abort the entire batch.
+    """
+    convert = partial(_convert_single_table, convert_to_dot=convert_to_dot, convert_to_plantuml=convert_to_plantuml)
+    if executor is not None:
+        return list(executor.map(convert, tables, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=max_workers) as process_pool:
+        return list(process_pool.map(convert, tables, chunksize=chunksize))
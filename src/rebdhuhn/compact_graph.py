@@ -0,0 +1,275 @@
+"""
+This module contains an array based representation of EbdGraphs.
+EBD graphs are tiny and very regular: every decision node has exactly one yes- and one no-successor, all other nodes
+(except the start node) have no successors at all. Instead of a networkx dict-of-dicts with an attrs edge object per
+edge, the `CompactEbdGraph` stores integer node ids, a byte array with the kind of each node and two successor arrays.
+It can be converted from and to the networkx graph of an EbdGraph without loss.
+"""
+
+from array import array
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from networkx import DiGraph  # type:ignore[import]
+
+from rebdhuhn.graph_conversion import SUB_ROW_RESULT_CODES_FIELD
+from rebdhuhn.models import (
+    DecisionNode,
+    EbdGraph,
+    EbdGraphEdge,
+    EbdGraphNode,
+    EndNode,
+    OutcomeNode,
+    StartNode,
+    ToNoEdge,
+    ToYesEdge,
+    create_trusted,
+)
+from rebdhuhn.models.errors import NotExactlyTwoOutgoingEdgesError
+
+NO_SUCCESSOR = -1
+"""
+marks a missing successor in the successor arrays
+"""
+
+
+class NodeKind(IntEnum):
+    """
+    The kind of a node in a CompactEbdGraph (as stored in the byte array `CompactEbdGraph.kinds`)
+    """
+
+    START = 0
+    DECISION = 1
+    OUTCOME = 2
+    END = 3
+
+
+_NODE_KINDS: Dict[type, NodeKind] = {
+    StartNode: NodeKind.START,
+    DecisionNode: NodeKind.DECISION,
+    OutcomeNode: NodeKind.OUTCOME,
+    EndNode: NodeKind.END,
+}
+
+
+# pylint:disable=too-many-instance-attributes
+class CompactEbdGraph:
+    """
+    An array based representation of the networkx graph of an EbdGraph.
+    The nodes are identified by their index (in the order of the networkx graph). For each node `i`:
+    - `keys[i]` is the key of the node and `nodes[i]` the node itself,
+    - `kinds[i]` is its `NodeKind`,
+    - `yes_successors[i]` and `no_successors[i]` are the indices of the targets of its yes- and no-edge
+      (or `NO_SUCCESSOR` if there is no such edge, which is always the case for non-decision nodes),
+    - `in_degrees[i]` is the number of edges pointing to the node.
+    The start node is connected to `start_successor` by a plain edge.
+    The sub rows that have a result code as well as a subsequent step (see `SUB_ROW_RESULT_CODES_FIELD`) are stored in
+    `sub_row_successors`, keyed by (decision node, answer).
+    Use `from_digraph` to create an instance; the arrays are not meant to be modified afterwards.
+    """
+
+    __slots__ = (
+        "keys",
+        "nodes",
+        "kinds",
+        "yes_successors",
+        "no_successors",
+        "in_degrees",
+        "start",
+        "start_successor",
+        "incomplete_decision_nodes",
+        "sub_row_successors",
+        "_indices",
+        "_yes_first",
+        "_edge_notes",
+    )
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self.nodes: List[EbdGraphNode] = []
+        self.kinds = bytearray()
+        self.yes_successors = array("i")
+        self.no_successors = array("i")
+        self.in_degrees = array("i")
+        self.start: int = NO_SUCCESSOR  #: the index of the start node
+        self.start_successor: int = NO_SUCCESSOR  #: the index of the node the start node points to
+        #: the indices of the decision nodes that do not have both a yes- and a no-edge (determined by `from_digraph`)
+        self.incomplete_decision_nodes: List[int] = []
+        #: the successor and the outcome (or NO_SUCCESSOR) for the answers ("ja" = True) of the decision nodes whose
+        #: edges carry sub row result codes; both answers are contained, even if networkx only holds one edge for them
+        self.sub_row_successors: Dict[Tuple[int, bool], Tuple[int, int]] = {}
+        self._indices: Dict[str, int] = {}
+        # whether the yes-edge of a decision node precedes its no-edge in the networkx graph (to keep the edge order)
+        self._yes_first = bytearray()
+        # the (rarely used) notes of edges; keyed by the indices of source and target
+        self._edge_notes: Dict[Tuple[int, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._indices
+
+    def get_index(self, key: str) -> int:
+        """
+        returns the index of the node with the given key
+        """
+        return self._indices[key]
+
+    def get_kind(self, key: str) -> NodeKind:
+        """
+        returns the kind of the node with the given key
+        """
+        return NodeKind(self.kinds[self._indices[key]])
+
+    def get_out_degree(self, index: int) -> int:
+        """
+        returns the number of outgoing edges of the node with the given index
+        """
+        if index == self.start:
+            return 0 if self.start_successor == NO_SUCCESSOR else 1
+        return (self.yes_successors[index] != NO_SUCCESSOR) + (self.no_successors[index] != NO_SUCCESSOR)
+
+    def get_successors(self, index: int) -> List[int]:
+        """
+        returns the indices of the targets of all outgoing edges of the given node (in the order of the networkx graph)
+        """
+        if index == self.start:
+            return [] if self.start_successor == NO_SUCCESSOR else [self.start_successor]
+        yes_successor = self.yes_successors[index]
+        no_successor = self.no_successors[index]
+        successors = [yes_successor, no_successor] if self._yes_first[index] else [no_successor, yes_successor]
+        return [successor for successor in successors if successor != NO_SUCCESSOR]
+
+    def get_edge(self, source: int, target: int) -> EbdGraphEdge:
+        """
+        (re-)creates the edge object between the two given nodes
+        """
+        note = self._edge_notes.get((source, target))
+        if source == self.start and target == self.start_successor:
+            return EbdGraphEdge(source=self.nodes[source], target=self.nodes[target], note=note)
+        if self.yes_successors[source] == target:
+            return create_trusted(ToYesEdge, source=self.nodes[source], target=self.nodes[target], note=note)
+        if self.no_successors[source] == target:
+            return create_trusted(ToNoEdge, source=self.nodes[source], target=self.nodes[target], note=note)
+        raise KeyError(f"There is no edge from '{self.keys[source]}' to '{self.keys[target]}'")
+
+    def get_edge_note(self, source: int, target: int) -> Optional[str]:
+        """
+        returns the note of the edge between the two given nodes (without creating the edge object)
+        """
+        return self._edge_notes.get((source, target))
+
+    def get_edges(self) -> Iterator[Tuple[int, int]]:
+        """
+        yields the (source, target) indices of all edges in the same order as the edges of the networkx graph
+        """
+        for index in range(len(self.keys)):
+            for successor in self.get_successors(index):
+                yield index, successor
+
+    def _add_node(self, key: str, node: EbdGraphNode) -> None:
+        node_kind = _NODE_KINDS.get(type(node))
+        if node_kind is None:
+            raise ValueError(f"Unknown node type: {node}")
+        if node_kind == NodeKind.START:
+            if self.start != NO_SUCCESSOR:
+                raise ValueError("The graph must not contain more than one start node")
+            self.start = len(self.keys)
+        self._indices[key] = len(self.keys)
+        self.keys.append(key)
+        self.nodes.append(node)
+        self.kinds.append(node_kind)
+        self.yes_successors.append(NO_SUCCESSOR)
+        self.no_successors.append(NO_SUCCESSOR)
+        self.in_degrees.append(0)
+        self._yes_first.append(1)
+
+    def _add_edge(self, source: int, target: int, edge: EbdGraphEdge) -> None:
+        if source == self.start:
+            if self.start_successor != NO_SUCCESSOR:
+                raise ValueError("The start node must not have more than one outgoing edge")
+            self.start_successor = target
+        elif self.kinds[source] != NodeKind.DECISION:
+            raise ValueError(f"Only decision nodes may have outgoing edges, but '{self.keys[source]}' has one")
+        elif isinstance(edge, ToYesEdge) and self.yes_successors[source] == NO_SUCCESSOR:
+            self.yes_successors[source] = target
+            self._yes_first[source] = self.no_successors[source] == NO_SUCCESSOR
+        elif isinstance(edge, ToNoEdge) and self.no_successors[source] == NO_SUCCESSOR:
+            self.no_successors[source] = target
+            self._yes_first[source] = self.yes_successors[source] != NO_SUCCESSOR
+        else:
+            raise ValueError(f"The decision node '{self.keys[source]}' must only have one yes- and one no-edge")
+        self.in_degrees[target] += 1
+        if edge.note is not None:
+            self._edge_notes[(source, target)] = edge.note
+
+    @classmethod
+    def from_digraph(cls, graph: DiGraph) -> "CompactEbdGraph":
+        """
+        Creates the compact representation of the given networkx graph (i.e. `EbdGraph.graph`).
+        Raises a ValueError if the graph does not have the structure of an EBD graph (which is always the case for
+        graphs created by `convert_table_to_graph`).
+        """
+        result = cls()
+        for key, node in graph.nodes(data="node"):
+            result._add_node(key, node)
+        if result.start == NO_SUCCESSOR:
+            raise ValueError("The graph has no start node")
+        for source_key, target_key, edge_data in graph.edges(data=True):
+            source, target = result._indices[source_key], result._indices[target_key]
+            result._add_edge(source, target, edge_data["edge"])
+            for answer, result_code in edge_data.get(SUB_ROW_RESULT_CODES_FIELD, {}).items():
+                if result_code is not None and result_code not in result._indices:
+                    raise ValueError(f"The result code '{result_code}' of an edge of '{source_key}' is not a node")
+                outcome = NO_SUCCESSOR if result_code is None else result._indices[result_code]
+                result.sub_row_successors[(source, answer)] = (target, outcome)
+        result.incomplete_decision_nodes = [
+            index
+            for index, kind in enumerate(result.kinds)
+            if kind == NodeKind.DECISION and NO_SUCCESSOR in (result.yes_successors[index], result.no_successors[index])
+        ]
+        return result
+
+    def check_decision_nodes(self, incomplete_decision_nodes: Optional[Sequence[int]] = None) -> None:
+        """
+        Raises a NotExactlyTwoOutgoingEdgesError for the first decision node that does not have both a yes- and a
+        no-edge. Consumers that rely on both edges (like the plantuml renderer) should call this before they start.
+        Consumers that complete some of the nodes themselves (see `sub_row_successors`) pass the remaining ones.
+        """
+        if incomplete_decision_nodes is None:
+            incomplete_decision_nodes = self.incomplete_decision_nodes
+        if not incomplete_decision_nodes:
+            return
+        node = incomplete_decision_nodes[0]
+        raise NotExactlyTwoOutgoingEdgesError(
+            f"A decision node must have exactly two outgoing edges (yes / no) but has {self.get_out_degree(node)}",
+            str(self.nodes[node]),
+            [str({"edge": self.get_edge(node, successor)}) for successor in self.get_successors(node)],
+        )
+
+    def to_digraph(self) -> DiGraph:
+        """
+        Converts the compact representation back to a networkx graph (with the same node and edge order).
+        The nodes are shared with the compact graph, the edge objects are created anew (but are equal to the original
+        ones).
+        """
+        result: DiGraph = DiGraph()
+        result.add_nodes_from((key, {"node": node}) for key, node in zip(self.keys, self.nodes))
+        result.add_edges_from(
+            (self.keys[source], self.keys[target], {"edge": self.get_edge(source, target)})
+            for source, target in self.get_edges()
+        )
+        for (source, answer), (target, outcome) in self.sub_row_successors.items():
+            edge_data = result[self.keys[source]][self.keys[target]]
+            edge_data.setdefault(SUB_ROW_RESULT_CODES_FIELD, {})[answer] = (
+                None if outcome == NO_SUCCESSOR else self.keys[outcome]
+            )
+        return result
+
+
+def get_compact_graph(ebd_graph: EbdGraph) -> CompactEbdGraph:
+    """
+    Returns the compact representation of the graph of the given EbdGraph. It is cached on the EbdGraph.
+    """
+    return ebd_graph.get_derived_data("compact_graph", lambda: CompactEbdGraph.from_digraph(ebd_graph.graph))
@@ -0,0 +1,318 @@
+"""
+This module contains a memory efficient container for many EbdTables (e.g. all EBDs of several format versions).
+Instead of keeping millions of small attrs objects alive, the content of the tables is stored column-wise in flat
+arrays. All strings are stored only once in a common string pool. The EbdTables (and EbdGraphs) are only created when
+they are accessed.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from rebdhuhn.graph_conversion import convert_table_to_graph
+from rebdhuhn.models import (
+    EbdCheckResult,
+    EbdGraph,
+    EbdTable,
+    EbdTableMetaData,
+    EbdTableRow,
+    EbdTableSubRow,
+    create_trusted,
+)
+from rebdhuhn.models.ebd_table import MultiStepInstruction
+
+_NO_STRING = -1  #: the id that is used to store None instead of a string
+
+
+class StringPool:
+    """
+    Stores every distinct string only once and maps it to an integer id.
+    """
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def get_id(self, string: Optional[str]) -> int:
+        """
+        returns the id of the given string (which is added to the pool if necessary)
+        """
+        if string is None:
+            return _NO_STRING
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self._string_ids[string] = string_id
+        return string_id
+
+    def get_string(self, string_id: int) -> Optional[str]:
+        """
+        returns the string with the given id
+        """
+        if string_id == _NO_STRING:
+            return None
+        return self.strings[string_id]
+
+
+def _create_offsets() -> "array[int]":
+    return array("i", [0])
+
+
+# pylint:disable=too-many-instance-attributes
+class EbdTableCorpus:
+    """
+    A column-wise store for many EbdTables.
+    Every table, row, sub row, use case and multi step instruction is stored as an entry in flat arrays; offset arrays
+    map tables to their rows (and instructions), rows to their sub rows (and use cases).
+    The tables are identified by their EBD code, which has to be unique within the corpus. If you'd like to keep
+    multiple format versions, use one corpus per format version (they can share a string pool, see `__init__`).
+    """
+
+    def __init__(self, tables: Optional[Iterable[EbdTable]] = None, string_pool: Optional[StringPool] = None):
+        """
+        Creates a new corpus and adds the given tables.
+        Corpora that are created with the same `string_pool` share it, so that strings that occur in both corpora
+        (e.g. in two format versions) are stored only once.
+        """
+        self.string_pool = string_pool if string_pool is not None else StringPool()
+        self._table_index_by_ebd_code: Dict[str, int] = {}
+        # per table
+        self._table_ebd_codes = array("i")
+        self._table_chapters = array("i")
+        self._table_sub_chapters = array("i")
+        self._table_roles = array("i")
+        self._table_row_offsets = _create_offsets()
+        self._table_instruction_offsets = _create_offsets()
+        # per multi step instruction
+        self._instruction_first_step_numbers = array("i")
+        self._instruction_texts = array("i")
+        # per row
+        self._row_step_numbers = array("i")
+        self._row_descriptions = array("i")
+        self._row_sub_row_offsets = _create_offsets()
+        self._row_use_case_offsets = _create_offsets()
+        # per use case
+        self._use_cases = array("i")
+        # per sub row
+        self._sub_row_results = bytearray()
+        self._sub_row_subsequent_step_numbers = array("i")
+        self._sub_row_result_codes = array("i")
+        self._sub_row_notes = array("i")
+        if tables is not None:
+            self.extend(tables)
+
+    def __len__(self) -> int:
+        return len(self._table_ebd_codes)
+
+    def __contains__(self, ebd_code: object) -> bool:
+        return ebd_code in self._table_index_by_ebd_code
+
+    def __iter__(self) -> Iterator[EbdTable]:
+        for table_index in range(len(self)):
+            yield self.get_table(table_index)
+
+    @property
+    def ebd_codes(self) -> List[str]:
+        """
+        the EBD codes of all tables in the order in which they have been added
+        """
+        return list(self._table_index_by_ebd_code.keys())
+
+    def add(self, table: EbdTable) -> None:
+        """
+        Adds a single table to the corpus.
+        """
+        if table.metadata.ebd_code in self._table_index_by_ebd_code:
+            raise ValueError(f"The corpus already contains a table with the EBD code '{table.metadata.ebd_code}'")
+        for row in table.rows:
+            self._row_step_numbers.append(self.string_pool.get_id(row.step_number))
+            self._row_descriptions.append(self.string_pool.get_id(row.description))
+            for sub_row in row.sub_rows:
+                self._sub_row_results.append(sub_row.check_result.result)
+                self._sub_row_subsequent_step_numbers.append(
+                    self.string_pool.get_id(sub_row.check_result.subsequent_step_number)
+                )
+                self._sub_row_result_codes.append(self.string_pool.get_id(sub_row.result_code))
+                self._sub_row_notes.append(self.string_pool.get_id(sub_row.note))
+            self._row_sub_row_offsets.append(len(self._sub_row_results))
+            # use_cases=None is stored as an empty range (an actual list of use cases is never empty)
+            self._use_cases.extend(self.string_pool.get_id(use_case) for use_case in row.use_cases or [])
+            self._row_use_case_offsets.append(len(self._use_cases))
+        self._table_row_offsets.append(len(self._row_step_numbers))
+        for instruction in table.multi_step_instructions or []:
+            self._instruction_first_step_numbers.append(self.string_pool.get_id(instruction.first_step_number_affected))
+            self._instruction_texts.append(self.string_pool.get_id(instruction.instruction_text))
+        self._table_instruction_offsets.append(len(self._instruction_texts))
+        self._table_ebd_codes.append(self.string_pool.get_id(table.metadata.ebd_code))
+        self._table_chapters.append(self.string_pool.get_id(table.metadata.chapter))
+        self._table_sub_chapters.append(self.string_pool.get_id(table.metadata.sub_chapter))
+        self._table_roles.append(self.string_pool.get_id(table.metadata.role))
+        self._table_index_by_ebd_code[table.metadata.ebd_code] = len(self._table_ebd_codes) - 1
+
+    def extend(self, tables: Iterable[EbdTable]) -> None:
+        """
+        Adds all the given tables to the corpus.
+        """
+        for table in tables:
+            self.add(table)
+
+    def _get_table_index(self, key: Union[int, str]) -> int:
+        if isinstance(key, str):
+            return self._table_index_by_ebd_code[key]
+        if not -len(self) <= key < len(self):
+            raise IndexError(f"There is no table with index {key}")
+        return key % len(self)
+
+    def _create_sub_row(self, sub_row_index: int) -> EbdTableSubRow:
+        return create_trusted(
+            EbdTableSubRow,
+            check_result=create_trusted(
+                EbdCheckResult,
+                result=bool(self._sub_row_results[sub_row_index]),
+                subsequent_step_number=self.string_pool.get_string(
+                    self._sub_row_subsequent_step_numbers[sub_row_index]
+                ),
+            ),
+            result_code=self.string_pool.get_string(self._sub_row_result_codes[sub_row_index]),
+            note=self.string_pool.get_string(self._sub_row_notes[sub_row_index]),
+        )
+
+    def _create_row(self, row_index: int) -> EbdTableRow:
+        use_cases: Optional[List[str]] = [
+            self.string_pool.strings[use_case]
+            for use_case in self._use_cases[
+                self._row_use_case_offsets[row_index] : self._row_use_case_offsets[row_index + 1]
+            ]
+        ]
+        return create_trusted(
+            EbdTableRow,
+            step_number=self.string_pool.strings[self._row_step_numbers[row_index]],
+            description=self.string_pool.strings[self._row_descriptions[row_index]],
+            sub_rows=[
+                self._create_sub_row(sub_row_index)
+                for sub_row_index in range(
+                    self._row_sub_row_offsets[row_index], self._row_sub_row_offsets[row_index + 1]
+                )
+            ],
+            use_cases=use_cases or None,
+        )
+
+    def get_table(self, key: Union[int, str]) -> EbdTable:
+        """
+        Creates the EbdTable with the given EBD code (or index).
+        The table has been validated when it was added to the corpus, so the validators are skipped here.
+        """
+        table_index = self._get_table_index(key)
+        multi_step_instructions: Optional[List[MultiStepInstruction]] = [
+            create_trusted(
+                MultiStepInstruction,
+                first_step_number_affected=self.string_pool.strings[
+                    self._instruction_first_step_numbers[instruction_index]
+                ],
+                instruction_text=self.string_pool.strings[self._instruction_texts[instruction_index]],
+            )
+            for instruction_index in range(
+                self._table_instruction_offsets[table_index], self._table_instruction_offsets[table_index + 1]
+            )
+        ]
+        return create_trusted(
+            EbdTable,
+            metadata=create_trusted(
+                EbdTableMetaData,
+                ebd_code=self.string_pool.strings[self._table_ebd_codes[table_index]],
+                chapter=self.string_pool.strings[self._table_chapters[table_index]],
+                sub_chapter=self.string_pool.strings[self._table_sub_chapters[table_index]],
+                role=self.string_pool.strings[self._table_roles[table_index]],
+            ),
+            rows=[
+                self._create_row(row_index)
+                for row_index in range(self._table_row_offsets[table_index], self._table_row_offsets[table_index + 1])
+            ],
+            multi_step_instructions=multi_step_instructions or None,
+        )
+
+    def __getitem__(self, key: Union[int, str]) -> EbdTable:
+        return self.get_table(key)
+
+    def get_graph(self, key: Union[int, str], lazy: bool = False) -> EbdGraph:
+        """
+        Creates the EbdGraph for the table with the given EBD code (or index).
+        If lazy is True, the networkx graph is only built on the first access (see `convert_table_to_graph`).
+        """
+        return convert_table_to_graph(self.get_table(key), lazy=lazy)
+
+    def to_arrow(self) -> Any:
+        """
+        Exports the corpus as a pyarrow.Table with one row per EBD. The rows, sub rows, use cases and multi step
+        instructions are nested list columns; all strings are dictionary encoded.
+        Requires pyarrow (pip install rebdhuhn[arrow]).
+        """
+        try:
+            # pylint:disable=import-outside-toplevel
+            import pyarrow  # type:ignore[import]
+            import pyarrow.compute  # type:ignore[import] # pylint:disable=unused-import
+        except ImportError as import_error:
+            raise ImportError("The arrow export requires pyarrow: pip install rebdhuhn[arrow]") from import_error
+
+        # all string columns share the same dictionary (the string pool); None is stored as a masked index
+        dictionary = pyarrow.array(self.string_pool.strings, type=pyarrow.string())
+
+        def to_string_array(string_ids: "array[int]") -> Any:
+            indices = pyarrow.array(string_ids, type=pyarrow.int32())
+            # pylint:disable=no-member
+            indices = pyarrow.compute.if_else(pyarrow.compute.equal(indices, _NO_STRING), None, indices)
+            return pyarrow.DictionaryArray.from_arrays(indices, dictionary)
+
+        def to_list_array(offsets: "array[int]", values: Any) -> Any:
+            return pyarrow.ListArray.from_arrays(pyarrow.array(offsets, type=pyarrow.int32()), values)
+
+        sub_rows = pyarrow.StructArray.from_arrays(
+            [
+                pyarrow.array(self._sub_row_results, type=pyarrow.uint8()).cast(pyarrow.bool_()),
+                to_string_array(self._sub_row_subsequent_step_numbers),
+                to_string_array(self._sub_row_result_codes),
+                to_string_array(self._sub_row_notes),
+            ],
+            names=["result", "subsequent_step_number", "result_code", "note"],
+        )
+        rows = pyarrow.StructArray.from_arrays(
+            [
+                to_string_array(self._row_step_numbers),
+                to_string_array(self._row_descriptions),
+                to_list_array(self._row_sub_row_offsets, sub_rows),
+                to_list_array(self._row_use_case_offsets, to_string_array(self._use_cases)),
+            ],
+            names=["step_number", "description", "sub_rows", "use_cases"],
+        )
+        instructions = pyarrow.StructArray.from_arrays(
+            [
+                to_string_array(self._instruction_first_step_numbers),
+                to_string_array(self._instruction_texts),
+            ],
+            names=["first_step_number_affected", "instruction_text"],
+        )
+        return pyarrow.Table.from_arrays(
+            [
+                to_string_array(self._table_ebd_codes),
+                to_string_array(self._table_chapters),
+                to_string_array(self._table_sub_chapters),
+                to_string_array(self._table_roles),
+                to_list_array(self._table_row_offsets, rows),
+                to_list_array(self._table_instruction_offsets, instructions),
+            ],
+            names=["ebd_code", "chapter", "sub_chapter", "role", "rows", "multi_step_instructions"],
+        )
+
+    def to_parquet(self, path: Any) -> None:
+        """
+        Writes the corpus to a parquet file (see `to_arrow` for the schema).
+        Requires pyarrow (pip install rebdhuhn[arrow]).
+        """
+        try:
+            import pyarrow.parquet  # type:ignore[import] # pylint:disable=import-outside-toplevel
+        except ImportError as import_error:
+            raise ImportError("The parquet export requires pyarrow: pip install rebdhuhn[arrow]") from import_error
+        pyarrow.parquet.write_table(self.to_arrow(), path)
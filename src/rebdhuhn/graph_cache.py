@@ -0,0 +1,204 @@
+"""
+This module contains a content-addressed cache for the conversion of EbdTables to EbdGraphs.
+Most EBDs do not change between two runs (or even between two format versions). The cache recognizes a table by a hash
+over its entire content, so that unchanged tables do not have to be converted (and validated) again.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import attrs
+from networkx import freeze  # type:ignore[import]
+
+from rebdhuhn.graph_conversion import convert_table_to_graph
+from rebdhuhn.models import EbdGraph, EbdTable
+
+_CACHE_FORMAT_VERSION = "4"
+"""
+is part of every hash; increase it, whenever the conversion logic changes in a way that makes the cached graphs stale
+"""
+
+
+def _get_table_content(table: EbdTable) -> Tuple:
+    """
+    returns the content of the table as nested tuple of strings, booleans and Nones (which is much cheaper than
+    attrs.asdict); if a field is added to the table models, add it here and increase the _CACHE_FORMAT_VERSION
+    """
+    metadata = table.metadata
+    return (
+        (metadata.ebd_code, metadata.chapter, metadata.sub_chapter, metadata.role),
+        tuple(
+            (
+                row.step_number,
+                row.description,
+                tuple(
+                    (
+                        sub_row.check_result.result,
+                        sub_row.check_result.subsequent_step_number,
+                        sub_row.result_code,
+                        sub_row.note,
+                    )
+                    for sub_row in row.sub_rows
+                ),
+                None if row.use_cases is None else tuple(row.use_cases),
+            )
+            for row in table.rows
+        ),
+        (
+            None
+            if table.multi_step_instructions is None
+            else tuple(
+                (instruction.first_step_number_affected, instruction.instruction_text)
+                for instruction in table.multi_step_instructions
+            )
+        ),
+    )
+
+
+def get_table_hash(table: EbdTable) -> str:
+    """
+    Returns a structural hash of the given table (metadata, rows, sub rows, use cases and multi step instructions).
+    Two tables have the same hash iff they have the same content.
+    """
+    # unlike the built-in hash of a str, the json representation is the same in every process
+    table_as_json = json.dumps([_CACHE_FORMAT_VERSION, _get_table_content(table)], separators=(",", ":"))
+    return hashlib.sha256(table_as_json.encode("utf-8")).hexdigest()
+
+
+def _copy_graph(graph: EbdGraph, copy: bool) -> EbdGraph:
+    """
+    Returns a new EbdGraph for the cached graph. Its networkx graph is a copy with its own attribute dicts (so that
+    annotations of the returned graph do not end up in the cache); unless copy is True, it is frozen. The metadata and
+    the multi step instructions are copied as well; the (frozen) nodes and the edge objects are shared.
+    """
+    networkx_graph = graph.graph.copy()
+    if not copy:
+        networkx_graph = freeze(networkx_graph)
+    return attrs.evolve(
+        graph,
+        metadata=attrs.evolve(graph.metadata),
+        graph=networkx_graph,
+        multi_step_instructions=(
+            None
+            if graph.multi_step_instructions is None
+            else [attrs.evolve(instruction) for instruction in graph.multi_step_instructions]
+        ),
+    )
+
+
+class EbdGraphCache:
+    """
+    A bounded (least recently used) in-memory cache for EbdGraphs with an optional on-disk tier.
+    The in-memory tier holds at most `max_size` graphs. If a `cache_dir` is given, every converted graph is also
+    pickled to this directory, so that the cache survives restarts of the process. The on-disk tier is not bounded.
+    The returned graphs are copies, so that annotations (e.g. node or graph attributes) do not corrupt the cache. By
+    default, their networkx graphs are frozen: adding or removing nodes or edges raises a NetworkXError. Pass copy=True
+    to get a graph that may be modified (e.g. by `patch_graph`). The node and edge objects are shared with the cache
+    and must not be modified (the nodes are frozen anyway).
+    """
+
+    def __init__(self, max_size: int = 512, cache_dir: Optional[Path] = None):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive but was {max_size}")
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._graphs: OrderedDict[str, EbdGraph] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0  #: number of lookups answered by the in-memory tier
+        self.disk_hits = 0  #: number of lookups answered by the on-disk tier
+        self.misses = 0  #: number of lookups that required a conversion
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def _get_file_path(self, table_hash: str) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{table_hash}.pickle"
+
+    def _read_from_disk(self, table_hash: str) -> Optional[EbdGraph]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._get_file_path(table_hash), "rb") as cache_file:
+                cached_graph = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # a missing, truncated or outdated file is just a cache miss
+            return None
+        if not isinstance(cached_graph, EbdGraph):
+            return None
+        return cached_graph
+
+    def _write_to_disk(self, table_hash: str, graph: EbdGraph) -> None:
+        if self.cache_dir is None:
+            return
+        # write to a temporary file first, so that concurrent readers never see a partially written file
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                pickle.dump(graph, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._get_file_path(table_hash))
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def _store_in_memory(self, table_hash: str, graph: EbdGraph) -> None:
+        with self._lock:
+            self._graphs[table_hash] = graph
+            self._graphs.move_to_end(table_hash)
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+
+    def _lookup(self, table_hash: str) -> Optional[EbdGraph]:
+        with self._lock:
+            cached_graph = self._graphs.get(table_hash)
+            if cached_graph is not None:
+                self._graphs.move_to_end(table_hash)
+                self.hits += 1
+                return cached_graph
+        cached_graph = self._read_from_disk(table_hash)
+        if cached_graph is not None:
+            self.disk_hits += 1
+            self._store_in_memory(table_hash, cached_graph)
+        return cached_graph
+
+    def get(self, table: EbdTable, copy: bool = False) -> Optional[EbdGraph]:
+        """
+        Returns (a copy of) the cached graph for the given table (frozen unless copy is True) or None if the table has
+        not been converted yet.
+        """
+        cached_graph = self._lookup(get_table_hash(table))
+        if cached_graph is None:
+            return None
+        return _copy_graph(cached_graph, copy)
+
+    def convert_table_to_graph(self, table: EbdTable, copy: bool = False) -> EbdGraph:
+        """
+        Returns (a copy of) the cached graph for the given table (frozen unless copy is True). The table is only
+        converted, if it is not cached yet.
+        Errors from the conversion are raised and not cached.
+        """
+        table_hash = get_table_hash(table)
+        graph = self._lookup(table_hash)
+        if graph is None:
+            self.misses += 1
+            graph = convert_table_to_graph(table)
+            self._store_in_memory(table_hash, graph)
+            self._write_to_disk(table_hash, graph)
+        return _copy_graph(graph, copy)
+
+    def clear(self) -> None:
+        """
+        Removes all graphs from the in-memory tier (the on-disk tier is kept).
+        """
+        with self._lock:
+            self._graphs.clear()
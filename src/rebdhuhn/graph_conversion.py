@@ -2,7 +2,8 @@
 This module contains logic to convert EbdTable data to EbdGraph data.
 """
 
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 
 from networkx import DiGraph  # type:ignore[import]
 
@@ -24,55 +25,95 @@ from rebdhuhn.models import (
 from rebdhuhn.models.errors import (
     EbdCrossReferenceNotSupportedError,
     EndeInWrongColumnError,
+    GraphContainsLoopError,
     OutcomeCodeAmbiguousError,
     OutcomeNodeCreationError,
+    SubsequentStepNotFoundError,
 )
+from rebdhuhn.models.trusted import create_trusted
+from rebdhuhn.node_interning import NodeInterner
+
+SUB_ROW_RESULT_CODES_FIELD = "sub_row_result_codes"
+"""
+The key of the networkx edge attribute that holds the result codes of sub rows which have a subsequent step as well.
+In EBDs that collect all answers (e.g. E_0453: 'Alle festgestellten Antworten sind anzugeben'), a sub row may give a
+result code and continue with the next step (e.g. 'A98' and step 5). The attribute maps each answer ("ja" = True) whose
+sub row leads along the edge to the result code of this sub row (or None). It is only set on edges with such a result
+code. Since a DiGraph holds only one edge per pair of nodes, it is also the only place where both answers are kept, if
+the yes- and the no-sub row lead to the same step.
+"""
+
+_EdgeTarget = Tuple[bool, str, Optional[OutcomeNode], Optional[str]]
+"""
+the check result, the key of the target node, the outcome node if the edge points to the outcome of its own sub row and
+the result code of the sub row if it has a subsequent step as well (see `_convert_row_to_nodes_and_edge_targets`)
+"""
 
 
-def _convert_sub_row_to_outcome_node(sub_row: EbdTableSubRow) -> Optional[OutcomeNode]:
+def _convert_sub_row_to_outcome_node(
+    sub_row: EbdTableSubRow, node_interner: Optional[NodeInterner] = None
+) -> Optional[OutcomeNode]:
     """
     converts a sub_row into an outcome node (or None if not applicable)
     """
     if sub_row.result_code is not None:
-        return OutcomeNode(result_code=sub_row.result_code, note=sub_row.note)
+        if node_interner is not None:
+            return node_interner.get_outcome_node(sub_row.result_code, sub_row.note)
+        # the sub row has already been validated with the same rules as the outcome node
+        return create_trusted(OutcomeNode, result_code=sub_row.result_code, note=sub_row.note)
     return None
 
 
-def _convert_row_to_decision_node(row: EbdTableRow) -> DecisionNode:
+def _convert_row_to_decision_node(row: EbdTableRow, node_interner: Optional[NodeInterner] = None) -> DecisionNode:
     """
     converts a row into a decision node
     """
-    return DecisionNode(step_number=row.step_number, question=row.description)
+    if node_interner is not None:
+        return node_interner.get_decision_node(row.step_number, row.description)
+    # the row has already been validated with the same rules as the decision node
+    return create_trusted(DecisionNode, step_number=row.step_number, question=row.description)
 
 
 def _yes_no_edge(decision: bool, source: DecisionNode, target: EbdGraphNode) -> EbdGraphEdge:
     if decision:
-        return ToYesEdge(source=source, target=target, note=None)
-    return ToNoEdge(source=source, target=target, note=None)
+        return create_trusted(ToYesEdge, source=source, target=target, note=None)
+    return create_trusted(ToNoEdge, source=source, target=target, note=None)
 
 
-def get_all_nodes(table: EbdTable) -> List[EbdGraphNode]:
+def _create_start_node(node_interner: Optional[NodeInterner]) -> StartNode:
+    if node_interner is not None:
+        return node_interner.get_start_node()
+    return StartNode()
+
+
+def _create_end_node(node_interner: Optional[NodeInterner]) -> EndNode:
+    if node_interner is not None:
+        return node_interner.get_end_node()
+    return EndNode()
+
+
+def get_all_nodes(table: EbdTable, node_interner: Optional[NodeInterner] = None) -> List[EbdGraphNode]:
     """
     Returns a list with all nodes from the table.
     Nodes may both be actual EBD check outcome codes (e.g. "A55") but also points where decisions are made.
+    If a node_interner is given, equal nodes are shared with all other graphs that are created using this interner.
     """
-    result: List[EbdGraphNode] = [StartNode()]
+    result: List[EbdGraphNode] = [_create_start_node(node_interner)]
     contains_ende = False
     for row in table.rows:
-        decision_node = _convert_row_to_decision_node(row)
+        decision_node = _convert_row_to_decision_node(row, node_interner)
         result.append(decision_node)
         for sub_row in row.sub_rows:
-            outcome_node = _convert_sub_row_to_outcome_node(sub_row)
+            outcome_node = _convert_sub_row_to_outcome_node(sub_row, node_interner)
             if outcome_node is not None:
                 result.append(outcome_node)
             if not contains_ende and sub_row.check_result.subsequent_step_number == "Ende":
                 contains_ende = True
-                result.append(EndNode())
+                result.append(_create_end_node(node_interner))
     return result
 
 
-def _get_key_and_node_with_lowest_step_number(ebd_table: EbdTable) -> tuple[str, EbdGraphNode]:
-    nodes: Dict[str, EbdGraphNode] = {node.get_key(): node for node in get_all_nodes(ebd_table)}
+def _get_key_and_node_with_lowest_step_number(nodes: Dict[str, EbdGraphNode]) -> tuple[str, EbdGraphNode]:
     first_node_after_start: EbdGraphNode
     if "1" in nodes:
         first_node_after_start = nodes["1"]
@@ -82,85 +123,206 @@ def _get_key_and_node_with_lowest_step_number(ebd_table: EbdTable) -> tuple[str,
     return str(lowest_numeric_key), nodes[str(lowest_numeric_key)]
 
 
-def get_all_edges(table: EbdTable) -> List[EbdGraphEdge]:
+def _create_sub_row_without_target_error(
+    row: EbdTableRow, sub_row: EbdTableSubRow, decision_node: DecisionNode
+) -> Union[EbdCrossReferenceNotSupportedError, EndeInWrongColumnError, OutcomeNodeCreationError]:
+    """
+    Returns the error that describes why the given sub row has neither a result code nor a subsequent step.
+    """
+    if not any(sr.result_code is not None for sr in row.sub_rows):
+        notes = [sr.note for sr in row.sub_rows if sr.note is not None]
+        if any(note.startswith("EBD ") for note in notes):
+            return EbdCrossReferenceNotSupportedError(row=row, decision_node=decision_node)
+        if any(note.lower().startswith("ende") for note in notes):
+            return EndeInWrongColumnError(row=row)
+    return OutcomeNodeCreationError(decision_node=decision_node, sub_row=sub_row)
+
+
+def _convert_row_to_nodes_and_edge_targets(
+    row: EbdTableRow, node_interner: Optional[NodeInterner] = None
+) -> Tuple[DecisionNode, List[EbdGraphNode], List[_EdgeTarget]]:
+    """
+    Converts a single row into its decision node, the outcome/end nodes of its sub rows and the targets of the
+    outgoing edges of the decision node.
+    Each edge target is a tuple of (the check result, the key of the target node, the outcome node if the edge points
+    to an outcome of this very sub row, the result code of the sub row if it has a subsequent step as well). The target
+    nodes are only referenced by key, because the row of a subsequent step may not have been converted yet.
+    """
+    decision_node = _convert_row_to_decision_node(row, node_interner)
+    nodes: List[EbdGraphNode] = []
+    edge_targets: List[_EdgeTarget] = []
+    for sub_row in row.sub_rows:
+        outcome_node: Optional[OutcomeNode] = _convert_sub_row_to_outcome_node(sub_row, node_interner)
+        if outcome_node is not None:
+            nodes.append(outcome_node)
+        subsequent_step_number = sub_row.check_result.subsequent_step_number
+        if subsequent_step_number == "Ende":
+            nodes.append(_create_end_node(node_interner))
+        if subsequent_step_number is not None:
+            edge_targets.append((sub_row.check_result.result, subsequent_step_number, None, sub_row.result_code))
+            continue
+        if outcome_node is None:
+            raise _create_sub_row_without_target_error(row, sub_row, decision_node)
+        edge_targets.append((sub_row.check_result.result, outcome_node.result_code, outcome_node, None))
+    return decision_node, nodes, edge_targets
+
+
+def _check_outcome_node_is_unambiguous(outcome_node: OutcomeNode, known_outcome_nodes: Dict[str, OutcomeNode]) -> None:
+    """
+    Raises an OutcomeCodeAmbiguousError if an outcome node with the same result code but a different note is already
+    known. Otherwise, the outcome node is added to the known outcome nodes.
+    """
+    # check for ambiguous outcome nodes, i.e. A** with different notes
+    known_outcome_node = known_outcome_nodes.get(outcome_node.result_code)
+    if known_outcome_node is not None and known_outcome_node.note != outcome_node.note:
+        raise OutcomeCodeAmbiguousError(outcome_node1=known_outcome_node, outcome_node2=outcome_node)
+    known_outcome_nodes[outcome_node.result_code] = outcome_node
+
+
+# pylint:disable=too-many-locals
+def _get_all_nodes_and_edges_with_result_codes(
+    table: EbdTable, node_interner: Optional[NodeInterner] = None
+) -> Tuple[List[EbdGraphNode], List[Tuple[EbdGraphEdge, Optional[str]]]]:
+    """
+    Like `get_all_nodes_and_edges`, but each edge comes with the result code of its sub row, if the sub row has a
+    subsequent step as well (see `SUB_ROW_RESULT_CODES_FIELD`).
+    """
+    nodes: Dict[str, EbdGraphNode] = {"Start": _create_start_node(node_interner)}
+    # The targets of the edges are resolved after all rows have been processed, because a sub row may reference a
+    # subsequent step whose row has not been visited yet.
+    edges_with_target_key: List[Tuple[bool, DecisionNode, str, Optional[str]]] = []
+    outcome_nodes_duplicates: Dict[str, OutcomeNode] = {}  # map to check for duplicate outcome nodes
+
+    for row in table.rows:
+        decision_node, row_nodes, edge_targets = _convert_row_to_nodes_and_edge_targets(row, node_interner)
+        nodes[decision_node.get_key()] = decision_node
+        for node in row_nodes:
+            if not isinstance(node, EndNode) or "Ende" not in nodes:
+                nodes[node.get_key()] = node
+        for decision, target_key, outcome_node, result_code in edge_targets:
+            if outcome_node is not None:
+                _check_outcome_node_is_unambiguous(outcome_node, outcome_nodes_duplicates)
+            edges_with_target_key.append((decision, decision_node, target_key, result_code))
+
+    first_node_after_start = _get_key_and_node_with_lowest_step_number(nodes)[1]
+    edges: List[Tuple[EbdGraphEdge, Optional[str]]] = [
+        (EbdGraphEdge(source=nodes["Start"], target=first_node_after_start, note=None), None)
+    ]
+    for decision, source, target_key, result_code in edges_with_target_key:
+        if target_key not in nodes:
+            raise SubsequentStepNotFoundError(step_number=source.step_number, subsequent_step_number=target_key)
+        edges.append((_yes_no_edge(decision, source=source, target=nodes[target_key]), result_code))
+    return list(nodes.values()), edges
+
+
+def get_all_nodes_and_edges(
+    table: EbdTable, node_interner: Optional[NodeInterner] = None
+) -> Tuple[List[EbdGraphNode], List[EbdGraphEdge]]:
+    """
+    Returns all (unique) nodes and all edges from the given table.
+    Other than calling `get_all_nodes` and `get_all_edges` separately, this walks the rows of the table only once and
+    creates every node exactly once.
+    The nodes are ordered by their first occurrence in the table; the edges are ordered like the rows/sub rows.
+    If a node_interner is given, equal nodes are shared with all other graphs that are created using this interner.
+    """
+    nodes, edges = _get_all_nodes_and_edges_with_result_codes(table, node_interner)
+    return nodes, [edge for edge, _ in edges]
+
+
+def get_all_edges(table: EbdTable, node_interner: Optional[NodeInterner] = None) -> List[EbdGraphEdge]:
     """
     Returns a list with all edges from the given table.
     Edges connect decisions with outcomes or subsequent steps.
     """
-    nodes: Dict[str, EbdGraphNode] = {node.get_key(): node for node in get_all_nodes(table)}
-    first_node_after_start = _get_key_and_node_with_lowest_step_number(table)[1]
-    result: List[EbdGraphEdge] = [EbdGraphEdge(source=nodes["Start"], target=first_node_after_start, note=None)]
+    return get_all_nodes_and_edges(table, node_interner)[1]
 
-    outcome_nodes_duplicates: dict[str, OutcomeNode] = {}  # map to check for duplicate outcome nodes
 
-    for row in table.rows:
-        decision_node = _convert_row_to_decision_node(row)
-        for sub_row in row.sub_rows:
-            if sub_row.check_result.subsequent_step_number is not None:
-                edge = _yes_no_edge(
-                    sub_row.check_result.result,
-                    source=decision_node,
-                    target=nodes[sub_row.check_result.subsequent_step_number],
-                )
-            else:
-                outcome_node: Optional[OutcomeNode] = _convert_sub_row_to_outcome_node(sub_row)
-
-                if outcome_node is None:
-                    if all(sr.result_code is None for sr in row.sub_rows) and any(
-                        sr.note is not None and sr.note.startswith("EBD ") for sr in row.sub_rows
-                    ):
-                        raise EbdCrossReferenceNotSupportedError(row=row, decision_node=decision_node)
-                    if all(sr.result_code is None for sr in row.sub_rows) and any(
-                        sr.note is not None and sr.note.lower().startswith("ende") for sr in row.sub_rows
-                    ):
-                        raise EndeInWrongColumnError(row=row)
-                    raise OutcomeNodeCreationError(decision_node=decision_node, sub_row=sub_row)
-
-                # check for ambiguous outcome nodes, i.e. A** with different notes
-                is_ambiguous_outcome_node = (
-                    outcome_node.result_code in outcome_nodes_duplicates
-                    and outcome_nodes_duplicates[outcome_node.result_code].note != outcome_node.note
-                )
-
-                if not is_ambiguous_outcome_node:
-                    outcome_nodes_duplicates[outcome_node.result_code] = outcome_node
-                else:
-                    raise OutcomeCodeAmbiguousError(
-                        outcome_node1=outcome_nodes_duplicates[outcome_node.result_code], outcome_node2=outcome_node
-                    )
-
-                edge = _yes_no_edge(
-                    sub_row.check_result.result,
-                    source=decision_node,
-                    target=nodes[outcome_node.result_code],
-                )
-            result.append(edge)
-    return result
+def _find_loop(successors: Mapping[str, Iterable[str]], roots: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+    """
+    Returns the keys of the nodes of a loop (in the order of the edges), or None if there is no loop.
+    The successors map each node to the nodes it has edges to (nodes without an entry have no successors).
+    If roots are given, only the loops that can be reached from these nodes are found (default: all nodes).
+    This is an iterative depth first search, so it takes O(V+E) and does not hit the recursion limit for long tables.
+    """
+    finished: Set[str] = set()
+    for root in successors if roots is None else roots:
+        if root in finished:
+            continue
+        path: List[str] = [root]
+        on_path: Set[str] = {root}
+        # each stack entry holds the iterator over the successors of the respective node in `path`
+        stack: List[Iterator[str]] = [iter(successors.get(root, ()))]
+        while stack:
+            successor = next(stack[-1], None)
+            if successor is None:
+                stack.pop()
+                finished.add(path[-1])
+                on_path.discard(path.pop())
+                continue
+            if successor in on_path:
+                return path[path.index(successor) :]
+            if successor not in finished:
+                path.append(successor)
+                on_path.add(successor)
+                stack.append(iter(successors.get(successor, ())))
+    return None
 
 
-def convert_table_to_digraph(table: EbdTable) -> DiGraph:
+def _add_edges(graph: DiGraph, edges: List[Tuple[EbdGraphEdge, Optional[str]]]) -> None:
+    """
+    Adds the edges to the networkx graph and sets the `SUB_ROW_RESULT_CODES_FIELD` of the edges whose sub rows have a
+    result code as well as a subsequent step. The list has to contain all edges of the affected decision nodes.
+    """
+    graph.add_edges_from([(edge.source.get_key(), edge.target.get_key(), {"edge": edge}) for edge, _ in edges])
+    # the answers along each edge (a yes- and a no-edge to the same node are merged into one edge by networkx)
+    sub_row_result_codes: Dict[Tuple[str, str], Dict[bool, Optional[str]]] = {}
+    for edge, result_code in edges:
+        if isinstance(edge, (ToYesEdge, ToNoEdge)):
+            key = (edge.source.get_key(), edge.target.get_key())
+            sub_row_result_codes.setdefault(key, {})[isinstance(edge, ToYesEdge)] = result_code
+    for (source_key, target_key), result_codes in sub_row_result_codes.items():
+        if any(result_code is not None for result_code in result_codes.values()):
+            graph[source_key][target_key][SUB_ROW_RESULT_CODES_FIELD] = result_codes
+
+
+def convert_table_to_digraph(table: EbdTable, node_interner: Optional[NodeInterner] = None) -> DiGraph:
     """
     converts an EbdTable into a directed graph (networkx)
+    Raises a GraphContainsLoopError if a step (directly or indirectly) references itself as subsequent step.
     """
+    nodes, edges = _get_all_nodes_and_edges_with_result_codes(table, node_interner)
     result: DiGraph = DiGraph()
-    result.add_nodes_from([(node.get_key(), {"node": node}) for node in get_all_nodes(table)])
-    result.add_edges_from(
-        [(edge.source.get_key(), edge.target.get_key(), {"edge": edge}) for edge in get_all_edges(table)]
-    )
+    result.add_nodes_from([(node.get_key(), {"node": node}) for node in nodes])
+    _add_edges(result, edges)
+    loop = _find_loop(result.succ)
+    if loop is not None:
+        raise GraphContainsLoopError(loop)
     return result
 
 
-def convert_table_to_graph(table: EbdTable) -> EbdGraph:
+def convert_table_to_graph(
+    table: EbdTable, node_interner: Optional[NodeInterner] = None, lazy: bool = False
+) -> EbdGraph:
     """
     converts the given table into a graph
+    If a node_interner is given, equal nodes are shared with all other graphs that are created using this interner.
+    If lazy is True, only the metadata are converted immediately. The networkx graph is built on the first access of
+    `EbdGraph.graph`, so errors in the table are raised only then.
     """
     if table is None:
         raise ValueError("table must not be None")
-    graph = convert_table_to_digraph(table)
     graph_metadata = EbdGraphMetaData(
         ebd_code=table.metadata.ebd_code,
         chapter=table.metadata.chapter,
         sub_chapter=table.metadata.sub_chapter,
         role=table.metadata.role,
     )
+    if lazy:
+        return EbdGraph(
+            metadata=graph_metadata,
+            multi_step_instructions=table.multi_step_instructions,
+            graph_factory=partial(convert_table_to_digraph, table, node_interner),
+            source_table=table,
+        )
+    graph = convert_table_to_digraph(table, node_interner)
     return EbdGraph(metadata=graph_metadata, graph=graph, multi_step_instructions=table.multi_step_instructions)
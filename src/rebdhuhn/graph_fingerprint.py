@@ -0,0 +1,105 @@
+"""
+This module contains a canonical fingerprint of EbdGraphs.
+The fingerprint is a hash over the content of the graph (node kinds, step numbers, questions, result codes, notes and
+the yes/no labels of the edges) that does not depend on the order in which the nodes and edges have been added to the
+networkx graph. It is meant to be used as cache key for rendered artifacts (dot, plantuml, svg) and to find the EBDs
+that changed between two format versions without rendering them.
+Like a Weisfeiler-Lehman hash, the hash of each node covers its own label and the hashes of its successors; since EBD
+graphs contain no loops, one backward pass suffices to make the node hashes cover the entire subgraph below each node.
+"""
+
+import hashlib
+import json
+from typing import List, Optional, Tuple
+
+import attrs
+
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind, get_compact_graph
+from rebdhuhn.models import DecisionNode, EbdGraph, OutcomeNode
+from rebdhuhn.reachability import sort_topologically
+
+_FINGERPRINT_VERSION = "1"
+"""
+is part of every fingerprint; increase it, whenever the fingerprint is calculated differently
+"""
+
+
+def _hash(data: object) -> str:
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _get_node_label(graph: CompactEbdGraph, node: int) -> List[Optional[str]]:
+    """
+    returns the content of the node itself (without its edges)
+    """
+    ebd_graph_node = graph.nodes[node]
+    if isinstance(ebd_graph_node, DecisionNode):
+        return ["decision", ebd_graph_node.step_number, ebd_graph_node.question]
+    if isinstance(ebd_graph_node, OutcomeNode):
+        return ["outcome", ebd_graph_node.result_code, ebd_graph_node.note]
+    return [NodeKind(graph.kinds[node]).name.lower()]
+
+
+def _get_labelled_successors(graph: CompactEbdGraph, node: int) -> List[Tuple[str, int]]:
+    """
+    returns the successors of the node together with the label of the respective edge (in a fixed order)
+    """
+    if node == graph.start:
+        return [("", graph.start_successor)] if graph.start_successor != NO_SUCCESSOR else []
+    return [
+        (label, successor)
+        for label, successor in (("ja", graph.yes_successors[node]), ("nein", graph.no_successors[node]))
+        if successor != NO_SUCCESSOR
+    ]
+
+
+def get_node_hashes(graph: CompactEbdGraph) -> List[str]:
+    """
+    Returns the hash of each node, which covers the node and (via the hashes of its successors) the entire subgraph
+    below it. The hashes are independent of the order of the nodes. The graph must not contain loops.
+    """
+    node_hashes: List[str] = [""] * len(graph)
+    for node in reversed(sort_topologically(graph)):
+        node_content: List[object] = [
+            _get_node_label(graph, node),
+            [
+                [label, graph.get_edge_note(node, successor), node_hashes[successor]]
+                for label, successor in _get_labelled_successors(graph, node)
+            ],
+        ]
+        # only added if present, so that the hashes of all other nodes stay the same
+        sub_row_successors = [
+            [label, node_hashes[successor], None if outcome == NO_SUCCESSOR else _get_node_label(graph, outcome)]
+            for label, (successor, outcome) in (
+                (label, graph.sub_row_successors[(node, answer)])
+                for label, answer in (("ja", True), ("nein", False))
+                if (node, answer) in graph.sub_row_successors
+            )
+        ]
+        if sub_row_successors:
+            node_content.append(sub_row_successors)
+        node_hashes[node] = _hash(node_content)
+    return node_hashes
+
+
+def get_graph_fingerprint(ebd_graph: EbdGraph) -> str:
+    """
+    Returns a canonical fingerprint (a sha256 hex digest) of the given EbdGraph: two graphs have the same fingerprint
+    iff they have the same metadata, multi step instructions, nodes and edges, regardless of the order of the nodes and
+    edges in the networkx graph. The fingerprint is stable across processes and cached on the EbdGraph.
+    """
+
+    def create_fingerprint() -> str:
+        node_hashes = get_node_hashes(get_compact_graph(ebd_graph))
+        multi_step_instructions = [attrs.asdict(instruction) for instruction in ebd_graph.multi_step_instructions or []]
+        return _hash(
+            [
+                _FINGERPRINT_VERSION,
+                attrs.asdict(ebd_graph.metadata),
+                multi_step_instructions,
+                # the sorted hashes of all nodes also cover nodes that cannot be reached from the start node
+                sorted(node_hashes),
+            ]
+        )
+
+    return ebd_graph.get_derived_data("fingerprint", create_fingerprint)
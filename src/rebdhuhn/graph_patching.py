@@ -0,0 +1,194 @@
+"""
+This module contains logic to patch an existing EbdGraph when single rows of the underlying EbdTable change.
+Other than converting the entire (changed) table again, only the nodes and edges of the changed rows are touched.
+"""
+
+from collections import ChainMap
+from typing import Dict, Iterable, List, Set, Tuple
+
+import attrs
+from networkx import DiGraph  # type:ignore[import]
+
+from rebdhuhn.graph_conversion import (
+    _add_edges,
+    _check_outcome_node_is_unambiguous,
+    _convert_row_to_nodes_and_edge_targets,
+    _EdgeTarget,
+    _find_loop,
+    _get_key_and_node_with_lowest_step_number,
+    _yes_no_edge,
+)
+from rebdhuhn.models import DecisionNode, EbdGraph, EbdGraphEdge, EbdGraphNode, EbdTableRow, EndNode, OutcomeNode
+from rebdhuhn.models.errors import GraphContainsLoopError, OutcomeCodeAmbiguousError, SubsequentStepNotFoundError
+
+
+# pylint:disable=too-few-public-methods
+@attrs.define(auto_attribs=True, kw_only=True)
+class EbdTableRowChangeSet:
+    """
+    Describes which rows of an EbdTable have been added, modified or removed.
+    Rows are identified by their step number.
+    """
+
+    added_rows: List[EbdTableRow] = attrs.field(
+        factory=list,
+        validator=attrs.validators.deep_iterable(member_validator=attrs.validators.instance_of(EbdTableRow)),
+    )
+    """
+    rows with step numbers that did not exist before
+    """
+    modified_rows: List[EbdTableRow] = attrs.field(
+        factory=list,
+        validator=attrs.validators.deep_iterable(member_validator=attrs.validators.instance_of(EbdTableRow)),
+    )
+    """
+    rows that replace the existing rows with the same step number
+    """
+    removed_step_numbers: List[str] = attrs.field(
+        factory=list,
+        validator=attrs.validators.deep_iterable(member_validator=attrs.validators.instance_of(str)),
+    )
+    """
+    step numbers of the rows that have been removed
+    """
+
+
+def _is_decision_node(graph: DiGraph, key: str) -> bool:
+    return key in graph and isinstance(graph.nodes[key]["node"], DecisionNode)
+
+
+def _check_change_set(graph: DiGraph, change_set: EbdTableRowChangeSet) -> None:
+    """
+    Checks that the change set fits to the graph, e.g. that modified rows actually exist.
+    """
+    changed_step_numbers: Set[str] = set()
+    for step_number in [row.step_number for row in change_set.added_rows + change_set.modified_rows] + list(
+        change_set.removed_step_numbers
+    ):
+        if step_number in changed_step_numbers:
+            raise ValueError(f"The step '{step_number}' must not be changed more than once per change set")
+        changed_step_numbers.add(step_number)
+    for row in change_set.added_rows:
+        if row.step_number in graph:
+            raise ValueError(f"The step '{row.step_number}' cannot be added, because it already exists")
+    for step_number in [row.step_number for row in change_set.modified_rows] + list(change_set.removed_step_numbers):
+        if not _is_decision_node(graph, step_number):
+            raise ValueError(f"The step '{step_number}' cannot be modified or removed, because it does not exist")
+
+
+def _replace_node(graph: DiGraph, node: EbdGraphNode) -> None:
+    """
+    Adds the node to the graph or replaces the existing node with the same key (including the references to it that
+    are stored in the incoming edges).
+    """
+    key = node.get_key()
+    if key not in graph:
+        graph.add_node(key, node=node)
+        return
+    graph.nodes[key]["node"] = node
+    for predecessor in graph.predecessors(key):
+        edge_data = graph[predecessor][key]
+        edge_data["edge"] = attrs.evolve(edge_data["edge"], target=node)
+
+
+def _reconnect_start_node(graph: DiGraph) -> None:
+    """
+    (Re-)connects the start node to the first decision node, in case the first step has changed.
+    """
+    nodes: Dict[str, EbdGraphNode]
+    if "1" in graph:
+        nodes = {"1": graph.nodes["1"]["node"]}
+    else:
+        nodes = {key: node for key, node in graph.nodes(data="node") if isinstance(node, DecisionNode)}
+    first_key, first_node = _get_key_and_node_with_lowest_step_number(nodes)
+    if first_key in graph["Start"]:
+        return
+    graph.remove_edges_from(list(graph.out_edges("Start")))
+    graph.add_edge(
+        "Start", first_key, edge=EbdGraphEdge(source=graph.nodes["Start"]["node"], target=first_node, note=None)
+    )
+
+
+# pylint:disable=too-many-locals, too-many-branches
+def patch_graph(ebd_graph: EbdGraph, change_set: EbdTableRowChangeSet) -> None:
+    """
+    Applies the changes of single rows to the (networkx) graph of the given EbdGraph in place.
+    Only the nodes and edges of the changed rows are updated and only the invariants that may be affected by the
+    changes are checked, i.e. ambiguous outcome codes, (no longer) existing subsequent steps and loops (which can only
+    pass through the changed rows, so only these are searched).
+    All checks are performed before the graph is modified, so if an error is raised, the graph is left unchanged.
+    Outcome and end nodes that are no longer referenced are removed. Added nodes are appended to the graph, so the
+    node order may differ from the order of a completely re-converted table.
+    """
+    graph: DiGraph = ebd_graph.graph
+    _check_change_set(graph, change_set)
+    removed_step_numbers = set(change_set.removed_step_numbers)
+    changed_rows = change_set.added_rows + change_set.modified_rows
+    # the outgoing edges of these decision nodes are either removed or replaced
+    affected_step_numbers = removed_step_numbers | {row.step_number for row in changed_rows}
+    converted_rows: List[Tuple[DecisionNode, List[EbdGraphNode], List[_EdgeTarget]]] = [
+        _convert_row_to_nodes_and_edge_targets(row) for row in changed_rows
+    ]
+
+    # check the invariants that might be violated by the changes
+    new_outcome_nodes: Dict[str, OutcomeNode] = {}
+    for decision_node, _, edge_targets in converted_rows:
+        for _, target_key, outcome_node, _ in edge_targets:
+            if outcome_node is not None:
+                _check_outcome_node_is_unambiguous(outcome_node, new_outcome_nodes)
+                continue
+            if target_key == "Ende" or target_key in affected_step_numbers - removed_step_numbers:
+                continue
+            if target_key in removed_step_numbers or not _is_decision_node(graph, target_key):
+                raise SubsequentStepNotFoundError(
+                    step_number=decision_node.step_number, subsequent_step_number=target_key
+                )
+    for result_code, outcome_node in new_outcome_nodes.items():
+        if result_code not in graph:
+            continue
+        existing_outcome_node: OutcomeNode = graph.nodes[result_code]["node"]
+        if existing_outcome_node.note != outcome_node.note and any(
+            predecessor not in affected_step_numbers for predecessor in graph.predecessors(result_code)
+        ):
+            raise OutcomeCodeAmbiguousError(outcome_node1=existing_outcome_node, outcome_node2=outcome_node)
+    for step_number in removed_step_numbers:
+        for predecessor in graph.predecessors(step_number):
+            if predecessor != "Start" and predecessor not in affected_step_numbers:
+                raise SubsequentStepNotFoundError(step_number=predecessor, subsequent_step_number=step_number)
+    # the successors after the changes: the changed rows replace the outgoing edges of their steps
+    changed_successors: Dict[str, Iterable[str]] = {step_number: () for step_number in removed_step_numbers}
+    for decision_node, _, edge_targets in converted_rows:
+        changed_successors[decision_node.get_key()] = [target_key for _, target_key, _, _ in edge_targets]
+    loop = _find_loop(ChainMap(changed_successors, graph.succ), roots=changed_successors)
+    if loop is not None:
+        raise GraphContainsLoopError(loop)
+
+    # apply the changes
+    potentially_unreferenced_nodes: Set[str] = set()
+    for step_number in removed_step_numbers:
+        potentially_unreferenced_nodes.update(graph.successors(step_number))
+        graph.remove_node(step_number)
+    for row in change_set.modified_rows:
+        potentially_unreferenced_nodes.update(graph.successors(row.step_number))
+        graph.remove_edges_from(list(graph.out_edges(row.step_number)))
+    for decision_node, row_nodes, _ in converted_rows:
+        _replace_node(graph, decision_node)
+        for node in row_nodes:
+            if node.get_key() not in graph or isinstance(node, OutcomeNode):
+                _replace_node(graph, node)
+    for decision_node, _, edge_targets in converted_rows:
+        _add_edges(
+            graph,
+            [
+                (_yes_no_edge(decision, source=decision_node, target=graph.nodes[target_key]["node"]), result_code)
+                for decision, target_key, _, result_code in edge_targets
+            ],
+        )
+    for key in potentially_unreferenced_nodes:
+        if key in graph and graph.in_degree(key) == 0 and isinstance(graph.nodes[key]["node"], (OutcomeNode, EndNode)):
+            graph.remove_node(key)
+    if change_set.added_rows or removed_step_numbers:
+        _reconnect_start_node(graph)
+
+    # the last common ancestors (and all other data derived from the graph) are outdated now
+    ebd_graph.invalidate_caches()
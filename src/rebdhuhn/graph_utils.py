@@ -1,83 +1,224 @@
 """
 This module contains utility function for interaction with EbdGraphs and its DiGraph.
-Some of these functions may store some information in the "attribute dictionaries" of the DiGraph nodes
-(for later use in the conversion logic).
+The results of the analyses are cached on the EbdGraph (see `EbdGraph.get_derived_data`); the attribute dictionaries
+of the DiGraph nodes are not modified.
 """
 
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-from networkx import DiGraph, all_simple_paths  # type:ignore[import]
-
-from rebdhuhn.models import ToNoEdge, ToYesEdge
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind, get_compact_graph
+from rebdhuhn.models import EbdGraph
 from rebdhuhn.models.errors import PathsNotGreaterThanOneError
+from rebdhuhn.path_enumeration import PathEnumerationBudget, _BudgetTracker
+
+
+def _get_predecessors(graph: CompactEbdGraph) -> List[List[int]]:
+    """
+    returns the indices of the sources of all incoming edges for each node
+    """
+    predecessors: List[List[int]] = [[] for _ in range(len(graph))]
+    for source, target in graph.get_edges():
+        predecessors[target].append(source)
+    return predecessors
 
-COMMON_ANCESTOR_FIELD = "common_ancestor_for_node"
-# Defines the label to annotate the last common ancestor node with the information to which node
+
+def _get_reverse_postorder(graph: CompactEbdGraph, root: int) -> Tuple[List[int], bool]:
+    """
+    Runs a depth first search from the root and returns all reachable nodes in reverse postorder (which is a
+    topological order, if the reachable part of the graph contains no loops) and whether the search found a loop.
+    """
+    postorder: List[int] = []
+    on_stack: Set[int] = {root}
+    visited: Set[int] = {root}
+    contains_loop = False
+    # each stack entry holds a node and the iterator over its successors
+    stack: List[Tuple[int, Iterator[int]]] = [(root, iter(graph.get_successors(root)))]
+    while stack:
+        node, successors = stack[-1]
+        successor = next(successors, None)
+        if successor is None:
+            stack.pop()
+            on_stack.discard(node)
+            postorder.append(node)
+        elif successor in on_stack:
+            contains_loop = True
+        elif successor not in visited:
+            visited.add(successor)
+            on_stack.add(successor)
+            stack.append((successor, iter(graph.get_successors(successor))))
+    postorder.reverse()
+    return postorder, contains_loop
 
 
-def _find_last_common_ancestor(paths: List[List[str]]) -> str:
+def _get_immediate_dominators(
+    graph: CompactEbdGraph, reverse_postorder: List[int], predecessors: List[List[int]]
+) -> List[int]:
     """
-    This function calculates the last common ancestor node for the defined paths (these paths should be all paths
-    between two nodes in the graph).
-    For this, we assume that the graph contains no loops.
-    Returns the key of the (common ancestor) node.
+    Calculates the immediate dominator of each node reachable from the start node, using the iterative algorithm by
+    Cooper, Harvey and Kennedy ("A Simple, Fast Dominance Algorithm"). A node d dominates a node n, if every path from
+    the start node to n passes d; the immediate dominator is the dominator that is closest to n.
+    Returns the index of the immediate dominator for each node (`NO_SUCCESSOR` for unreachable nodes).
+    The start node is its own immediate dominator.
     """
-    paths = paths.copy()
-    reference_path = paths.pop().copy()  # it's arbitrary which of the paths is the chosen one
-    reference_path.pop()  # The last entry in a path is always the target node in which we are not interested
-    for node in reversed(reference_path):
-        if all(node in path for path in paths):  # If node is present in all paths aka is a common ancestor node
-            return node
-    raise ValueError("No common ancestor found.")
+    order = [NO_SUCCESSOR] * len(graph)  # the position of each node in the reverse postorder
+    for position, node in enumerate(reverse_postorder):
+        order[node] = position
+    immediate_dominators = [NO_SUCCESSOR] * len(graph)
+    immediate_dominators[graph.start] = graph.start
+
+    def intersect(node1: int, node2: int) -> int:
+        while node1 != node2:
+            while order[node1] > order[node2]:
+                node1 = immediate_dominators[node1]
+            while order[node2] > order[node1]:
+                node2 = immediate_dominators[node2]
+        return node1
+
+    changed = True
+    while changed:
+        changed = False
+        for node in reverse_postorder[1:]:
+            new_immediate_dominator = NO_SUCCESSOR
+            for predecessor in predecessors[node]:
+                if immediate_dominators[predecessor] == NO_SUCCESSOR:
+                    continue  # not processed yet (or unreachable)
+                if new_immediate_dominator == NO_SUCCESSOR:
+                    new_immediate_dominator = predecessor
+                else:
+                    new_immediate_dominator = intersect(predecessor, new_immediate_dominator)
+            if immediate_dominators[node] != new_immediate_dominator:
+                immediate_dominators[node] = new_immediate_dominator
+                changed = True
+    return immediate_dominators
 
 
-def _mark_last_common_ancestors(graph: DiGraph) -> None:
+def _count_simple_paths(
+    graph: CompactEbdGraph, source: int, target: int, max_number_of_paths: int, tracker: _BudgetTracker
+) -> int:
     """
-    Marks the last common ancestor node for each node with an indegree > 1. An indegree is the number of edges pointing
-    towards the respective node.
+    Counts the paths from source to target that do not visit any node more than once. The search stops as soon as
+    `max_number_of_paths` paths have been found. It is aborted with an error, if it exceeds the budget of the tracker.
+    """
+    number_of_paths = 0
+    visited: Set[int] = {source}
+    # each stack entry holds the successors of the respective node that have not been visited yet
+    stack: List[Tuple[int, List[int]]] = [(source, graph.get_successors(source))]
+    while stack:
+        tracker.check_time()
+        node, successors = stack[-1]
+        if not successors:
+            stack.pop()
+            visited.discard(node)
+            continue
+        successor = successors.pop(0)
+        if successor in visited:
+            continue
+        if successor == target:
+            number_of_paths += 1
+            if number_of_paths >= max_number_of_paths:
+                break
+            continue
+        tracker.check_depth(len(stack) + 1)
+        visited.add(successor)
+        stack.append((successor, graph.get_successors(successor)))
+    return number_of_paths
+
+
+def _count_paths_in_topological_order(
+    graph: CompactEbdGraph, topological_order: List[int], predecessors: List[List[int]]
+) -> List[int]:
+    """
+    Counts the paths from the start node to each node by adding up the counts of the predecessors.
+    The topological order has to start with the start node and contain all nodes reachable from it.
+    """
+    number_of_paths: List[int] = [0] * len(graph)
+    number_of_paths[graph.start] = 1
+    for node in topological_order[1:]:
+        number_of_paths[node] = sum(number_of_paths[predecessor] for predecessor in predecessors[node])
+    return number_of_paths
+
+
+def count_paths(graph: CompactEbdGraph) -> List[int]:
+    """
+    Returns the number of distinct paths from the start node to each node (by index; 0 for unreachable nodes).
+    The paths are counted by dynamic programming over a topological order, i.e. without enumerating them.
+    Raises a ValueError if the graph contains a loop (because the number of paths would be infinite).
+    """
+    reverse_postorder, contains_loop = _get_reverse_postorder(graph, graph.start)
+    if contains_loop:
+        raise ValueError("The paths of a graph that contains loops cannot be counted")
+    return _count_paths_in_topological_order(graph, reverse_postorder, _get_predecessors(graph))
+
+
+def get_last_common_ancestors(
+    graph: CompactEbdGraph, budget: Optional[PathEnumerationBudget] = None
+) -> Dict[int, List[int]]:
+    """
+    Determines the last common ancestor node for each node with an indegree > 1. An indegree is the number of edges
+    pointing towards the respective node.
     I.e. if a node is the target of more than one `YesNoEdge`, we want to find the last common node from each possible
-    path from the start node to the respective node.
-    Each node which is such an ancestor will contain the information of which nodes it is the last common ancestor.
-    It is stored in the dict field `COMMON_ANCESTOR_FIELD` as a list.
+    path from the start node to the respective node. This is the immediate dominator of the node, which is calculated
+    in (almost) linear time instead of enumerating all the paths.
+    Returns a dict that maps the index of each such ancestor to the indices of the nodes whose last common ancestor it
+    is (in the order of the nodes in the graph). The graph itself is not modified.
+    Only if the graph contains loops, the paths have to be searched; this search is limited by the given budget.
     """
-    for node in graph:
-        in_degree: int = graph.in_degree(node)
+    tracker = _BudgetTracker(budget)
+    predecessors = _get_predecessors(graph)
+    reverse_postorder, contains_loop = _get_reverse_postorder(graph, graph.start)
+    immediate_dominators = _get_immediate_dominators(graph, reverse_postorder, predecessors)
+    number_of_paths: List[int] = [0] * len(graph)
+    if not contains_loop:
+        number_of_paths = _count_paths_in_topological_order(graph, reverse_postorder, predecessors)
+    result: Dict[int, List[int]] = {}
+    for node in range(len(graph)):
+        in_degree = graph.in_degrees[node]
         if in_degree <= 1:
             continue
-        paths = list(all_simple_paths(graph, source="Start", target=node))
-        if len(paths) <= 1:
+        if contains_loop:
+            number_of_paths[node] = _count_simple_paths(graph, graph.start, node, 2, tracker)
+        if number_of_paths[node] <= 1:
             raise PathsNotGreaterThanOneError(
-                node_key=node,
+                node_key=graph.keys[node],
                 indegree=in_degree,
-                number_of_paths=len(paths),
+                number_of_paths=number_of_paths[node],
             )
-        common_ancestor = _find_last_common_ancestor(paths)
-        assert common_ancestor != "Start", "Last common ancestor should always be at least the first decision node '1'."
-        # Annotate the common ancestor for later conversion
-        if COMMON_ANCESTOR_FIELD not in graph.nodes[common_ancestor]:
-            graph.nodes[common_ancestor][COMMON_ANCESTOR_FIELD] = [node]
-        else:
-            assert isinstance(graph.nodes[common_ancestor][COMMON_ANCESTOR_FIELD], list), "Wrong type"
-            graph.nodes[common_ancestor][COMMON_ANCESTOR_FIELD].append(node)
-
-
-def _get_yes_no_edges(graph: DiGraph, node: str) -> Tuple[ToYesEdge, ToNoEdge]:
-    """
-    A shorthand to get the yes-edge and the no-edge of a decision node.
-    """
-    yes_edge: ToYesEdge
-    no_edge: ToNoEdge
-    for edge in graph[node].values():
-        edge = edge["edge"]
-        match edge:
-            case ToYesEdge():
-                assert "yes_edge" not in locals(), f"Multiple yes edges found for node {node}"
-                yes_edge = edge
-            case ToNoEdge():
-                assert "no_edge" not in locals(), f"Multiple no edges found for node {node}"
-                no_edge = edge
-            case _:
-                assert False, f"Unknown edge type: {edge}"
-    assert "yes_edge" in locals(), f"No yes edge found for node {node}"
-    assert "no_edge" in locals(), f"No no edge found for node {node}"
-    return yes_edge, no_edge
+        common_ancestor = immediate_dominators[node]
+        assert common_ancestor != graph.start, "Last common ancestor should always be at least the first decision node."
+        result.setdefault(common_ancestor, []).append(node)
+    return result
+
+
+def get_cached_last_common_ancestors(ebd_graph: EbdGraph) -> Dict[int, List[int]]:
+    """
+    Returns the last common ancestors (see `get_last_common_ancestors`) for the compact graph of the given EbdGraph
+    (see `get_compact_graph`). They are calculated only once per graph and shared by all renderers.
+    Do not modify the returned dict.
+    """
+    return ebd_graph.get_derived_data(
+        "last_common_ancestors", lambda: get_last_common_ancestors(get_compact_graph(ebd_graph))
+    )
+
+
+def get_number_of_paths(ebd_graph: EbdGraph) -> Dict[str, int]:
+    """
+    Returns the number of distinct paths from the start node to each node of the given EbdGraph (by node key).
+    The counts are cached on the EbdGraph (see `count_paths`).
+    """
+    number_of_paths: List[int] = ebd_graph.get_derived_data(
+        "number_of_paths", lambda: count_paths(get_compact_graph(ebd_graph))
+    )
+    return dict(zip(get_compact_graph(ebd_graph).keys, number_of_paths))
+
+
+def get_number_of_paths_per_outcome(ebd_graph: EbdGraph) -> Dict[str, int]:
+    """
+    Returns the number of distinct paths from the start node that end in each outcome (by result code, e.g. 'A01').
+    """
+    compact_graph = get_compact_graph(ebd_graph)
+    number_of_paths = get_number_of_paths(ebd_graph)
+    return {
+        key: number_of_paths[key]
+        for key, kind in zip(compact_graph.keys, compact_graph.kinds)
+        if kind == NodeKind.OUTCOME
+    }
@@ -2,14 +2,16 @@
 This module contains logic to convert EbdGraph data to dot code (Graphviz) and further to parse this code to SVG images.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from xml.sax.saxutils import escape
 
 from rebdhuhn.add_watermark import add_background as add_background_function
 from rebdhuhn.add_watermark import add_watermark as add_watermark_function
-from rebdhuhn.graph_utils import _mark_last_common_ancestors
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind
+from rebdhuhn.graph_utils import get_cached_last_common_ancestors, get_compact_graph, get_last_common_ancestors
 from rebdhuhn.kroki import DotToSvgConverter, Kroki
-from rebdhuhn.models import DecisionNode, EbdGraph, EbdGraphEdge, EndNode, OutcomeNode, StartNode, ToNoEdge, ToYesEdge
+from rebdhuhn.models import DecisionNode, EbdGraph, EbdGraphMetaData, OutcomeNode
+from rebdhuhn.subgraph_sharing import share_identical_subgraphs
 
 ADD_INDENT = "    "  #: This is just for style purposes to make the plantuml files human-readable.
 
@@ -25,13 +27,13 @@ def _format_label(label: str) -> str:
     # return f'<{escaped_str}<BR align="left"/>>'
 
 
-def _convert_start_node_to_dot(ebd_graph: EbdGraph, node: str, indent: str) -> str:
+def _convert_start_node_to_dot(metadata: EbdGraphMetaData, node: str, indent: str) -> str:
     """
     Convert a StartNode to dot code
     """
     formatted_label = (
-        f'<B>{ebd_graph.metadata.ebd_code}</B><BR align="center"/>'
-        f'<FONT point-size="12"><B><U>Prüfende Rolle:</U> {ebd_graph.metadata.role}</B></FONT><BR align="center"/>'
+        f'<B>{metadata.ebd_code}</B><BR align="center"/>'
+        f'<FONT point-size="12"><B><U>Prüfende Rolle:</U> {metadata.role}</B></FONT><BR align="center"/>'
     )
     return (
         f'{indent}"{node}" '
@@ -46,14 +48,15 @@ def _convert_end_node_to_dot(node: str, indent: str) -> str:
     return f'{indent}"{node}" [margin="0.2,0.12", shape=box, style=filled, fillcolor="#7a8da1", label="Ende"];'
 
 
-def _convert_outcome_node_to_dot(ebd_graph: EbdGraph, node: str, indent: str) -> str:
+def _convert_outcome_node_to_dot(outcome_node: OutcomeNode, node: str, indent: str) -> str:
     """
     Convert an OutcomeNode to dot code
     """
+    formatted_note = _format_label(outcome_node.note)  # type:ignore[arg-type]
     formatted_label = (
-        f'<B>{ebd_graph.graph.nodes[node]["node"].result_code}</B><BR align="center"/>'
+        f'<B>{outcome_node.result_code}</B><BR align="center"/>'
         f'<FONT point-size="12">'
-        f'<U>Hinweis:</U><BR align="left"/>{_format_label(ebd_graph.graph.nodes[node]["node"].note)}<BR align="left"/>'
+        f'<U>Hinweis:</U><BR align="left"/>{formatted_note}<BR align="left"/>'
         f"</FONT>"
     )
     return (
@@ -62,48 +65,41 @@ def _convert_outcome_node_to_dot(ebd_graph: EbdGraph, node: str, indent: str) ->
     )
 
 
-def _convert_decision_node_to_dot(ebd_graph: EbdGraph, node: str, indent: str) -> str:
+def _convert_decision_node_to_dot(decision_node: DecisionNode, node: str, indent: str) -> str:
     """
     Convert a DecisionNode to dot code
     """
-    formatted_label = (
-        f'<B>{ebd_graph.graph.nodes[node]["node"].step_number}: </B>'
-        f'{_format_label(ebd_graph.graph.nodes[node]["node"].question)}'
-        f'<BR align="left"/>'
-    )
+    formatted_label = f'<B>{decision_node.step_number}: </B>{_format_label(decision_node.question)}<BR align="left"/>'
     return (
         f'{indent}"{node}" [margin="0.2,0.12", shape=box, style="filled,rounded", fillcolor="#7aab8a", '
         f"label=<{formatted_label}>];"
     )
 
 
-def _convert_node_to_dot(ebd_graph: EbdGraph, node: str, indent: str) -> str:
+def _convert_node_to_dot(graph: CompactEbdGraph, metadata: EbdGraphMetaData, node: int, indent: str) -> str:
     """
     A shorthand to convert an arbitrary node to dot code. It just determines the node type and calls the
     respective function.
     """
-    match ebd_graph.graph.nodes[node]["node"]:
-        case DecisionNode():
-            return _convert_decision_node_to_dot(ebd_graph, node, indent)
-        case OutcomeNode():
-            return _convert_outcome_node_to_dot(ebd_graph, node, indent)
-        case EndNode():
-            return _convert_end_node_to_dot(node, indent)
-        case StartNode():
-            return _convert_start_node_to_dot(ebd_graph, node, indent)
+    key = graph.keys[node]
+    match graph.kinds[node]:
+        case NodeKind.DECISION:
+            return _convert_decision_node_to_dot(graph.nodes[node], key, indent)  # type:ignore[arg-type]
+        case NodeKind.OUTCOME:
+            return _convert_outcome_node_to_dot(graph.nodes[node], key, indent)  # type:ignore[arg-type]
+        case NodeKind.END:
+            return _convert_end_node_to_dot(key, indent)
+        case NodeKind.START:
+            return _convert_start_node_to_dot(metadata, key, indent)
         case _:
-            raise ValueError(f"Unknown node type: {ebd_graph.graph.nodes[node]['node']}")
+            raise ValueError(f"Unknown node type: {graph.nodes[node]}")
 
 
-def _convert_nodes_to_dot(ebd_graph: EbdGraph, indent: str) -> str:
+def _convert_nodes_to_dot(graph: CompactEbdGraph, metadata: EbdGraphMetaData, indent: str) -> str:
     """
-    Convert all nodes of the EbdGraph to dot output and return it as a string.
+    Convert all nodes of the graph to dot output and return it as a string.
     """
-    if ebd_graph.multi_step_instructions:
-        # pylint: disable=fixme
-        # TODO: Implement multi step instruction text to a graphical representation
-        pass
-    return "\n".join([_convert_node_to_dot(ebd_graph, node, indent) for node in ebd_graph.graph.nodes])
+    return "\n".join([_convert_node_to_dot(graph, metadata, node, indent) for node in range(len(graph))])
 
 
 def _convert_yes_edge_to_dot(node_src: str, node_target: str, indent: str) -> str:
@@ -127,47 +123,63 @@ def _convert_ebd_graph_edge_to_dot(node_src: str, node_target: str, indent: str)
     return f'{indent}"{node_src}" -> "{node_target}";'
 
 
-def _convert_edge_to_dot(ebd_graph: EbdGraph, node_src: str, node_target: str, indent: str) -> str:
+def _convert_edge_to_dot(graph: CompactEbdGraph, node_src: int, node_target: int, indent: str) -> str:
     """
-    A shorthand to convert an arbitrary node to dot code. It just determines the node type and calls the
+    A shorthand to convert an arbitrary edge to dot code. It just determines the edge type and calls the
     respective function.
     """
-    match ebd_graph.graph[node_src][node_target]["edge"]:
-        case ToYesEdge():
-            return _convert_yes_edge_to_dot(node_src, node_target, indent)
-        case ToNoEdge():
-            return _convert_no_edge_to_dot(node_src, node_target, indent)
-        case EbdGraphEdge():
-            return _convert_ebd_graph_edge_to_dot(node_src, node_target, indent)
-        case _:
-            raise ValueError(f"Unknown edge type: {ebd_graph.graph[node_src][node_target]['edge']}")
+    if node_src == graph.start:
+        return _convert_ebd_graph_edge_to_dot(graph.keys[node_src], graph.keys[node_target], indent)
+    if graph.yes_successors[node_src] == node_target:
+        return _convert_yes_edge_to_dot(graph.keys[node_src], graph.keys[node_target], indent)
+    return _convert_no_edge_to_dot(graph.keys[node_src], graph.keys[node_target], indent)
 
 
-def _convert_edges_to_dot(ebd_graph: EbdGraph, indent: str) -> List[str]:
+def _convert_edges_to_dot(graph: CompactEbdGraph, indent: str) -> List[str]:
     """
-    Convert all edges of the EbdGraph to dot output and return it as a string.
+    Convert all edges of the graph to dot output and return it as a string.
     """
-    return [_convert_edge_to_dot(ebd_graph, edge[0], edge[1], indent) for edge in ebd_graph.graph.edges]
+    return [_convert_edge_to_dot(graph, node_src, node_target, indent) for node_src, node_target in graph.get_edges()]
 
 
-def convert_graph_to_dot(ebd_graph: EbdGraph) -> str:
+def convert_compact_graph_to_dot(
+    graph: CompactEbdGraph, metadata: EbdGraphMetaData, common_ancestors: Optional[Dict[int, List[int]]] = None
+) -> str:
     """
-    Convert the EbdGraph to dot output for Graphviz. Returns the dot code as string.
+    Convert the compact representation of an EbdGraph (and its metadata) to dot output for Graphviz.
+    Returns the dot code as string.
+    The last common ancestors (see `get_last_common_ancestors`) are calculated, if they are not provided.
     """
-    nx_graph = ebd_graph.graph
-    _mark_last_common_ancestors(nx_graph)
+    if common_ancestors is None:
+        get_last_common_ancestors(graph)  # raises an error, if the graph is not supported
     header = (
-        f'<B><FONT POINT-SIZE="18">{ebd_graph.metadata.chapter}</FONT></B><BR/><BR/>'
-        f'<B><FONT POINT-SIZE="16">{ebd_graph.metadata.sub_chapter}</FONT></B><BR/><BR/><BR/><BR/>'
+        f'<B><FONT POINT-SIZE="18">{metadata.chapter}</FONT></B><BR/><BR/>'
+        f'<B><FONT POINT-SIZE="16">{metadata.sub_chapter}</FONT></B><BR/><BR/><BR/><BR/>'
     )
     dot_code = "digraph D {\n" f'{ADD_INDENT}labelloc="t";\n{ADD_INDENT}label=<{header}>;\n'
-    assert len(nx_graph["Start"]) == 1, "Start node must have exactly one outgoing edge."
-    dot_code += _convert_nodes_to_dot(ebd_graph, ADD_INDENT) + "\n\n"
-    dot_code += "\n".join(_convert_edges_to_dot(ebd_graph, ADD_INDENT)) + "\n"
+    assert graph.start_successor != NO_SUCCESSOR, "Start node must have exactly one outgoing edge."
+    dot_code += _convert_nodes_to_dot(graph, metadata, ADD_INDENT) + "\n\n"
+    dot_code += "\n".join(_convert_edges_to_dot(graph, ADD_INDENT)) + "\n"
     dot_code += '\n    bgcolor="transparent";\n'
     return dot_code + "}"
 
 
+def convert_graph_to_dot(ebd_graph: EbdGraph, share_subgraphs: bool = False) -> str:
+    """
+    Convert the EbdGraph to dot output for Graphviz. Returns the dot code as string.
+    If share_subgraphs is True, structurally identical subgraphs are drawn only once (see `share_identical_subgraphs`).
+    """
+    if share_subgraphs:
+        ebd_graph = share_identical_subgraphs(ebd_graph)
+    if ebd_graph.multi_step_instructions:
+        # pylint: disable=fixme
+        # TODO: Implement multi step instruction text to a graphical representation
+        pass
+    return convert_compact_graph_to_dot(
+        get_compact_graph(ebd_graph), ebd_graph.metadata, get_cached_last_common_ancestors(ebd_graph)
+    )
+
+
 def convert_dot_to_svg_kroki(
     dot_code: str,
     add_watermark: bool = True,
@@ -17,3 +17,4 @@ from rebdhuhn.models.ebd_graph import (
     ToYesEdge,
 )
 from rebdhuhn.models.ebd_table import EbdCheckResult, EbdTable, EbdTableMetaData, EbdTableRow, EbdTableSubRow
+from rebdhuhn.models.trusted import create_ebd_table_trusted, create_trusted, get_validation_errors
@@ -3,13 +3,15 @@ contains the graph side of things
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
 
 import attrs
 from networkx import DiGraph  # type:ignore[import]
 
 # pylint:disable=too-few-public-methods
-from rebdhuhn.models.ebd_table import RESULT_CODE_REGEX, MultiStepInstruction
+from rebdhuhn.models.ebd_table import RESULT_CODE_REGEX, EbdTable, MultiStepInstruction
+
+T = TypeVar("T")
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
@@ -168,6 +170,7 @@ class ToNoEdge(EbdGraphEdge):
     """
 
 
+# pylint:disable=too-many-instance-attributes
 @attrs.define(auto_attribs=True, kw_only=True)
 class EbdGraph:
     """
@@ -179,9 +182,12 @@ class EbdGraph:
     meta data of the graph
     """
 
-    graph: DiGraph = attrs.field(validator=attrs.validators.instance_of(DiGraph))
+    _graph: Optional[DiGraph] = attrs.field(
+        validator=attrs.validators.optional(attrs.validators.instance_of(DiGraph)), default=None
+    )
     """
-    The networkx graph
+    The networkx graph (use the property `graph` to access it).
+    It is None, as long as the graph of a lazy EbdGraph has not been accessed yet.
     """
 
     # pylint: disable=duplicate-code
@@ -199,5 +205,122 @@ class EbdGraph:
     instructions. There might be more than one of these instructions in one EBD table.
     """
 
+    _graph_factory: Optional[Callable[[], DiGraph]] = attrs.field(default=None, eq=False, repr=False)
+    """
+    Creates the networkx graph on the first access of a lazy EbdGraph (the argument is called `graph_factory`).
+    """
+
+    _source_table: Optional[EbdTable] = attrs.field(
+        validator=attrs.validators.optional(attrs.validators.instance_of(EbdTable)), default=None, eq=False, repr=False
+    )
+    """
+    The table from which the graph has been created (the argument is called `source_table`).
+    If present, cheap properties (like the number of nodes) are derived from the table without building the graph.
+    """
+
+    _derived_data: Dict[str, Any] = attrs.field(factory=dict, init=False, eq=False, repr=False)
+    """
+    Data that are derived from the networkx graph (e.g. the last common ancestors) and cached by `get_derived_data`.
+    """
+
+    _derived_data_version: Optional[Tuple[int, int, int]] = attrs.field(default=None, init=False, eq=False, repr=False)
+    """
+    The version of the networkx graph from which the derived data have been created (see `_get_graph_version`).
+    """
+
     # pylint:disable=fixme
     # todo @leon: fill it with all the things you need
+
+    def __attrs_post_init__(self) -> None:
+        if self._graph is None and self._graph_factory is None:
+            raise ValueError("Either a graph or a graph_factory has to be provided")
+
+    @property
+    def graph(self) -> DiGraph:
+        """
+        The networkx graph. For a lazy EbdGraph, it is built on the first access.
+        """
+        if self._graph is None:
+            assert self._graph_factory is not None
+            self._graph = self._graph_factory()
+            self._graph_factory = None
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph: DiGraph) -> None:
+        self._graph = graph
+        self.invalidate_caches()
+
+    def _get_graph_version(self) -> Tuple[int, int, int]:
+        """
+        returns a cheap identifier of the current state of the networkx graph: its id and its number of nodes and edges
+        """
+        graph = self.graph
+        return id(graph), graph.number_of_nodes(), graph.number_of_edges()
+
+    def get_derived_data(self, name: str, create_data: Callable[[], T]) -> T:
+        """
+        Returns the data with the given name that are derived from the graph (e.g. an analysis that is needed by more
+        than one renderer). They are created on the first access and cached until the graph changes.
+        """
+        graph_version = self._get_graph_version()
+        if graph_version != self._derived_data_version:
+            self._derived_data.clear()
+            self._derived_data_version = graph_version
+        if name not in self._derived_data:
+            self._derived_data[name] = create_data()
+        return self._derived_data[name]
+
+    def invalidate_caches(self) -> None:
+        """
+        Removes all cached data derived from the graph. All consumers (renderers, fingerprint, evaluator, indices) use
+        these data, so after modifying the networkx graph in place (e.g. by replacing node objects or by redirecting an
+        edge), you have to call this method; `patch_graph` does so. Replacing the graph is detected automatically, and
+        so is adding or removing nodes or edges, but do not rely on the latter.
+        """
+        self._derived_data.clear()
+        self._derived_data_version = None
+
+    def is_graph_built(self) -> bool:
+        """
+        returns true iff the networkx graph already exists (which is always the case for non-lazy EbdGraphs)
+        """
+        return self._graph is not None
+
+    @property
+    def ebd_code(self) -> str:
+        """
+        the ID of the EBD; e.g. 'E_0053'
+        """
+        return self.metadata.ebd_code
+
+    def get_outcome_codes(self) -> List[str]:
+        """
+        Returns the result codes of all outcome nodes (e.g. ['A01', 'A02']) in the order of their first occurrence.
+        The graph is not built, if the codes can be derived from the source table.
+        """
+        if self._graph is None and self._source_table is not None:
+            outcome_codes: Dict[str, None] = {}  # a dict keeps the order and removes duplicates
+            for row in self._source_table.rows:
+                for sub_row in row.sub_rows:
+                    if sub_row.result_code is not None:
+                        outcome_codes[sub_row.result_code] = None
+            return list(outcome_codes)
+        return [key for key, node in self.graph.nodes(data="node") if isinstance(node, OutcomeNode)]
+
+    def get_number_of_nodes(self) -> int:
+        """
+        Returns the number of nodes in the graph (including the start and end node).
+        The graph is not built, if the number can be derived from the source table.
+        """
+        if self._graph is None and self._source_table is not None:
+            node_keys: Set[str] = {"Start"}
+            for row in self._source_table.rows:
+                node_keys.add(row.step_number)
+                for sub_row in row.sub_rows:
+                    if sub_row.result_code is not None:
+                        node_keys.add(sub_row.result_code)
+                    if sub_row.check_result.subsequent_step_number == "Ende":
+                        node_keys.add("Ende")
+            return len(node_keys)
+        return self.graph.number_of_nodes()
@@ -23,6 +23,9 @@ class NotExactlyTwoOutgoingEdgesError(NotImplementedError):
         self.decision_node_key = decision_node_key
         self.outgoing_edges = outgoing_edges
 
+    def __reduce__(self):
+        return self.__class__, (self.args[0], self.decision_node_key, self.outgoing_edges)
+
     def __str__(self):
         return f"The node {self.decision_node_key} has more than 2 outgoing edges: {', '.join(self.outgoing_edges)}"
 
@@ -41,6 +44,9 @@ class PathsNotGreaterThanOneError(ValueError):
         self.indegree = indegree
         self.number_of_paths = number_of_paths
 
+    def __reduce__(self):
+        return self.__class__, (self.node_key, self.indegree, self.number_of_paths)
+
 
 class GraphTooComplexForPlantumlError(Exception):
     """
@@ -88,6 +94,9 @@ class EbdCrossReferenceNotSupportedError(NotImplementedError):
         self.cross_reference = cross_reference
         self.decision_node = decision_node
 
+    def __reduce__(self):
+        return self.__class__, (self.decision_node, self.row)
+
 
 class EndeInWrongColumnError(ValueError):
     """
@@ -100,6 +109,9 @@ class EndeInWrongColumnError(ValueError):
         super().__init__(f"'Ende' in wrong column for row {row}")
         self.row = row
 
+    def __reduce__(self):
+        return self.__class__, (self.row,)
+
 
 class OutcomeNodeCreationError(ValueError):
     """
@@ -111,6 +123,9 @@ class OutcomeNodeCreationError(ValueError):
         self.sub_row = sub_row
         self.decision_node = decision_node
 
+    def __reduce__(self):
+        return self.__class__, (self.decision_node, self.sub_row)
+
 
 class OutcomeCodeAmbiguousError(ValueError):
     """
@@ -120,3 +135,70 @@ class OutcomeCodeAmbiguousError(ValueError):
     def __init__(self, outcome_node1: OutcomeNode, outcome_node2: OutcomeNode):
         super().__init__(f"Ambiguous result codes:  for [{outcome_node1, outcome_node2}].")
         self.outcome_nodes = [outcome_node1, outcome_node2]
+
+    def __reduce__(self):
+        return self.__class__, (self.outcome_nodes[0], self.outcome_nodes[1])
+
+
+class SubsequentStepNotFoundError(ValueError):
+    """
+    Raised when a step references a subsequent step for which there is no row (e.g. because the row has been removed).
+    """
+
+    def __init__(self, step_number: str, subsequent_step_number: str):
+        super().__init__(
+            f"The step '{step_number}' references the subsequent step '{subsequent_step_number}' which does not exist."
+        )
+        self.step_number = step_number
+        self.subsequent_step_number = subsequent_step_number
+
+    def __reduce__(self):
+        return self.__class__, (self.step_number, self.subsequent_step_number)
+
+
+class PathEnumerationBudgetExceededError(RuntimeError):
+    """
+    Raised when the enumeration of the paths through a graph exceeds its budget (number of paths, depth or time).
+    This protects batch jobs from pathological graphs, in which the number of paths grows exponentially.
+    """
+
+    def __init__(self, limit_name: str, limit: float):
+        super().__init__(f"The enumeration of paths has been aborted because it exceeded the {limit_name} of {limit}")
+        self.limit_name = limit_name
+        self.limit = limit
+
+    def __reduce__(self):
+        return self.__class__, (self.limit_name, self.limit)
+
+
+class GraphContainsLoopError(ValueError):
+    """
+    Raised when a step (directly or indirectly) references itself as subsequent step, e.g. because the
+    subsequent_step_number of a row points to an earlier step. The analysis of the graph requires it to be loop-free.
+    """
+
+    def __init__(self, loop: list[str]):
+        """
+        the loop is given as the keys of its nodes, each node is followed by its successor (the last node by the first)
+        """
+        super().__init__(f"The graph contains a loop: {' -> '.join(loop + loop[:1])}")
+        self.loop = loop
+
+    def __reduce__(self):
+        return self.__class__, (self.loop,)
+
+
+class AnswerMissingError(KeyError):
+    """
+    Raised when an EBD is evaluated but there is no answer (or predicate) for a step that is needed.
+    """
+
+    def __init__(self, step_number: str):
+        super().__init__(f"There is no answer for step '{step_number}'")
+        self.step_number = step_number
+
+    def __reduce__(self):
+        return self.__class__, (self.step_number,)
+
+    def __str__(self):
+        return self.args[0]
@@ -0,0 +1,138 @@
+"""
+This module allows to create instances of the models without running the attrs validators.
+Use this only for data that are known to be valid, e.g. the output of a scraper that has already been validated.
+The validation can then be done once for an entire corpus using `get_validation_errors`.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar, Union
+
+import attrs
+
+from rebdhuhn.models.ebd_table import (
+    EbdCheckResult,
+    EbdTable,
+    EbdTableMetaData,
+    EbdTableRow,
+    EbdTableSubRow,
+    MultiStepInstruction,
+)
+
+T = TypeVar("T")
+
+
+def _create_slot_setter(cls: type, name: str) -> Callable[[Any, Any], None]:
+    slot = getattr(cls, name, None)
+    if slot is not None and hasattr(slot, "__set__"):
+        # setting the slot directly also works for frozen classes and is the fastest way to set an attribute
+        return slot.__set__
+    return lambda instance, value: object.__setattr__(instance, name, value)
+
+
+@lru_cache(maxsize=None)
+def _get_field_setters(cls: type) -> Tuple[Tuple[str, Callable[[Any, Any], None], Any], ...]:
+    """
+    returns the (init) name, a setter and the default value of every attrs field of the given class
+    """
+    return tuple((field.alias, _create_slot_setter(cls, field.name), field.default) for field in attrs.fields(cls))
+
+
+def create_trusted(cls: Type[T], **kwargs: Any) -> T:
+    """
+    Creates an instance of the given attrs class without running the validators (neither the field validators nor
+    those that check the types of nested objects). The keyword arguments are the same as for the regular constructor.
+    Note that assigning attributes of the created instance later on, still runs the validators (as long as they are not
+    disabled globally using `attrs.validators.disabled()`).
+    """
+    instance = object.__new__(cls)
+    for name, setter, default in _get_field_setters(cls):  # type:ignore[arg-type]
+        if name in kwargs:
+            value = kwargs.pop(name)
+        elif default is attrs.NOTHING:
+            raise TypeError(f"{cls.__name__} is missing the required argument '{name}'")
+        elif isinstance(default, attrs.Factory):  # type:ignore[arg-type]
+            value = default.factory()
+        else:
+            value = default
+        setter(instance, value)
+    if kwargs:
+        raise TypeError(f"{cls.__name__} got unexpected arguments: {', '.join(kwargs)}")
+    return instance
+
+
+def _create_sub_row_trusted(sub_row: Mapping[str, Any]) -> EbdTableSubRow:
+    check_result = sub_row["check_result"]
+    return create_trusted(
+        EbdTableSubRow,
+        check_result=create_trusted(
+            EbdCheckResult,
+            result=check_result["result"],
+            subsequent_step_number=check_result["subsequent_step_number"],
+        ),
+        result_code=sub_row["result_code"],
+        note=sub_row["note"],
+    )
+
+
+def _create_row_trusted(row: Mapping[str, Any]) -> EbdTableRow:
+    return create_trusted(
+        EbdTableRow,
+        step_number=row["step_number"],
+        description=row["description"],
+        sub_rows=[_create_sub_row_trusted(sub_row) for sub_row in row["sub_rows"]],
+        use_cases=row.get("use_cases"),
+    )
+
+
+def create_ebd_table_trusted(table: Mapping[str, Any]) -> EbdTable:
+    """
+    Creates an EbdTable from its dictionary representation (as created by e.g. `attrs.asdict` or
+    `cattrs.unstructure`) without running any validators.
+    """
+    multi_step_instructions: Optional[List[MultiStepInstruction]] = None
+    if table.get("multi_step_instructions") is not None:
+        multi_step_instructions = [
+            create_trusted(MultiStepInstruction, **instruction) for instruction in table["multi_step_instructions"]
+        ]
+    return create_trusted(
+        EbdTable,
+        metadata=create_trusted(EbdTableMetaData, **table["metadata"]),
+        rows=[_create_row_trusted(row) for row in table["rows"]],
+        multi_step_instructions=multi_step_instructions,
+    )
+
+
+def _collect_validation_errors(value: Any, location: str, errors: List[Tuple[str, Exception]]) -> None:
+    if isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            _collect_validation_errors(item, f"{location}[{index}]", errors)
+        return
+    if not attrs.has(type(value)):
+        return
+    for field in attrs.fields(type(value)):
+        field_value = getattr(value, field.name)
+        if field.validator is not None:
+            try:
+                field.validator(value, field, field_value)
+            except (ValueError, TypeError) as error:
+                errors.append((f"{location}.{field.name}", error))
+                continue
+        _collect_validation_errors(field_value, f"{location}.{field.name}", errors)
+
+
+def get_validation_errors(instances: Union[Any, Iterable[Any]]) -> List[Tuple[str, Exception]]:
+    """
+    Runs all attrs validators on the given instance(s) and all the (attrs) instances they contain.
+    This is meant to validate a corpus of models that have been created using `create_trusted` in one go.
+    Returns a list of all errors (with the location where they occurred) instead of raising the first one.
+    An empty list means, that all instances are valid.
+    """
+    errors: List[Tuple[str, Exception]] = []
+    if attrs.has(type(instances)):
+        instances = [instances]
+    for index, instance in enumerate(instances):
+        location = f"[{index}]"
+        if isinstance(instance, EbdTable):
+            location = instance.metadata.ebd_code
+        _collect_validation_errors(instance, location, errors)
+    return errors
@@ -0,0 +1,116 @@
+"""
+This module contains an interning layer for the nodes of EbdGraphs.
+The same outcome (e.g. 'A01' with the note 'Fristüberschreitung') and the same questions occur in hundreds of EBDs.
+Instead of creating a new (but equal) node instance in every conversion, the interner hands out one shared instance per
+distinct node. The labels (questions and notes) of the nodes are shared, too.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple, TypeVar
+
+from rebdhuhn.models import DecisionNode, EbdGraphNode, EndNode, OutcomeNode, StartNode, create_trusted
+
+_NodeT = TypeVar("_NodeT", bound=EbdGraphNode)
+
+
+class NodeInterner:
+    """
+    A bounded table of shared node instances (and label strings). If the table is full, the least recently used
+    entries are dropped; nodes that are already part of a graph stay valid, they are just not shared anymore.
+    The interner assumes that the values it gets are valid (they come from validated EbdTables), so the nodes are
+    created without running the validators.
+    Note that the interner is not thread-safe; use one interner per thread (or process).
+    """
+
+    def __init__(self, max_size: int = 65536):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive but was {max_size}")
+        self.max_size = max_size
+        self._nodes: OrderedDict[Tuple[Hashable, ...], EbdGraphNode] = OrderedDict()
+        self._strings: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0  #: number of nodes that have been found in the table
+        self.misses = 0  #: number of nodes that had to be created
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        the share of node requests that were answered with an existing (shared) node; 0 if there were no requests yet
+        """
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def intern_string(self, string: str) -> str:
+        """
+        returns a shared instance of the given string
+        """
+        interned_string = self._strings.get(string)
+        if interned_string is not None:
+            self._strings.move_to_end(string)
+            return interned_string
+        self._strings[string] = string
+        if len(self._strings) > self.max_size:
+            self._strings.popitem(last=False)
+        return string
+
+    def _get_node(self, key: Tuple[Hashable, ...], create_node: Callable[[], _NodeT]) -> _NodeT:
+        node = self._nodes.get(key)
+        if node is not None:
+            self._nodes.move_to_end(key)
+            self.hits += 1
+            return node  # type:ignore[return-value]
+        self.misses += 1
+        new_node = create_node()
+        self._nodes[key] = new_node
+        if len(self._nodes) > self.max_size:
+            self._nodes.popitem(last=False)
+        return new_node
+
+    def get_decision_node(self, step_number: str, question: str) -> DecisionNode:
+        """
+        returns a shared DecisionNode with the given step number and question
+        """
+        return self._get_node(
+            (DecisionNode, step_number, question),
+            lambda: create_trusted(
+                DecisionNode, step_number=self.intern_string(step_number), question=self.intern_string(question)
+            ),
+        )
+
+    def get_outcome_node(self, result_code: str, note: Optional[str]) -> OutcomeNode:
+        """
+        returns a shared OutcomeNode with the given result code and note
+        """
+        return self._get_node(
+            (OutcomeNode, result_code, note),
+            lambda: create_trusted(
+                OutcomeNode,
+                result_code=self.intern_string(result_code),
+                note=self.intern_string(note) if note is not None else None,
+            ),
+        )
+
+    def get_end_node(self) -> EndNode:
+        """
+        returns the shared EndNode
+        """
+        return self._get_node((EndNode,), EndNode)
+
+    def get_start_node(self) -> StartNode:
+        """
+        returns the shared StartNode
+        """
+        return self._get_node((StartNode,), StartNode)
+
+    def clear(self) -> None:
+        """
+        removes all entries from the table and resets the statistics
+        """
+        self._nodes.clear()
+        self._strings.clear()
+        self.hits = 0
+        self.misses = 0
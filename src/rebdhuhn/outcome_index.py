@@ -0,0 +1,121 @@
+"""
+This module contains a reverse index from the outcomes of an EbdGraph to the decisions that lead to them.
+It answers questions like "under which conditions does E_0462 return A12?" without walking the graph by hand: for each
+result code the index lists the decision nodes and the answers (yes/no) that lie on at least one path to the outcome.
+The index is computed in a single backward pass over the (loop-free) compact graph.
+"""
+
+from typing import Dict, Iterable, List
+
+import attrs
+
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind, get_compact_graph
+from rebdhuhn.models import DecisionNode, EbdGraph
+from rebdhuhn.reachability import _get_bit_positions, sort_topologically
+
+
+# pylint:disable=too-few-public-methods
+@attrs.define(auto_attribs=True, kw_only=True, frozen=True)
+class OutcomeCondition:
+    """
+    A decision and the answer that (directly or via subsequent steps) can lead to an outcome.
+    """
+
+    step_number: str
+    """
+    the step number of the decision node (e.g. '4')
+    """
+    question: str
+    """
+    the question of the decision node
+    """
+    answer: bool
+    """
+    the answer that leads (towards) the outcome ("ja" = True)
+    """
+    is_final: bool
+    """
+    true iff the answer leads to the outcome directly (i.e. it is the last decision before the outcome)
+    """
+
+
+class OutcomeIndex:
+    """
+    Maps the result code of each outcome of a compact graph to the conditions that lead to it.
+    The graph must not contain loops.
+    """
+
+    def __init__(self, graph: CompactEbdGraph):
+        self.graph = graph
+        #: the result codes of all outcomes (in the order of the nodes in the graph)
+        self.result_codes: List[str] = [
+            graph.keys[node] for node in range(len(graph)) if graph.kinds[node] == NodeKind.OUTCOME
+        ]
+        outcome_bits = {result_code: bit for bit, result_code in enumerate(self.result_codes)}
+        conditions: List[List[OutcomeCondition]] = [[] for _ in self.result_codes]
+        # the outcomes that can be reached from each node (as bit mask; bit i stands for result_codes[i])
+        reachable_outcomes: List[int] = [0] * len(graph)
+        for node in reversed(sort_topologically(graph)):
+            if graph.kinds[node] == NodeKind.OUTCOME:
+                reachable_outcomes[node] = 1 << outcome_bits[graph.keys[node]]
+                continue
+            if graph.kinds[node] != NodeKind.DECISION:
+                continue
+            decision_node = graph.nodes[node]
+            assert isinstance(decision_node, DecisionNode)
+            # the no-edge is visited first, so that the yes-edge comes first once the lists are reversed
+            for answer, successor in ((False, graph.no_successors[node]), (True, graph.yes_successors[node])):
+                if successor == NO_SUCCESSOR:
+                    continue
+                for bit in _get_bit_positions(reachable_outcomes[successor]):
+                    conditions[bit].append(
+                        OutcomeCondition(
+                            step_number=decision_node.step_number,
+                            question=decision_node.question,
+                            answer=answer,
+                            is_final=graph.kinds[successor] == NodeKind.OUTCOME,
+                        )
+                    )
+                reachable_outcomes[node] |= reachable_outcomes[successor]
+        # the backward pass visits the decisions in reversed topological order; the index lists them from the start on
+        self._conditions: Dict[str, List[OutcomeCondition]] = {
+            result_code: conditions[bit][::-1] for result_code, bit in outcome_bits.items()
+        }
+
+    def __contains__(self, result_code: object) -> bool:
+        return result_code in self._conditions
+
+    def get_conditions(self, result_code: str) -> List[OutcomeCondition]:
+        """
+        Returns all decisions (with the respective answer) that lie on at least one path to the outcome with the given
+        result code, in topological order (i.e. earlier steps first). Raises a KeyError for unknown result codes.
+        """
+        return list(self._conditions[result_code])
+
+    def get_final_conditions(self, result_code: str) -> List[OutcomeCondition]:
+        """
+        Returns only the decisions (with the respective answer) that lead to the given outcome directly.
+        """
+        return [condition for condition in self._conditions[result_code] if condition.is_final]
+
+
+def get_outcome_index(ebd_graph: EbdGraph) -> OutcomeIndex:
+    """
+    Returns the outcome index for the graph of the given EbdGraph. It is built once and cached on the EbdGraph.
+    """
+    return ebd_graph.get_derived_data("outcome_index", lambda: OutcomeIndex(get_compact_graph(ebd_graph)))
+
+
+def get_outcome_conditions_by_ebd_code(
+    ebd_graphs: Iterable[EbdGraph], result_code: str
+) -> Dict[str, List[OutcomeCondition]]:
+    """
+    Returns the conditions that lead to the given result code for each of the given graphs that has such an outcome
+    (e.g. all graphs of an `EbdTableCorpus`). The keys are the EBD codes (e.g. 'E_0462').
+    """
+    result: Dict[str, List[OutcomeCondition]] = {}
+    for ebd_graph in ebd_graphs:
+        outcome_index = get_outcome_index(ebd_graph)
+        if result_code in outcome_index:
+            result[ebd_graph.metadata.ebd_code] = outcome_index.get_conditions(result_code)
+    return result
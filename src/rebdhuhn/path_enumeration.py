@@ -0,0 +1,151 @@
+"""
+This module contains a streaming enumeration of the decision paths through an EbdGraph.
+The number of paths grows exponentially with the number of merging branches. Therefore, the paths are generated one by
+one (instead of materializing a list of all paths) and the enumeration is protected by a budget (number of paths, depth
+and wall-clock time), so that a single pathological graph cannot stall an entire batch.
+"""
+
+import time
+from typing import Iterator, List, Optional, Set, Tuple
+
+import attrs
+
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind, get_compact_graph
+from rebdhuhn.models import DecisionNode, EbdGraph
+from rebdhuhn.models.errors import PathEnumerationBudgetExceededError
+
+
+# pylint:disable=too-few-public-methods
+@attrs.define(auto_attribs=True, kw_only=True, frozen=True)
+class PathEnumerationBudget:
+    """
+    Limits the enumeration of paths. If any of the limits is exceeded, a `PathEnumerationBudgetExceededError` is
+    raised. A limit of None means that there is no such limit.
+    """
+
+    max_number_of_paths: Optional[int] = attrs.field(
+        default=None, validator=attrs.validators.optional(attrs.validators.ge(1))
+    )
+    """
+    the maximum number of paths that may be found
+    """
+    max_depth: Optional[int] = attrs.field(default=None, validator=attrs.validators.optional(attrs.validators.ge(1)))
+    """
+    the maximum number of nodes a path may pass (the start node excluded)
+    """
+    max_seconds: Optional[float] = attrs.field(
+        default=None, validator=attrs.validators.optional(attrs.validators.gt(0))
+    )
+    """
+    the maximum (wall-clock) duration of the entire enumeration in seconds
+    """
+
+
+class _BudgetTracker:
+    """
+    keeps track of the resources used by an enumeration and raises an error as soon as the budget is exceeded
+    """
+
+    def __init__(self, budget: Optional[PathEnumerationBudget]):
+        self.budget = budget or PathEnumerationBudget()
+        self.deadline: Optional[float] = None
+        if self.budget.max_seconds is not None:
+            self.deadline = time.monotonic() + self.budget.max_seconds
+        self.number_of_paths = 0
+
+    def check_time(self) -> None:
+        """
+        raises an error if the time is up
+        """
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise PathEnumerationBudgetExceededError("max_seconds", self.budget.max_seconds)  # type:ignore[arg-type]
+
+    def check_depth(self, depth: int) -> None:
+        """
+        raises an error if the given depth is too deep
+        """
+        if self.budget.max_depth is not None and depth > self.budget.max_depth:
+            raise PathEnumerationBudgetExceededError("max_depth", self.budget.max_depth)
+
+    def add_path(self) -> None:
+        """
+        counts a found path and raises an error if there are too many paths
+        """
+        self.number_of_paths += 1
+        if self.budget.max_number_of_paths is not None and self.number_of_paths > self.budget.max_number_of_paths:
+            raise PathEnumerationBudgetExceededError("max_number_of_paths", self.budget.max_number_of_paths)
+
+
+@attrs.define(auto_attribs=True, kw_only=True, frozen=True)
+class DecisionPath:
+    """
+    A path from the start node to an outcome (or the end node) with the answers given at each decision node.
+    """
+
+    answers: Tuple[Tuple[str, bool], ...]
+    """
+    the step numbers of the decision nodes along the path and the answer ("ja" = True) that leads to the next node
+    """
+    end_key: str
+    """
+    the key of the last node of the path; i.e. a result code (e.g. 'A01') or 'Ende'
+    """
+
+
+def _get_answers(graph: CompactEbdGraph, node: int) -> List[Tuple[bool, int]]:
+    """
+    returns the possible answers of a decision node and their targets (yes first)
+    """
+    return [
+        (answer, successor)
+        for answer, successor in ((True, graph.yes_successors[node]), (False, graph.no_successors[node]))
+        if successor != NO_SUCCESSOR
+    ]
+
+
+def iter_decision_paths(ebd_graph: EbdGraph, budget: Optional[PathEnumerationBudget] = None) -> Iterator[DecisionPath]:
+    """
+    Yields all paths from the start node to an outcome or the end node one after another (in depth-first order,
+    the yes-branch before the no-branch). No node is visited twice within one path.
+    Raises a `PathEnumerationBudgetExceededError` as soon as the given budget is exceeded; the paths yielded until then
+    are valid.
+    """
+    tracker = _BudgetTracker(budget)
+    graph = get_compact_graph(ebd_graph)
+    if graph.start_successor == NO_SUCCESSOR:
+        return
+    path: List[int] = [graph.start_successor]
+    answers: List[Tuple[str, bool]] = []
+    visited: Set[int] = {graph.start_successor}
+    # each stack entry holds the answers of the respective decision node in `path` that have not been followed yet
+    stack: List[List[Tuple[bool, int]]] = []
+    if graph.kinds[graph.start_successor] == NodeKind.DECISION:
+        stack.append(_get_answers(graph, graph.start_successor))
+    else:
+        tracker.add_path()
+        yield DecisionPath(answers=(), end_key=graph.keys[graph.start_successor])
+    while stack:
+        tracker.check_time()
+        open_answers = stack[-1]
+        if not open_answers:
+            stack.pop()
+            visited.discard(path.pop())
+            if answers:
+                answers.pop()
+            continue
+        answer, successor = open_answers.pop(0)
+        if successor in visited:
+            continue
+        decision_node = graph.nodes[path[-1]]
+        assert isinstance(decision_node, DecisionNode)
+        tracker.check_depth(len(path) + 1)
+        if graph.kinds[successor] != NodeKind.DECISION:
+            tracker.add_path()
+            yield DecisionPath(
+                answers=tuple(answers) + ((decision_node.step_number, answer),), end_key=graph.keys[successor]
+            )
+            continue
+        answers.append((decision_node.step_number, answer))
+        path.append(successor)
+        visited.add(successor)
+        stack.append(_get_answers(graph, successor))
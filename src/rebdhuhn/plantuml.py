@@ -3,13 +3,15 @@ This module contains logic to convert EbdGraph data to plantuml code and further
 """
 
 from collections import namedtuple
+from typing import Dict, List, Optional
 
 import requests  # pylint: disable=import-error
-from networkx import DiGraph  # type:ignore[import]
 
-from rebdhuhn.graph_utils import COMMON_ANCESTOR_FIELD, _get_yes_no_edges, _mark_last_common_ancestors
-from rebdhuhn.models import DecisionNode, EbdGraph, EndNode, OutcomeNode
-from rebdhuhn.models.errors import GraphTooComplexForPlantumlError, NotExactlyTwoOutgoingEdgesError
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind
+from rebdhuhn.graph_utils import get_cached_last_common_ancestors, get_compact_graph, get_last_common_ancestors
+from rebdhuhn.models import DecisionNode, EbdGraph, EbdGraphMetaData, OutcomeNode
+from rebdhuhn.models.errors import GraphTooComplexForPlantumlError
+from rebdhuhn.subgraph_sharing import share_identical_subgraphs
 
 ADD_INDENT = "    "  #: This is just for style purposes to make the plantuml files human-readable.
 
@@ -22,7 +24,7 @@ def _escape_for_plantuml(input_str: str) -> str:
     return input_str.replace(")", "&#41;")
 
 
-def _draw_node1_below_node2(graph: DiGraph, node1: str, node2: str) -> bool:
+def _draw_node1_below_node2(graph: CompactEbdGraph, node1: int, node2: int) -> bool:
     """
     Used in `_convert_decision_node_to_plantuml`. Decides if `node1` should be drawn under `node2`.
     This is the case if `node1` is a `DecisionNode` and `node2` is either an `OutcomeNode` or an `EndNode`
@@ -30,28 +32,27 @@ def _draw_node1_below_node2(graph: DiGraph, node1: str, node2: str) -> bool:
     This kind of workaround is used just for layout purposes.
     """
     return (
-        isinstance(graph.nodes[node1]["node"], DecisionNode)
-        and isinstance(graph.nodes[node2]["node"], (OutcomeNode, EndNode))
-        and graph.in_degree(node2) == 1
+        graph.kinds[node1] == NodeKind.DECISION
+        and graph.kinds[node2] in (NodeKind.OUTCOME, NodeKind.END)
+        and graph.in_degrees[node2] == 1
     )
 
 
-def _convert_end_node_to_plantuml(graph: DiGraph, node: str, indent: str) -> str:
+def _convert_end_node_to_plantuml(graph: CompactEbdGraph, node: int, indent: str) -> str:
     """
     Converts an EndNode to plantuml code.
     """
-    end_node: EndNode = graph.nodes[node]["node"]
-    assert isinstance(end_node, EndNode), f"{node} is not an end node."
+    assert graph.kinds[node] == NodeKind.END, f"{graph.keys[node]} is not an end node."
 
     return f"{indent}end\n"
 
 
-def _convert_outcome_node_to_plantuml(graph: DiGraph, node: str, indent: str) -> str:
+def _convert_outcome_node_to_plantuml(graph: CompactEbdGraph, node: int, indent: str) -> str:
     """
     Converts an OutcomeNode to plantuml code.
     """
-    outcome_node: OutcomeNode = graph.nodes[node]["node"]
-    assert isinstance(outcome_node, OutcomeNode), f"{node} is not an outcome node."
+    outcome_node = graph.nodes[node]
+    assert isinstance(outcome_node, OutcomeNode), f"{graph.keys[node]} is not an outcome node."
 
     result = f"{indent}:{outcome_node.result_code};\n"
     if outcome_node.note is not None:
@@ -60,7 +61,9 @@ def _convert_outcome_node_to_plantuml(graph: DiGraph, node: str, indent: str) ->
     return f"{result}{indent}kill;\n"
 
 
-def _convert_decision_node_to_plantuml(graph: DiGraph, node: str, indent: str) -> str:
+def _convert_decision_node_to_plantuml(
+    graph: CompactEbdGraph, common_ancestors: Dict[int, List[int]], node: int, indent: str
+) -> str:
     """
     Converts a DecisionNode to plantuml code.
     DecisionNodes will be converted to a nested if-else structure with the if-branch as the yes-edge and the else-branch
@@ -71,77 +74,75 @@ def _convert_decision_node_to_plantuml(graph: DiGraph, node: str, indent: str) -
     Additionally, the same technique will be used to simply draw DecisionNodes below OutcomeNodes since OutcomeNodes
     doesn't have any following nodes. This will improve the layout drastically for EBDs like E_0015.
     """
-    decision_node: DecisionNode = graph.nodes[node]["node"]
-    assert isinstance(decision_node, DecisionNode), f"{node} is not a decision node."
-    if graph.out_degree(node) != 2:
-        raise NotExactlyTwoOutgoingEdgesError(
-            f"A decision node must have exactly two outgoing edges (yes / no) but has {graph.out_degree(node)}",
-            str(decision_node),
-            [str(x) for x in graph[node].values()],
-        )
-    yes_edge, no_edge = _get_yes_no_edges(graph, node)
-    yes_node = str(yes_edge.target)
-    no_node = str(no_edge.target)
+    decision_node = graph.nodes[node]
+    assert isinstance(decision_node, DecisionNode), f"{graph.keys[node]} is not a decision node."
+    # all decision nodes have been checked for their two outgoing edges before
+    yes_node, no_node = graph.yes_successors[node], graph.no_successors[node]
 
     Cases = namedtuple("Cases", "yes_below_no no_below_yes common_ancestor")
     cases = Cases(
         _draw_node1_below_node2(graph, yes_node, no_node),
         _draw_node1_below_node2(graph, no_node, yes_node),
-        COMMON_ANCESTOR_FIELD in graph.nodes[node],
+        node in common_ancestors,
     )
     assert cases.count(True) <= 1, "This cannot actually fail."
 
     result = (
         f"{indent}if (<b>{decision_node.step_number}: </b> {_escape_for_plantuml(decision_node.question)}) then (ja)\n"
     )
-    if not cases.yes_below_no and not graph.in_degree(yes_node) > 1:
+    if not cases.yes_below_no and not graph.in_degrees[yes_node] > 1:
         # Draw the following node here only if it shouldn't be drawn under the no-branch and if it isn't a node with
         # indegree > 1.
-        result += _convert_node_to_plantuml(graph, yes_node, indent + ADD_INDENT)
+        result += _convert_node_to_plantuml(graph, common_ancestors, yes_node, indent + ADD_INDENT)
     result += f"{indent}else (nein)\n"
-    if not cases.no_below_yes and not graph.in_degree(no_node) > 1:
+    if not cases.no_below_yes and not graph.in_degrees[no_node] > 1:
         # Draw the following node here only if it shouldn't be drawn under the yes-branch and if it isn't a node with
         # indegree > 1.
-        result += _convert_node_to_plantuml(graph, no_node, indent + ADD_INDENT)
+        result += _convert_node_to_plantuml(graph, common_ancestors, no_node, indent + ADD_INDENT)
     result += f"{indent}endif\n"
 
     # Appendix part
     if cases.yes_below_no:
-        result += _convert_decision_node_to_plantuml(graph, yes_node, indent)
+        result += _convert_decision_node_to_plantuml(graph, common_ancestors, yes_node, indent)
     elif cases.no_below_yes:
-        result += _convert_decision_node_to_plantuml(graph, no_node, indent)
+        result += _convert_decision_node_to_plantuml(graph, common_ancestors, no_node, indent)
     elif cases.common_ancestor:
-        if len(graph.nodes[node][COMMON_ANCESTOR_FIELD]) != 1:
+        if len(common_ancestors[node]) != 1:
             # This is not supported by the plantuml converter. However, if you remove this raise statement, the
             # converter may work even may produce valid puml. The last time I tried this resulted in copied regions
             # inside the graph. So, really complex graphs would get insanely big.
             raise GraphTooComplexForPlantumlError
-        result += _convert_node_to_plantuml(graph, graph.nodes[node][COMMON_ANCESTOR_FIELD][0], indent)
+        result += _convert_node_to_plantuml(graph, common_ancestors, common_ancestors[node][0], indent)
     return result
 
 
-def _convert_node_to_plantuml(graph: DiGraph, node: str, indent: str) -> str:
+def _convert_node_to_plantuml(
+    graph: CompactEbdGraph, common_ancestors: Dict[int, List[int]], node: int, indent: str
+) -> str:
     """
     A shorthand to convert an arbitrary node to plantuml code. It just determines the node type and calls the
     respective function.
     """
-    match graph.nodes[node]["node"]:
-        case DecisionNode():
-            return _convert_decision_node_to_plantuml(graph, node, indent)
-        case OutcomeNode():
+    match graph.kinds[node]:
+        case NodeKind.DECISION:
+            return _convert_decision_node_to_plantuml(graph, common_ancestors, node, indent)
+        case NodeKind.OUTCOME:
             return _convert_outcome_node_to_plantuml(graph, node, indent)
-        case EndNode():
+        case NodeKind.END:
             return _convert_end_node_to_plantuml(graph, node, indent)
         case _:
-            raise ValueError(f"Unknown node type: {graph[node]['node']}")
+            raise ValueError(f"Unknown node type: {graph.nodes[node]}")
 
 
-def convert_graph_to_plantuml(graph: EbdGraph) -> str:
+def convert_compact_graph_to_plantuml(
+    graph: CompactEbdGraph, metadata: EbdGraphMetaData, common_ancestors: Optional[Dict[int, List[int]]] = None
+) -> str:
     """
-    Converts given graph to plantuml code and returns it as a string.
+    Converts the compact representation of an EbdGraph (and its metadata) to plantuml code and returns it as a string.
+    The last common ancestors (see `get_last_common_ancestors`) are calculated, if they are not provided.
     """
-    nx_graph = graph.graph
-    _mark_last_common_ancestors(nx_graph)
+    if common_ancestors is None:
+        common_ancestors = get_last_common_ancestors(graph)
     plantuml_code: str = (
         "@startuml\n"
         "skinparam Shadowing false\n"
@@ -165,30 +166,38 @@ def convert_graph_to_plantuml(graph: EbdGraph) -> str:
         "endheader\n"
         "\n"
         "title\n"
-        f"{graph.metadata.chapter}\n"
+        f"{metadata.chapter}\n"
         "\n"
-        f"{graph.metadata.sub_chapter}\n"
+        f"{metadata.sub_chapter}\n"
         "\n"
         "\n"
         "\n"
         "end title\n"
-        f":<b>{graph.metadata.ebd_code}</b>;\n"
+        f":<b>{metadata.ebd_code}</b>;\n"
         "note right\n"
-        f"<b><i>Prüfende Rolle: {graph.metadata.role}\n"
+        f"<b><i>Prüfende Rolle: {metadata.role}\n"
         "end note\n"
         "\n"
     )
-    assert len(nx_graph["Start"]) == 1, "Start node must have exactly one outgoing edge."
-    key_of_first_node: str
-    if "1" in nx_graph["Start"]:
-        key_of_first_node = "1"
-    else:
-        key_of_first_node = list(nx_graph["Start"].keys())[0]
-    plantuml_code += _convert_node_to_plantuml(nx_graph, key_of_first_node, "")
+    assert graph.start_successor != NO_SUCCESSOR, "Start node must have exactly one outgoing edge."
+    graph.check_decision_nodes()
+    plantuml_code += _convert_node_to_plantuml(graph, common_ancestors, graph.start_successor, "")
 
     return plantuml_code + "\n@enduml\n"
 
 
+def convert_graph_to_plantuml(graph: EbdGraph, share_subgraphs: bool = False) -> str:
+    """
+    Converts given graph to plantuml code and returns it as a string.
+    If share_subgraphs is True, structurally identical subgraphs are drawn only once (see `share_identical_subgraphs`).
+    """
+    if share_subgraphs:
+        graph = share_identical_subgraphs(graph)
+    return convert_compact_graph_to_plantuml(
+        get_compact_graph(graph), graph.metadata, get_cached_last_common_ancestors(graph)
+    )
+
+
 def convert_plantuml_to_svg_kroki(plantuml_code: str) -> str:
     """
     Converts plantuml code to svg (code) and returns the result as string. It uses kroki.io.
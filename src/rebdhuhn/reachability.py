@@ -0,0 +1,125 @@
+"""
+This module contains a precomputed reachability index for EbdGraphs.
+The index stores a topological order of the nodes and, for each node, the sets of its descendants and ancestors as
+integer bit masks (bit i stands for the node with index i in the compact graph). Questions like "does step X ever lead
+to A55?" or "which steps can never be reached?" are then answered without traversing the graph again.
+"""
+
+from collections import deque
+from typing import Deque, List
+
+from rebdhuhn.compact_graph import CompactEbdGraph, NodeKind, get_compact_graph
+from rebdhuhn.models import EbdGraph
+
+
+def _get_bit_positions(bit_mask: int) -> List[int]:
+    """
+    returns the positions of all set bits in ascending order
+    """
+    positions: List[int] = []
+    while bit_mask:
+        lowest_bit = bit_mask & -bit_mask
+        positions.append(lowest_bit.bit_length() - 1)
+        bit_mask ^= lowest_bit
+    return positions
+
+
+def sort_topologically(graph: CompactEbdGraph) -> List[int]:
+    """
+    returns the indices of all nodes, such that every node comes before its successors (Kahn's algorithm)
+    raises a ValueError if the graph contains a loop
+    """
+    in_degrees = list(graph.in_degrees)
+    queue: Deque[int] = deque(node for node in range(len(graph)) if in_degrees[node] == 0)
+    order: List[int] = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for successor in graph.get_successors(node):
+            in_degrees[successor] -= 1
+            if in_degrees[successor] == 0:
+                queue.append(successor)
+    if len(order) != len(graph):
+        raise ValueError("The graph contains a loop and cannot be sorted topologically")
+    return order
+
+
+class ReachabilityIndex:
+    """
+    The topological order and the descendants/ancestors of every node of a compact graph.
+    Building the index takes O(V+E) big integer operations (each of which is O(V/64)); the queries are O(1) or O(V/64).
+    The graph must not contain loops.
+    """
+
+    def __init__(self, graph: CompactEbdGraph):
+        self.graph = graph
+        #: the indices of all nodes, such that every node comes before its successors
+        self.topological_order: List[int] = sort_topologically(graph)
+        #: the nodes that can be reached from each node (as bit mask; the node itself is not included)
+        self.descendants: List[int] = [0] * len(graph)
+        #: the nodes from which each node can be reached (as bit mask; the node itself is not included)
+        self.ancestors: List[int] = [0] * len(graph)
+        for node in reversed(self.topological_order):
+            for successor in graph.get_successors(node):
+                self.descendants[node] |= (1 << successor) | self.descendants[successor]
+        for node in self.topological_order:
+            for successor in graph.get_successors(node):
+                self.ancestors[successor] |= (1 << node) | self.ancestors[node]
+
+    def _to_keys(self, bit_mask: int) -> List[str]:
+        return [self.graph.keys[node] for node in _get_bit_positions(bit_mask)]
+
+    def get_topological_order(self) -> List[str]:
+        """
+        returns the keys of all nodes in topological order
+        """
+        return [self.graph.keys[node] for node in self.topological_order]
+
+    def is_descendant(self, node_key: str, ancestor_key: str) -> bool:
+        """
+        returns true iff the node can be reached from the ancestor (a node is not its own descendant)
+        """
+        return bool(self.descendants[self.graph.get_index(ancestor_key)] >> self.graph.get_index(node_key) & 1)
+
+    def leads_to(self, step_key: str, outcome_key: str) -> bool:
+        """
+        returns true iff there is a path from the given step to the given outcome (e.g. `leads_to("4", "A55")`)
+        """
+        return self.is_descendant(outcome_key, step_key)
+
+    def get_descendants(self, key: str) -> List[str]:
+        """
+        returns the keys of all nodes that can be reached from the given node (in the order of the nodes in the graph)
+        """
+        return self._to_keys(self.descendants[self.graph.get_index(key)])
+
+    def get_ancestors(self, key: str) -> List[str]:
+        """
+        returns the keys of all nodes from which the given node can be reached (in the order of the nodes in the graph)
+        """
+        return self._to_keys(self.ancestors[self.graph.get_index(key)])
+
+    def get_reachable_outcomes(self, key: str) -> List[str]:
+        """
+        returns the result codes of all outcomes that can be reached from the given node
+        """
+        return [
+            self.graph.keys[node]
+            for node in _get_bit_positions(self.descendants[self.graph.get_index(key)])
+            if self.graph.kinds[node] == NodeKind.OUTCOME
+        ]
+
+    def get_unreachable_nodes(self) -> List[str]:
+        """
+        returns the keys of all nodes that cannot be reached from the start node (i.e. dead steps and outcomes)
+        """
+        reachable = self.descendants[self.graph.start] | (1 << self.graph.start)
+        unreachable = ((1 << len(self.graph)) - 1) & ~reachable
+        return self._to_keys(unreachable)
+
+
+def get_reachability_index(ebd_graph: EbdGraph) -> ReachabilityIndex:
+    """
+    Returns the reachability index for the graph of the given EbdGraph. It is built once and cached on the EbdGraph.
+    """
+    return ebd_graph.get_derived_data("reachability_index", lambda: ReachabilityIndex(get_compact_graph(ebd_graph)))
@@ -0,0 +1,108 @@
+"""
+This module contains a canonicalization of EbdGraphs that detects structurally identical subgraphs.
+Many EBDs contain identical tails: the same chain of questions (under different step numbers) that ends in the same
+outcomes. Each node gets a structural id by hash-consing: a decision node is identified by its question and the
+structural ids of its yes- and no-successor (and the notes of these edges), an outcome by its result code. Two nodes
+have the same structural id iff the subgraphs below them are identical. Replacing each node by the first node with the
+same structural id yields a (smaller) graph in which the identical subgraphs are shared.
+"""
+
+from typing import Dict, List, Tuple
+
+from networkx import DiGraph  # type:ignore[import]
+
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind, get_compact_graph
+from rebdhuhn.models import DecisionNode, EbdGraph, create_trusted
+from rebdhuhn.reachability import sort_topologically
+
+
+def get_structural_ids(graph: CompactEbdGraph) -> List[int]:
+    """
+    Returns the structural id of each node. Nodes with the same id are the roots of identical subgraphs.
+    The ids are assigned in one backward pass (hash-consing), so this takes O(V+E). The graph must not contain loops.
+    """
+    # maps the signature of a node (which contains the ids of its successors) to its id
+    known_signatures: Dict[Tuple, int] = {}
+    structural_ids: List[int] = [NO_SUCCESSOR] * len(graph)
+    for node in reversed(sort_topologically(graph)):
+        signature: Tuple
+        kind = graph.kinds[node]
+        if kind == NodeKind.DECISION:
+            decision_node = graph.nodes[node]
+            assert isinstance(decision_node, DecisionNode)
+            signature = (kind, decision_node.question)
+            for successor in (graph.yes_successors[node], graph.no_successors[node]):
+                if successor == NO_SUCCESSOR:
+                    signature += (NO_SUCCESSOR, None)
+                else:
+                    signature += (structural_ids[successor], graph.get_edge_note(node, successor))
+        elif kind == NodeKind.OUTCOME:
+            signature = (kind, graph.keys[node])
+        elif kind == NodeKind.END:
+            signature = (kind,)
+        else:
+            signature = (kind, node)  # the start node is never shared
+        structural_ids[node] = known_signatures.setdefault(signature, len(known_signatures))
+    return structural_ids
+
+
+def get_identical_subgraphs(ebd_graph: EbdGraph) -> List[List[str]]:
+    """
+    Returns the keys of the decision nodes that are the roots of identical subgraphs, grouped by subgraph
+    (e.g. [['5', '9']] if the steps 5 and 9 ask the same questions and lead to the same outcomes).
+    The groups and the keys within each group are in the order of the nodes in the graph; if two identical subgraphs
+    contain identical subgraphs themselves, these are reported as well.
+    """
+    graph = get_compact_graph(ebd_graph)
+    groups: Dict[int, List[str]] = {}
+    for node, structural_id in enumerate(get_structural_ids(graph)):
+        if graph.kinds[node] == NodeKind.DECISION:
+            groups.setdefault(structural_id, []).append(graph.keys[node])
+    return [keys for keys in groups.values() if len(keys) > 1]
+
+
+def _share_identical_subgraphs(graph: CompactEbdGraph) -> DiGraph:
+    """
+    creates a networkx graph in which every edge points to the first node with the same structural id as its target
+    """
+    structural_ids = get_structural_ids(graph)
+    representatives: Dict[int, int] = {}
+    for node, structural_id in enumerate(structural_ids):
+        representatives.setdefault(structural_id, node)
+    # the targets of the edges of each node that can be reached from the start node in the shared graph
+    shared_targets: Dict[int, List[Tuple[int, int]]] = {}
+    stack: List[int] = [graph.start]
+    while stack:
+        source = stack.pop()
+        targets = [(target, representatives[structural_ids[target]]) for target in graph.get_successors(source)]
+        if len({shared_target for _, shared_target in targets}) < len(targets):
+            # the yes- and the no-edge would point to the same node (which a DiGraph cannot hold), so they are kept
+            targets = [(target, target) for target, _ in targets]
+        shared_targets[source] = targets
+        stack.extend(shared_target for _, shared_target in targets if shared_target not in shared_targets)
+    result: DiGraph = DiGraph()
+    kept_nodes = [node for node in range(len(graph)) if node in shared_targets]
+    result.add_nodes_from((graph.keys[node], {"node": graph.nodes[node]}) for node in kept_nodes)
+    for source in kept_nodes:
+        for target, shared_target in shared_targets[source]:
+            edge = graph.get_edge(source, target)
+            if shared_target != target:
+                edge = create_trusted(type(edge), source=edge.source, target=graph.nodes[shared_target], note=edge.note)
+            result.add_edge(graph.keys[source], graph.keys[shared_target], edge=edge)
+    return result
+
+
+def share_identical_subgraphs(ebd_graph: EbdGraph) -> EbdGraph:
+    """
+    Returns an EbdGraph in which identical subgraphs are contained only once: the edges to the root of a duplicate
+    subgraph point to the first identical subgraph instead (the step numbers of the duplicates are dropped).
+    The node objects are shared with the original graph. The result is cached on the given EbdGraph.
+    """
+    return ebd_graph.get_derived_data(
+        "shared_graph",
+        lambda: EbdGraph(
+            metadata=ebd_graph.metadata,
+            graph=_share_identical_subgraphs(get_compact_graph(ebd_graph)),
+            multi_step_instructions=ebd_graph.multi_step_instructions,
+        ),
+    )
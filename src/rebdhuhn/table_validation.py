@@ -0,0 +1,117 @@
+"""
+This module contains a pre-flight check for the conversion of EbdTables to EbdGraphs.
+The conversion stops at the first problem it encounters. The check in this module walks each table once and reports
+all problems that would make the conversion fail, each with its location in the table. This allows to triage an entire
+(freshly scraped) corpus of tables in one go.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from rebdhuhn.graph_conversion import _convert_row_to_decision_node, _create_sub_row_without_target_error, _find_loop
+from rebdhuhn.models import EbdTable, OutcomeNode, create_trusted
+from rebdhuhn.models.errors import (
+    GraphContainsLoopError,
+    OutcomeCodeAmbiguousError,
+    OutcomeNodeCreationError,
+    SubsequentStepNotFoundError,
+)
+
+
+def _get_loop_error(
+    table: EbdTable, references: List[Tuple[int, int, str, str]]
+) -> Optional[Tuple[Tuple[int, int], str, GraphContainsLoopError]]:
+    """
+    Returns the error for a loop in the references to subsequent steps (or None if there is no loop).
+    The loop is reported at the reference that closes it.
+    """
+    step_numbers = {row.step_number for row in table.rows}
+    successors: Dict[str, List[str]] = {row.step_number: [] for row in table.rows}
+    for _, _, step_number, subsequent_step_number in references:
+        if subsequent_step_number in step_numbers:
+            successors[step_number].append(subsequent_step_number)
+    loop = _find_loop(successors)
+    if loop is None:
+        return None
+    row_index, sub_row_index = next(
+        (row_index, sub_row_index)
+        for row_index, sub_row_index, step_number, subsequent_step_number in references
+        if (step_number, subsequent_step_number) == (loop[-1], loop[0])
+    )
+    return (
+        (row_index, sub_row_index),
+        f"{table.metadata.ebd_code}.rows[{row_index}].sub_rows[{sub_row_index}].check_result.subsequent_step_number",
+        GraphContainsLoopError(loop),
+    )
+
+
+# pylint:disable=too-many-locals
+def _collect_conversion_errors(table: EbdTable, errors: List[Tuple[str, Exception]]) -> None:
+    """
+    Appends the conversion errors of a single table to `errors` (in the order of the rows and sub rows).
+    """
+    ebd_code = table.metadata.ebd_code
+    # the errors are collected together with the (row index, sub row index), so that they can be sorted at the end
+    table_errors: List[Tuple[Tuple[int, int], str, Exception]] = []
+    step_numbers: Set[str] = set()
+    outcome_nodes: Dict[str, OutcomeNode] = {}
+    # the references to subsequent steps are checked after all rows have been visited
+    references: List[Tuple[int, int, str, str]] = []
+    for row_index, row in enumerate(table.rows):
+        row_location = f"{ebd_code}.rows[{row_index}]"
+        step_numbers.add(row.step_number)
+        row_error_found = False
+        for sub_row_index, sub_row in enumerate(row.sub_rows):
+            subsequent_step_number = sub_row.check_result.subsequent_step_number
+            if subsequent_step_number is not None:
+                if subsequent_step_number != "Ende":
+                    references.append((row_index, sub_row_index, row.step_number, subsequent_step_number))
+                continue
+            sub_row_location = f"{row_location}.sub_rows[{sub_row_index}]"
+            if sub_row.result_code is not None:
+                outcome_node = create_trusted(OutcomeNode, result_code=sub_row.result_code, note=sub_row.note)
+                known_outcome_node = outcome_nodes.setdefault(sub_row.result_code, outcome_node)
+                if known_outcome_node.note != outcome_node.note:
+                    table_errors.append(
+                        (
+                            (row_index, sub_row_index),
+                            sub_row_location,
+                            OutcomeCodeAmbiguousError(outcome_node1=known_outcome_node, outcome_node2=outcome_node),
+                        )
+                    )
+                continue
+            error = _create_sub_row_without_target_error(row, sub_row, _convert_row_to_decision_node(row))
+            if isinstance(error, OutcomeNodeCreationError):
+                table_errors.append(((row_index, sub_row_index), sub_row_location, error))
+            elif not row_error_found:
+                # the other errors concern the entire row, so they are reported only once
+                table_errors.append(((row_index, -1), row_location, error))
+                row_error_found = True
+    for row_index, sub_row_index, step_number, subsequent_step_number in references:
+        if subsequent_step_number not in step_numbers:
+            table_errors.append(
+                (
+                    (row_index, sub_row_index),
+                    f"{ebd_code}.rows[{row_index}].sub_rows[{sub_row_index}].check_result.subsequent_step_number",
+                    SubsequentStepNotFoundError(step_number=step_number, subsequent_step_number=subsequent_step_number),
+                )
+            )
+    loop_error = _get_loop_error(table, references)
+    if loop_error is not None:
+        table_errors.append(loop_error)
+    table_errors.sort(key=lambda table_error: table_error[0])
+    errors.extend((location, error) for _, location, error in table_errors)
+
+
+def get_conversion_errors(tables: Union[EbdTable, Iterable[EbdTable]]) -> List[Tuple[str, Exception]]:
+    """
+    Checks the given table(s) for all problems that would make `convert_table_to_graph` fail and returns them together
+    with their location (e.g. 'E_0003.rows[1].sub_rows[0]'). An empty list means, that all tables can be converted.
+    The errors are the same that the conversion would raise (e.g. `OutcomeCodeAmbiguousError`), but nothing is raised.
+    The tables are expected to be valid models; use `get_validation_errors` to check that.
+    """
+    errors: List[Tuple[str, Exception]] = []
+    if isinstance(tables, EbdTable):
+        tables = [tables]
+    for table in tables:
+        _collect_conversion_errors(table, errors)
+    return errors
@@ -0,0 +1,125 @@
+"""
+Contains synthetic EbdTables (and graphs) that are not taken from the EDI@Energy documents but are constructed to test
+special structures, e.g. tables with exponentially many paths.
+"""
+
+from typing import List, Optional
+
+from networkx import DiGraph  # type:ignore[import]
+
+from rebdhuhn.graph_conversion import get_all_nodes_and_edges
+from rebdhuhn.models import EbdCheckResult, EbdTable, EbdTableMetaData, EbdTableRow, EbdTableSubRow
+from rebdhuhn.models.ebd_table import MultiStepInstruction
+
+from .e0266 import table_e0266
+
+
+def create_row(step_number: str, question: str, yes: str, no: str) -> EbdTableRow:
+    """
+    creates a row whose answers lead to the given subsequent steps or (if they start with an 'A') result codes
+    """
+    sub_rows: List[EbdTableSubRow] = []
+    for result, target in [(True, yes), (False, no)]:
+        result_code: Optional[str] = target if target.startswith("A") else None
+        sub_rows.append(
+            EbdTableSubRow(
+                check_result=EbdCheckResult(
+                    result=result, subsequent_step_number=None if result_code is not None else target
+                ),
+                result_code=result_code,
+                note=None if result_code is None else f"Cluster: Ablehnung {result_code}",
+            )
+        )
+    return EbdTableRow(step_number=step_number, description=question, sub_rows=sub_rows)
+
+
+def create_ladder_table(number_of_steps: int) -> EbdTable:
+    """
+    creates a table in which every step 'n' points to the steps 'n+1' and 'n+2', so that the number of paths grows
+    exponentially with the number of steps
+    """
+    rows: List[EbdTableRow] = []
+    for step in range(1, number_of_steps + 1):
+        yes_step = str(step + 1) if step < number_of_steps else "Ende"
+        no_step = str(step + 2) if step < number_of_steps - 1 else None
+        rows.append(
+            EbdTableRow(
+                step_number=str(step),
+                description=f"Frage {step}?",
+                sub_rows=[
+                    EbdTableSubRow(
+                        check_result=EbdCheckResult(result=True, subsequent_step_number=yes_step),
+                        result_code=None,
+                        note=None,
+                    ),
+                    EbdTableSubRow(
+                        check_result=EbdCheckResult(result=False, subsequent_step_number=no_step),
+                        result_code=None if no_step is not None else f"A{step:02d}",
+                        note=None,
+                    ),
+                ],
+            )
+        )
+    return EbdTable(
+        metadata=EbdTableMetaData(ebd_code="E_9999", chapter="Kapitel", sub_chapter="Unterkapitel", role="NB"),
+        rows=rows,
+    )
+
+
+def create_digraph_with_loops() -> DiGraph:
+    """
+    creates the graph of E_0266 (which contains loops) without the loop check of `convert_table_to_digraph`
+    """
+    nodes, edges = get_all_nodes_and_edges(table_e0266)
+    graph = DiGraph()
+    graph.add_nodes_from([(node.get_key(), {"node": node}) for node in nodes])
+    graph.add_edges_from([(edge.source.get_key(), edge.target.get_key(), {"edge": edge}) for edge in edges])
+    return graph
+
+
+table_with_identical_tails = EbdTable(
+    metadata=EbdTableMetaData(ebd_code="E_9998", chapter="Kapitel", sub_chapter="Unterkapitel", role="NB"),
+    rows=[
+        create_row("1", "Ist es eine Anmeldung?", yes="2", no="6"),
+        create_row("2", "Ist die Frist eingehalten?", yes="3", no="A01"),
+        create_row("3", "Ist der Zählpunkt bekannt?", yes="Ende", no="A02"),
+        create_row("4", "Ist die Frist eingehalten?", yes="5", no="A01"),
+        create_row("5", "Ist der Zählpunkt bekannt?", yes="Ende", no="A02"),
+        create_row("6", "Ist es eine Abmeldung?", yes="4", no="A03"),
+    ],
+)
+
+
+table_with_sub_row_result_codes = EbdTable(
+    metadata=EbdTableMetaData(ebd_code="E_9996", chapter="Kapitel", sub_chapter="Unterkapitel", role="NB"),
+    rows=[
+        create_row("1", "Ist die Nachricht vollständig?", yes="2", no="A01"),
+        # like in E_0453: both sub rows continue with the next step, but the "nein" also gives a result code
+        EbdTableRow(
+            step_number="2",
+            description="Ist die Marktlokation angegeben?",
+            sub_rows=[
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=True, subsequent_step_number="3"), result_code=None, note=None
+                ),
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=False, subsequent_step_number="3"),
+                    result_code="A98",
+                    note="Cluster: Ablehnung A98",
+                ),
+            ],
+        ),
+        create_row("3", "Ist der Zählpunkt bekannt?", yes="Ende", no="A02"),
+    ],
+    multi_step_instructions=[
+        MultiStepInstruction(
+            first_step_number_affected="2",
+            instruction_text="Alle festgestellten Antworten sind anzugeben, soweit im Format möglich "
+            "(maximal 8 Antwortcodes)*.",
+        )
+    ],
+)
+"""
+a table in which a sub row gives a result code and continues with a subsequent step (and both sub rows of the step lead
+to the same step)
+"""
@@ -0,0 +1,50 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_table_to_graph, convert_tables_to_graphs
+from rebdhuhn.models import EbdTable
+from rebdhuhn.models.errors import (
+    EbdCrossReferenceNotSupportedError,
+    EndeInWrongColumnError,
+    GraphTooComplexForPlantumlError,
+)
+
+from .e0404 import e_0404
+from .e0462 import table_e0462
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+
+class TestBatchConversion:
+    def test_results_are_returned_in_order_and_errors_are_captured(self):
+        tables = [table_e0003, e_0404, table_e0015, table_e0462, table_e0025, table_e0401]
+        results = convert_tables_to_graphs(tables, convert_to_dot=True, convert_to_plantuml=True, max_workers=2)
+        assert [result.ebd_code for result in results] == [table.metadata.ebd_code for table in tables]
+        assert [result.is_successful() for result in results] == [True, False, True, False, True, False]
+        assert isinstance(results[1].error, EndeInWrongColumnError)
+        assert results[1].graph is None
+        assert isinstance(results[3].error, EbdCrossReferenceNotSupportedError)
+        assert results[3].error.cross_reference == "E_0402_Prüfen,"
+        # the graph and the dot code of E_0401 can be created, only the plantuml conversion fails
+        assert isinstance(results[5].error, GraphTooComplexForPlantumlError)
+        assert results[5].graph is not None
+        assert results[5].dot_code is not None
+        assert results[5].plantuml_code is None
+
+    @pytest.mark.parametrize("table", [pytest.param(table_e0003), pytest.param(table_e0025)])
+    def test_batch_result_equals_single_conversion(self, table: EbdTable):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = convert_tables_to_graphs([table], convert_to_dot=True, executor=executor)
+        assert results[0].is_successful()
+        assert results[0].plantuml_code is None
+        assert results[0].dot_code == convert_graph_to_dot(convert_table_to_graph(table))
+        assert str(results[0].graph.graph) == str(convert_table_to_graph(table).graph)  # type:ignore[union-attr]
+
+    @pytest.mark.parametrize("table", [pytest.param(e_0404), pytest.param(table_e0462)])
+    def test_errors_are_picklable(self, table: EbdTable):
+        with pytest.raises(Exception) as exc_info:
+            _ = convert_table_to_graph(table)
+        unpickled = pickle.loads(pickle.dumps(exc_info.value))
+        assert type(unpickled) is type(exc_info.value)  # pylint:disable=unidiomatic-typecheck
+        assert str(unpickled) == str(exc_info.value)
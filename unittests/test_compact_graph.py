@@ -0,0 +1,134 @@
+import pytest  # type:ignore[import]
+from networkx import DiGraph, immediate_dominators  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_graph_to_plantuml, convert_table_to_graph
+from rebdhuhn.compact_graph import NO_SUCCESSOR, CompactEbdGraph, NodeKind
+from rebdhuhn.graph_utils import get_last_common_ancestors
+from rebdhuhn.graphviz import convert_compact_graph_to_dot
+from rebdhuhn.models import DecisionNode, EbdGraphEdge, EbdTable, OutcomeNode, StartNode, ToNoEdge, ToYesEdge
+from rebdhuhn.models.errors import NotExactlyTwoOutgoingEdgesError
+from rebdhuhn.plantuml import convert_compact_graph_to_plantuml
+
+from .e0459 import table_e0459
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+from .synthetic_tables import table_with_sub_row_result_codes
+
+
+class TestCompactGraph:
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0003),
+            pytest.param(table_e0015),
+            pytest.param(table_e0025),
+            pytest.param(table_e0401),
+            pytest.param(table_e0459),
+            pytest.param(table_with_sub_row_result_codes),
+        ],
+    )
+    def test_round_trip(self, table: EbdTable):
+        graph = convert_table_to_graph(table).graph
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        assert compact_graph.keys == list(graph.nodes)
+        assert list(compact_graph.in_degrees) == [graph.in_degree(key) for key in graph.nodes]
+        round_tripped_graph = compact_graph.to_digraph()
+        assert list(round_tripped_graph.nodes(data="node")) == list(graph.nodes(data="node"))
+        assert list(round_tripped_graph.edges(data=True)) == list(graph.edges(data=True))
+
+    def test_sub_row_successors(self):
+        compact_graph = CompactEbdGraph.from_digraph(convert_table_to_graph(table_with_sub_row_result_codes).graph)
+        step_2, step_3, a98 = (compact_graph.get_index(key) for key in ("2", "3", "A98"))
+        assert compact_graph.sub_row_successors == {
+            (step_2, True): (step_3, NO_SUCCESSOR),
+            (step_2, False): (step_3, a98),
+        }
+        # networkx holds only one edge for both answers
+        assert compact_graph.incomplete_decision_nodes == [step_2]
+        with pytest.raises(NotExactlyTwoOutgoingEdgesError):
+            compact_graph.check_decision_nodes()
+        compact_graph.check_decision_nodes([])
+
+    def test_arrays(self):
+        compact_graph = CompactEbdGraph.from_digraph(convert_table_to_graph(table_e0003).graph)
+        assert compact_graph.keys == ["Start", "1", "A01", "2", "A02", "Ende"]
+        assert list(compact_graph.kinds) == [
+            NodeKind.START,
+            NodeKind.DECISION,
+            NodeKind.OUTCOME,
+            NodeKind.DECISION,
+            NodeKind.OUTCOME,
+            NodeKind.END,
+        ]
+        assert compact_graph.start_successor == compact_graph.get_index("1")
+        assert compact_graph.yes_successors[1] == compact_graph.get_index("2")
+        assert compact_graph.no_successors[1] == compact_graph.get_index("A01")
+        assert compact_graph.yes_successors[2] == NO_SUCCESSOR
+        assert compact_graph.get_out_degree(3) == 2 and compact_graph.get_out_degree(4) == 0
+
+    def test_missing_successor(self):
+        """
+        in E_0459 both sub rows of step 8 point to 'Ende', which results in only one edge
+        """
+        graph = convert_table_to_graph(table_e0459).graph
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        node = compact_graph.get_index("8")
+        assert compact_graph.get_out_degree(node) == 1
+        assert NO_SUCCESSOR in (compact_graph.yes_successors[node], compact_graph.no_successors[node])
+        assert compact_graph.incomplete_decision_nodes == [node]
+        with pytest.raises(NotExactlyTwoOutgoingEdgesError):
+            compact_graph.check_decision_nodes()
+
+    def test_yes_no_index(self):
+        graph = convert_table_to_graph(table_e0015).graph
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        compact_graph.check_decision_nodes()
+        for key, node in graph.nodes(data="node"):
+            index = compact_graph.get_index(key)
+            if compact_graph.get_kind(key) != NodeKind.DECISION:
+                assert not isinstance(node, DecisionNode)
+                continue
+            edges = [edge_data["edge"] for edge_data in graph[key].values()]
+            yes_successor, no_successor = compact_graph.yes_successors[index], compact_graph.no_successors[index]
+            assert compact_graph.keys[yes_successor] == next(
+                edge.target.get_key() for edge in edges if isinstance(edge, ToYesEdge)
+            )
+            assert compact_graph.keys[no_successor] == next(
+                edge.target.get_key() for edge in edges if isinstance(edge, ToNoEdge)
+            )
+
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0003), pytest.param(table_e0015), pytest.param(table_e0025)],
+    )
+    def test_renderers_run_on_compact_graph(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        compact_graph = CompactEbdGraph.from_digraph(ebd_graph.graph)
+        assert convert_compact_graph_to_dot(compact_graph, ebd_graph.metadata) == convert_graph_to_dot(ebd_graph)
+        assert convert_compact_graph_to_plantuml(compact_graph, ebd_graph.metadata) == convert_graph_to_plantuml(
+            ebd_graph
+        )
+
+    def test_last_common_ancestors(self):
+        graph = convert_table_to_graph(table_e0401).graph
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        common_ancestors = get_last_common_ancestors(compact_graph)
+        assert common_ancestors
+        dominators = immediate_dominators(graph, "Start")
+        for common_ancestor, nodes in common_ancestors.items():
+            for node in nodes:
+                assert graph.in_degree(compact_graph.keys[node]) > 1
+                assert dominators[compact_graph.keys[node]] == compact_graph.keys[common_ancestor]
+
+    def test_invalid_graph(self):
+        start_node = StartNode()
+        decision_node = DecisionNode(step_number="1", question="foo")
+        outcome_node = OutcomeNode(result_code="A01", note=None)
+        graph = DiGraph()
+        graph.add_nodes_from([(node.get_key(), {"node": node}) for node in [start_node, decision_node, outcome_node]])
+        graph.add_edge("Start", "1", edge=EbdGraphEdge(source=start_node, target=decision_node, note=None))
+        graph.add_edge("1", "A01", edge=EbdGraphEdge(source=decision_node, target=outcome_node, note=None))
+        with pytest.raises(ValueError):
+            CompactEbdGraph.from_digraph(graph)
+        graph.add_edge("1", "A01", edge=ToYesEdge(source=decision_node, target=outcome_node, note="a note"))
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        assert compact_graph.get_edge(1, 2) == graph["1"]["A01"]["edge"]
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import attrs
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_table_to_graph
+from rebdhuhn.ebd_table_corpus import EbdTableCorpus, StringPool
+from rebdhuhn.models.ebd_table import MultiStepInstruction
+
+from .e0266 import table_e0266
+from .e0462 import table_e0462
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+_TABLES = [table_e0003, table_e0015, table_e0025, table_e0401, table_e0266, table_e0462]
+
+
+class TestEbdTableCorpus:
+    def test_tables_are_materialized_unchanged(self):
+        corpus = EbdTableCorpus(_TABLES)
+        assert len(corpus) == len(_TABLES)
+        assert corpus.ebd_codes == [table.metadata.ebd_code for table in _TABLES]
+        assert list(corpus) == _TABLES
+        assert corpus["E_0025"] == table_e0025
+        assert corpus[-1] == table_e0462
+        assert "E_0462" in corpus and "E_9999" not in corpus
+        assert any(row.use_cases is not None for row in corpus["E_0462"].rows)
+        assert corpus["E_0462"].multi_step_instructions == table_e0462.multi_step_instructions
+        assert convert_graph_to_dot(corpus.get_graph("E_0401")) == convert_graph_to_dot(
+            convert_table_to_graph(table_e0401)
+        )
+        with pytest.raises(KeyError):
+            _ = corpus["E_9999"]
+        with pytest.raises(IndexError):
+            _ = corpus[len(_TABLES)]
+
+    def test_ebd_codes_are_unique(self):
+        corpus = EbdTableCorpus([table_e0003])
+        with pytest.raises(ValueError):
+            corpus.add(table_e0003)
+
+    def test_shared_string_pool(self):
+        string_pool = StringPool()
+        first_corpus = EbdTableCorpus([table_e0003], string_pool=string_pool)
+        number_of_strings = len(string_pool)
+        second_table = attrs.evolve(
+            table_e0003,
+            multi_step_instructions=[
+                MultiStepInstruction(first_step_number_affected="2", instruction_text="Alle Antworten angeben")
+            ],
+        )
+        second_corpus = EbdTableCorpus([second_table], string_pool=string_pool)
+        # only the instruction text is new, the step number "2" is already in the pool
+        assert len(string_pool) == number_of_strings + 1
+        assert first_corpus["E_0003"] == table_e0003
+        assert second_corpus["E_0003"] == second_table
+
+    def test_arrow_and_parquet_export(self, tmp_path: Path):
+        pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+        corpus = EbdTableCorpus(_TABLES)
+        arrow_table = corpus.to_arrow()
+        assert arrow_table.num_rows == len(_TABLES)
+        corpus.to_parquet(tmp_path / "corpus.parquet")
+        exported_tables = pyarrow_parquet.read_table(tmp_path / "corpus.parquet").to_pylist()
+        for exported_table, table in zip(exported_tables, _TABLES):
+            assert exported_table["ebd_code"] == table.metadata.ebd_code
+            assert [row["step_number"] for row in exported_table["rows"]] == [row.step_number for row in table.rows]
+            assert [[sub_row["result_code"] for sub_row in row["sub_rows"]] for row in exported_table["rows"]] == [
+                [sub_row.result_code for sub_row in row.sub_rows] for row in table.rows
+            ]
+            assert [row["use_cases"] or None for row in exported_table["rows"]] == [row.use_cases for row in table.rows]
+            assert len(exported_table["multi_step_instructions"]) == len(table.multi_step_instructions or [])
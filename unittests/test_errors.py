@@ -5,9 +5,9 @@ from rebdhuhn.models import EbdTable
 from rebdhuhn.models.errors import (
     EbdCrossReferenceNotSupportedError,
     EndeInWrongColumnError,
+    GraphContainsLoopError,
     GraphTooComplexForPlantumlError,
     NotExactlyTwoOutgoingEdgesError,
-    PathsNotGreaterThanOneError,
 )
 
 from .e0266 import table_e0266
@@ -32,9 +32,9 @@ class TestErrors:
 
     @pytest.mark.parametrize("table", [pytest.param(table_e0266)])
     def test_loops_in_the_tree_error(self, table: EbdTable):
-        ebd_graph = convert_table_to_graph(table)
-        with pytest.raises(PathsNotGreaterThanOneError):
-            _ = convert_graph_to_plantuml(ebd_graph)
+        with pytest.raises(GraphContainsLoopError) as error:
+            _ = convert_table_to_graph(table)
+        assert error.value.loop == ["300", "440"]
 
     @pytest.mark.parametrize("table", [pytest.param(table_e0454)])
     def test_too_complex_for_plantuml(self, table: EbdTable):
@@ -0,0 +1,365 @@
+import asyncio
+import pickle
+from operator import itemgetter
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import attrs
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.evaluation import evaluate_concurrently, get_evaluator
+from rebdhuhn.models import EbdTable, EbdTableMetaData, EndNode, OutcomeNode
+from rebdhuhn.models.ebd_table import MultiStepInstruction
+from rebdhuhn.models.errors import AnswerMissingError, NotExactlyTwoOutgoingEdgesError
+from rebdhuhn.path_enumeration import iter_decision_paths
+
+from .e0401 import e_0401
+from .e0459 import table_e0459
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+from .synthetic_tables import create_ladder_table, create_row, table_with_sub_row_result_codes
+
+_table_with_collect_all_instruction = EbdTable(
+    metadata=EbdTableMetaData(ebd_code="E_9997", chapter="Kapitel", sub_chapter="Unterkapitel", role="NB"),
+    rows=[
+        create_row("1", "Ist die Nachricht vollständig?", yes="2", no="A01"),
+        create_row("2", "Ist der Zählpunkt bekannt?", yes="3", no="A02"),
+        create_row("3", "Ist der Lieferant bekannt?", yes="4", no="A03"),
+        create_row("4", "Ist der Termin zulässig?", yes="Ende", no="A04"),
+    ],
+    multi_step_instructions=[
+        MultiStepInstruction(
+            first_step_number_affected="2",
+            instruction_text="Alle festgestellten Antworten sind anzugeben, soweit im Format möglich "
+            "(maximal 2 Antwortcodes)*.",
+        )
+    ],
+)
+
+
+class TestEvaluation:
+    def test_evaluate(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        assert evaluator({"1": False}) == OutcomeNode(result_code="A01", note="Fristüberschreitung")
+        assert evaluator.evaluate({"1": True, "2": False}).get_key() == "A02"
+        assert isinstance(evaluator({"1": True, "2": True, "3": False}), EndNode)
+
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0003),
+            pytest.param(table_e0015),
+            pytest.param(table_e0025),
+            pytest.param(table_e0401),
+            pytest.param(e_0401),
+            pytest.param(create_ladder_table(12)),
+        ],
+    )
+    def test_all_paths(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        evaluator = get_evaluator(ebd_graph)
+        assert get_evaluator(ebd_graph) is evaluator
+        # each predicate looks up the answer for its step in the argument
+        evaluate = evaluator.bind_predicates(
+            {step_number: itemgetter(step_number) for step_number in evaluator.step_numbers if step_number is not None}
+        )
+        for path in iter_decision_paths(ebd_graph):
+            answers = dict(path.answers)
+            assert evaluator(answers).get_key() == path.end_key
+            assert evaluate(answers) is evaluator(answers)
+
+    def test_predicates(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        calls: Dict[str, int] = {}
+
+        def is_in_time(message: Dict[str, str]) -> bool:
+            calls["1"] = calls.get("1", 0) + 1
+            return message["received"] <= message["deadline"]
+
+        def is_first_of_month(message: Dict[str, str]) -> bool:
+            calls["2"] = calls.get("2", 0) + 1
+            return message["start"].endswith("-01")
+
+        evaluate = evaluator.bind_predicates({"1": is_in_time, "2": is_first_of_month})
+        message = {"received": "2024-01-05", "deadline": "2024-01-10", "start": "2024-02-01"}
+        assert isinstance(evaluate(message), EndNode)
+        assert evaluate(dict(message, start="2024-02-15")).get_key() == "A02"
+        assert evaluate(dict(message, received="2024-01-11")).get_key() == "A01"
+        assert calls == {"1": 3, "2": 2}  # the second step is not checked if the first one fails
+
+    def test_missing_answer(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        with pytest.raises(AnswerMissingError) as error:
+            evaluator({"1": True})
+        assert error.value.step_number == "2"
+        assert str(pickle.loads(pickle.dumps(error.value))) == str(error.value)
+        assert evaluator({"1": False}).get_key() == "A01"  # answers for steps that are not reached are not needed
+        with pytest.raises(AnswerMissingError):
+            evaluator.bind_predicates({"1": bool})
+
+    def test_incomplete_decision_node(self):
+        with pytest.raises(NotExactlyTwoOutgoingEdgesError):
+            get_evaluator(convert_table_to_graph(table_e0459))
+
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0015),
+            pytest.param(table_e0401),
+            pytest.param(e_0401),
+            pytest.param(create_ladder_table(30)),
+        ],
+    )
+    def test_evaluate_matrix(self, table: EbdTable):
+        numpy = pytest.importorskip("numpy")
+        evaluator = get_evaluator(convert_table_to_graph(table))
+        step_numbers = evaluator.get_step_numbers()
+        answers = numpy.random.default_rng(seed=42).random((1000, len(step_numbers))) < 0.5
+        result_indices = evaluator.evaluate_matrix(answers)
+        assert result_indices.shape == (1000,)
+        for row, result_index in zip(answers, result_indices):
+            assert evaluator.result_nodes[result_index] is evaluator(dict(zip(step_numbers, row)))
+
+    def test_evaluate_matrix_with_given_columns(self):
+        numpy = pytest.importorskip("numpy")
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        answers = numpy.array([[True, True], [False, True], [True, False], [False, False]])  # the columns are '2', '1'
+        result_indices = evaluator.evaluate_matrix(answers, step_numbers=["2", "1"])
+        assert [evaluator.result_nodes[index].get_key() for index in result_indices] == ["Ende", "A02", "A01", "A01"]
+        assert evaluator.evaluate_matrix(numpy.zeros((0, 2), dtype=bool)).shape == (0,)
+        with pytest.raises(AnswerMissingError):
+            evaluator.evaluate_matrix(answers, step_numbers=["2", "3"])
+        with pytest.raises(ValueError):
+            evaluator.evaluate_matrix(answers, step_numbers=["1"])
+
+    def test_async_predicates(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        asked_questions: List[Tuple[str, int]] = []
+        running = 0
+        max_running = 0
+
+        def create_lookup(step_number: str) -> Callable[[int], Awaitable[bool]]:
+            async def lookup(message_id: int) -> bool:
+                nonlocal running, max_running
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.001)
+                running -= 1
+                asked_questions.append((step_number, message_id))
+                return message_id % (2 if step_number == "1" else 3) == 0
+
+            return lookup
+
+        evaluate = evaluator.bind_async_predicates({"1": create_lookup("1"), "2": create_lookup("2")})
+        message_ids = list(range(20))
+        results = asyncio.run(evaluate_concurrently(evaluate, message_ids, max_concurrency=4))
+        assert [result.get_key() for result in results] == [
+            evaluator({"1": message_id % 2 == 0, "2": message_id % 3 == 0}).get_key() for message_id in message_ids
+        ]
+        assert 1 < max_running <= 4
+        # the second question is only asked for the messages that pass the first one
+        assert sorted(message_id for step_number, message_id in asked_questions if step_number == "2") == list(
+            range(0, 20, 2)
+        )
+        with pytest.raises(AnswerMissingError):
+            evaluator.bind_async_predicates({"1": create_lookup("1")})
+        with pytest.raises(ValueError):
+            asyncio.run(evaluate_concurrently(evaluate, message_ids, max_concurrency=0))
+
+    def test_concurrent_evaluation_stops_at_the_first_error(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        taken_arguments: List[int] = []
+        cancelled_arguments: List[int] = []
+
+        async def lookup(message_id: int) -> bool:
+            try:
+                await asyncio.sleep(0.001 if message_id == 3 else 1)
+            except asyncio.CancelledError:
+                cancelled_arguments.append(message_id)
+                raise
+            raise ValueError(f"The service is not available for message {message_id}")
+
+        def generate_message_ids() -> Iterator[int]:
+            for message_id in range(1000):
+                taken_arguments.append(message_id)
+                yield message_id
+
+        evaluate = evaluator.bind_async_predicates({"1": lookup, "2": lookup})
+        with pytest.raises(ValueError, match="message 3"):
+            asyncio.run(evaluate_concurrently(evaluate, generate_message_ids(), max_concurrency=4))
+        # only as many arguments as there are workers are taken and the other evaluations are cancelled
+        assert taken_arguments == [0, 1, 2, 3]
+        assert sorted(cancelled_arguments) == [0, 1, 2]
+
+    @pytest.mark.parametrize(
+        "answers, max_number_of_results, expected_keys",
+        [
+            pytest.param({"1": False}, None, ["A01"], id="before the first affected step"),
+            pytest.param({"1": True, "2": False, "3": False, "4": False}, None, ["A02", "A03"], id="maximum reached"),
+            pytest.param({"1": True, "2": False, "3": False, "4": False}, 8, ["A02", "A03", "A04"], id="all rows"),
+            pytest.param({"1": True, "2": False, "3": True, "4": True}, None, ["A02"], id="end reached"),
+            pytest.param({"1": True, "2": True, "3": True, "4": False}, None, ["A04"], id="last row"),
+        ],
+    )
+    def test_evaluate_all(
+        self, answers: Dict[str, bool], max_number_of_results: Optional[int], expected_keys: List[str]
+    ):
+        evaluator = get_evaluator(convert_table_to_graph(_table_with_collect_all_instruction))
+        assert evaluator.max_number_of_results == 2
+        results = evaluator.evaluate_all(answers, max_number_of_results=max_number_of_results)
+        assert [result.get_key() for result in results] == expected_keys
+
+    @pytest.mark.parametrize(
+        "answers, expected_keys",
+        [
+            pytest.param({"1": True, "2": False, "3": True}, ["A98"], id="sub row result code"),
+            pytest.param({"1": True, "2": False, "3": False}, ["A98", "A02"], id="sub row and outcome"),
+            pytest.param({"1": True, "2": True, "3": True}, ["Ende"], id="nothing collected"),
+            pytest.param({"1": False}, ["A01"], id="outcome before the sub row"),
+        ],
+    )
+    def test_evaluate_all_with_sub_row_result_codes(self, answers: Dict[str, bool], expected_keys: List[str]):
+        evaluator = get_evaluator(convert_table_to_graph(table_with_sub_row_result_codes))
+        assert [result.get_key() for result in evaluator.evaluate_all(answers)] == expected_keys
+
+    def test_sub_row_result_codes_do_not_change_the_path(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_with_sub_row_result_codes))
+        assert evaluator({"1": True, "2": False, "3": True}).get_key() == "Ende"
+        assert evaluator({"1": True, "2": True, "3": False}).get_key() == "A02"
+
+    @pytest.mark.parametrize(
+        "instruction_text",
+        [
+            pytest.param("Alle festgestellten Antworten sind anzugeben, soweit im Format möglich.", id="E_0453"),
+            pytest.param(
+                "Tritt in einer Positionszeile der erste Fehler auf, so sind die weiteren Prüfungen, so dies noch möglich "
+                "ist, auch durchzuführen. Alle im Positionsteil gefundenen Fehler sind, unter Nennung der jeweiligen "
+                "Positionszeile, zu nennen.",
+                id="E_0266",
+            ),
+        ],
+    )
+    def test_collect_all_instructions_are_recognised(self, instruction_text: str):
+        instruction = MultiStepInstruction(first_step_number_affected="2", instruction_text=instruction_text)
+        table = attrs.evolve(_table_with_collect_all_instruction, multi_step_instructions=[instruction])
+        evaluator = get_evaluator(convert_table_to_graph(table))
+        assert [
+            result.get_key() for result in evaluator.evaluate_all({"1": True, "2": False, "3": False, "4": True})
+        ] == [
+            "A02",
+            "A03",
+        ]
+
+    def test_evaluate_all_without_instruction(self):
+        table = attrs.evolve(_table_with_collect_all_instruction, multi_step_instructions=None)
+        evaluator = get_evaluator(convert_table_to_graph(table))
+        answers = {"1": True, "2": False, "3": False, "4": False}
+        assert evaluator.evaluate_all(answers) == [evaluator(answers)]
+        instruction = MultiStepInstruction(
+            first_step_number_affected="7", instruction_text="Alle festgestellten Antworten sind anzugeben"
+        )
+        with pytest.raises(ValueError):
+            get_evaluator(convert_table_to_graph(attrs.evolve(table, multi_step_instructions=[instruction])))
+
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0003),
+            pytest.param(table_e0401),
+            pytest.param(e_0401),
+            pytest.param(create_ladder_table(12)),
+        ],
+    )
+    def test_trace(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        evaluator = get_evaluator(ebd_graph)
+        # the trace is small enough to wrap around several times
+        trace = evaluator.create_trace(capacity=len(evaluator.get_step_numbers()) + 3)
+        assert trace.get_last_result() is None
+        evaluate = evaluator.bind_predicates(
+            {step_number: itemgetter(step_number) for step_number in evaluator.get_step_numbers()}, trace=trace
+        )
+        for path in iter_decision_paths(ebd_graph):
+            answers = dict(path.answers)
+            result = evaluator(answers, trace)
+            assert trace.get_last_path() == list(path.answers)
+            assert trace.get_last_result() is result
+            assert evaluate(answers) is result
+            assert trace.get_last_path() == list(path.answers)
+
+    def test_trace_after_missing_answer(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        trace = evaluator.create_trace()
+        evaluator.evaluate({"1": False}, trace=trace)
+        with pytest.raises(AnswerMissingError):
+            evaluator.evaluate({"1": True}, trace=trace)
+        assert trace.get_last_path() == [("1", False)]
+        assert trace.get_last_result().get_key() == "A01"
+
+    def test_trace_capacity(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        with pytest.raises(ValueError):
+            evaluator.create_trace(capacity=0)
+        trace = evaluator.create_trace(capacity=1)
+        for _ in range(3):
+            assert isinstance(evaluator({"1": True, "2": True}, trace), EndNode)
+            assert trace.get_last_path() == [("1", True), ("2", True)]
+        assert trace.sequence == 3
+
+    def test_trace_entries(self):
+        ebd_graph = convert_table_to_graph(e_0401)
+        evaluator = get_evaluator(ebd_graph)
+        paths = list(iter_decision_paths(ebd_graph))
+        trace = evaluator.create_trace(capacity=10)
+        assert trace.get_entries() == []
+        for path in paths[:4]:
+            evaluator(dict(path.answers), trace)
+        first_batch = trace.get_entries()
+        assert [(entry.sequence, entry.offset) for entry in first_batch] == [(0, 0), (1, 1), (2, 2), (3, 3)]
+        assert [entry.answers for entry in first_batch] == [path.answers for path in paths[:4]]
+        assert [entry.result.get_key() for entry in first_batch] == [path.end_key for path in paths[:4]]
+        # the next batch overflows the trace, so the oldest entries are dropped
+        for path in paths[4:16]:
+            evaluator(dict(path.answers), trace)
+        second_batch = trace.get_entries(first_sequence=trace.sequence - 12)
+        assert [entry.sequence for entry in second_batch] == list(range(6, 16))
+        assert [entry.offset for entry in second_batch] == list(range(10))
+        assert [entry.answers for entry in second_batch] == [path.answers for path in paths[6:16]]
+        assert trace.get_entries(first_sequence=15) == second_batch[-1:]
+
+    def test_trace_of_graph_with_too_many_paths(self):
+        evaluator = get_evaluator(convert_table_to_graph(create_ladder_table(40)))
+        trace = evaluator.create_trace()
+        assert trace.path_tree is None  # the answers are recorded as bits instead
+        answers = {str(step): step % 3 != 0 for step in range(1, 41)}
+        result = evaluator(answers, trace)
+        expected_path: List[Tuple[str, bool]] = []
+        step = 1
+        while step <= 40:
+            expected_path.append((str(step), answers[str(step)]))
+            step += 1 if answers[str(step)] else 2
+        assert trace.get_last_path() == expected_path
+        assert trace.get_last_result() == result
+        bound_evaluator = evaluator.bind_predicates(
+            {str(step): itemgetter(str(step)) for step in range(1, 41)}, trace=trace
+        )
+        assert bound_evaluator(answers) == result
+        entries = trace.get_entries()
+        assert [entry.sequence for entry in entries] == [0, 1]
+        assert all(list(entry.answers) == expected_path and entry.result == result for entry in entries)
+
+    def test_trace_of_another_evaluator(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_e0003))
+        trace = get_evaluator(convert_table_to_graph(table_e0015)).create_trace()
+        with pytest.raises(ValueError, match="another evaluator"):
+            evaluator({"1": True, "2": True}, trace)
+        with pytest.raises(ValueError, match="another evaluator"):
+            evaluator.bind_predicates({"1": bool, "2": bool}, trace=trace)
+        assert trace.sequence == 0
+
+    def test_traced_evaluation_of_merged_edges(self):
+        evaluator = get_evaluator(convert_table_to_graph(table_with_sub_row_result_codes))
+        trace = evaluator.create_trace()
+        evaluator({"1": True, "2": False, "3": False}, trace)
+        assert trace.get_last_path() == [("1", True), ("2", False), ("3", False)]
+        evaluator({"1": True, "2": True, "3": False}, trace)
+        assert trace.get_last_path() == [("1", True), ("2", True), ("3", False)]
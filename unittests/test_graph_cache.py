@@ -0,0 +1,97 @@
+from pathlib import Path
+from unittest import mock
+
+import attrs
+import networkx as nx  # type:ignore[import]
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_table_to_graph
+from rebdhuhn.graph_cache import EbdGraphCache, get_table_hash
+from rebdhuhn.models import EbdTable
+
+from .e0401 import e_0401
+from .e0404 import e_0404
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+from .synthetic_tables import table_with_sub_row_result_codes
+
+
+class TestGraphCache:
+    @pytest.mark.parametrize("table", [pytest.param(table_e0003), pytest.param(table_e0401)])
+    def test_table_hash_is_structural(self, table: EbdTable):
+        copied_table = attrs.evolve(table, rows=[attrs.evolve(row) for row in table.rows])
+        assert copied_table is not table
+        assert get_table_hash(copied_table) == get_table_hash(table)
+        modified_row = attrs.evolve(table.rows[-1], description=table.rows[-1].description + " ")
+        modified_table = attrs.evolve(table, rows=table.rows[:-1] + [modified_row])
+        assert get_table_hash(modified_table) != get_table_hash(table)
+        modified_use_cases = attrs.evolve(table.rows[-1], use_cases=["Einzug"])
+        assert get_table_hash(attrs.evolve(table, rows=table.rows[:-1] + [modified_use_cases])) != get_table_hash(table)
+
+    def test_hits_misses_and_eviction(self):
+        cache = EbdGraphCache(max_size=2)
+        assert cache.get(table_e0003) is None
+        for table in [table_e0003, table_e0003, table_e0015, table_e0003, table_e0025]:
+            _ = cache.convert_table_to_graph(table)
+        assert (cache.hits, cache.misses) == (2, 3)
+        assert len(cache) == 2
+        # E_0015 was the least recently used entry
+        assert cache.get(table_e0015) is None
+        assert cache.get(table_e0003) is not None
+        assert cache.get(table_e0025) is not None
+
+    def test_returned_graphs_cannot_corrupt_the_cache(self):
+        cache = EbdGraphCache()
+        graph = cache.convert_table_to_graph(table_with_sub_row_result_codes)
+        assert nx.is_frozen(graph.graph)
+        with pytest.raises(nx.NetworkXError):
+            graph.graph.remove_node("Ende")
+        graph.graph.nodes["1"]["annotation"] = ["x"]
+        graph.graph.graph["foo"] = 1
+        graph.graph["1"]["2"]["annotation"] = ["y"]
+        graph.metadata.role = "LF"
+        graph.multi_step_instructions.clear()
+        cached_graph = cache.get(table_with_sub_row_result_codes)
+        assert "annotation" not in cached_graph.graph.nodes["1"]
+        assert "foo" not in cached_graph.graph.graph
+        assert "annotation" not in cached_graph.graph["1"]["2"]
+        assert cached_graph.metadata.role == table_with_sub_row_result_codes.metadata.role
+        assert cached_graph.multi_step_instructions == table_with_sub_row_result_codes.multi_step_instructions
+        assert convert_graph_to_dot(cached_graph) == convert_graph_to_dot(
+            convert_table_to_graph(table_with_sub_row_result_codes)
+        )
+
+    def test_returned_graphs_are_copies(self):
+        cache = EbdGraphCache()
+        first_graph = cache.convert_table_to_graph(table_e0025, copy=True)
+        assert not nx.is_frozen(first_graph.graph)
+        first_graph.graph.nodes["1"]["my_annotation"] = True
+        first_graph.graph.remove_node("Ende")
+        second_graph = cache.get(table_e0025, copy=True)
+        assert "my_annotation" not in second_graph.graph.nodes["1"]
+        assert str(second_graph.graph) == str(convert_table_to_graph(table_e0025).graph)
+        assert convert_graph_to_dot(second_graph) == convert_graph_to_dot(convert_table_to_graph(table_e0025))
+
+    def test_hits_do_not_convert(self):
+        cache = EbdGraphCache()
+        with mock.patch("rebdhuhn.graph_cache.convert_table_to_graph", wraps=convert_table_to_graph) as conversion:
+            graphs = [cache.convert_table_to_graph(e_0401) for _ in range(5)]
+        conversion.assert_called_once_with(e_0401)
+        assert (cache.hits, cache.misses) == (4, 1)
+        assert len({id(graph.graph) for graph in graphs}) == 5
+        assert all(str(graph.graph) == str(graphs[0].graph) for graph in graphs)
+
+    def test_disk_tier_survives_new_cache_instances(self, tmp_path: Path):
+        _ = EbdGraphCache(cache_dir=tmp_path).convert_table_to_graph(table_e0401)
+        assert len(list(tmp_path.glob("*.pickle"))) == 1
+        other_cache = EbdGraphCache(cache_dir=tmp_path)
+        graph = other_cache.convert_table_to_graph(table_e0401)
+        assert (other_cache.disk_hits, other_cache.misses) == (1, 0)
+        assert str(graph.graph) == str(convert_table_to_graph(table_e0401).graph)
+
+    def test_errors_are_raised_and_not_cached(self):
+        cache = EbdGraphCache()
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                _ = cache.convert_table_to_graph(e_0404)
+        assert cache.misses == 2
+        assert len(cache) == 0
@@ -0,0 +1,102 @@
+import pickle
+
+import attrs
+import pytest  # type:ignore[import]
+from networkx import DiGraph  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.graph_fingerprint import get_graph_fingerprint
+from rebdhuhn.models import EbdGraph, EbdTable
+from rebdhuhn.models.ebd_table import MultiStepInstruction
+
+from .e0401 import e_0401
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+
+def _reverse_insertion_order(ebd_graph: EbdGraph) -> EbdGraph:
+    """
+    creates a copy of the graph in which the nodes and edges have been added in reversed order
+    """
+    graph = DiGraph()
+    graph.add_nodes_from(reversed(list(ebd_graph.graph.nodes(data=True))))
+    graph.add_edges_from(reversed(list(ebd_graph.graph.edges(data=True))))
+    return EbdGraph(metadata=ebd_graph.metadata, graph=graph, multi_step_instructions=ebd_graph.multi_step_instructions)
+
+
+def _change_sub_row(table: EbdTable, row_index: int, sub_row_index: int, **changes) -> EbdTable:
+    rows = list(table.rows)
+    sub_rows = list(rows[row_index].sub_rows)
+    sub_rows[sub_row_index] = attrs.evolve(sub_rows[sub_row_index], **changes)
+    rows[row_index] = attrs.evolve(rows[row_index], sub_rows=sub_rows)
+    return attrs.evolve(table, rows=rows)
+
+
+def _swap_answers(table: EbdTable, row_index: int) -> EbdTable:
+    rows = list(table.rows)
+    sub_rows = [
+        attrs.evolve(sub_row, check_result=attrs.evolve(sub_row.check_result, result=not sub_row.check_result.result))
+        for sub_row in rows[row_index].sub_rows
+    ]
+    rows[row_index] = attrs.evolve(rows[row_index], sub_rows=sub_rows)
+    return attrs.evolve(table, rows=rows)
+
+
+class TestGraphFingerprint:
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0003), pytest.param(table_e0015), pytest.param(table_e0401), pytest.param(e_0401)],
+    )
+    def test_fingerprint_does_not_depend_on_the_insertion_order(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        reversed_graph = _reverse_insertion_order(ebd_graph)
+        assert list(reversed_graph.graph) != list(ebd_graph.graph)
+        assert get_graph_fingerprint(reversed_graph) == get_graph_fingerprint(ebd_graph)
+        assert get_graph_fingerprint(pickle.loads(pickle.dumps(ebd_graph))) == get_graph_fingerprint(ebd_graph)
+
+    def test_fingerprint_is_stable(self):
+        # this value must only change, if the fingerprint version changes
+        assert (
+            get_graph_fingerprint(convert_table_to_graph(table_e0003))
+            == "77e83bc3117a3f9bb9df8837aff0d4e1e307c5f9a832d08a6c5d0ab08b341bd2"
+        )
+
+    @pytest.mark.parametrize(
+        "changed_table",
+        [
+            pytest.param(
+                attrs.evolve(
+                    table_e0003, rows=[attrs.evolve(table_e0003.rows[0], description="Neu?")] + table_e0003.rows[1:]
+                ),
+                id="question",
+            ),
+            pytest.param(_change_sub_row(table_e0003, 1, 0, note="Ein anderer Hinweis"), id="outcome note"),
+            pytest.param(_change_sub_row(table_e0003, 1, 0, result_code="A03"), id="result code"),
+            pytest.param(
+                attrs.evolve(table_e0003, metadata=attrs.evolve(table_e0003.metadata, role="LF")), id="metadata"
+            ),
+            pytest.param(
+                attrs.evolve(
+                    table_e0003,
+                    multi_step_instructions=[
+                        MultiStepInstruction(first_step_number_affected="1", instruction_text="Je Marktlokation")
+                    ],
+                ),
+                id="multi step instructions",
+            ),
+            pytest.param(_swap_answers(table_e0003, 1), id="yes and no swapped"),
+        ],
+    )
+    def test_changes_change_the_fingerprint(self, changed_table: EbdTable):
+        assert get_graph_fingerprint(convert_table_to_graph(changed_table)) != get_graph_fingerprint(
+            convert_table_to_graph(table_e0003)
+        )
+
+    def test_fingerprints_are_unique(self):
+        tables = [table_e0003, table_e0015, table_e0025, table_e0401, e_0401]
+        assert len({get_graph_fingerprint(convert_table_to_graph(table)) for table in tables}) == len(tables)
+
+    def test_fingerprint_is_cached(self):
+        ebd_graph = convert_table_to_graph(table_e0025)
+        fingerprint = get_graph_fingerprint(ebd_graph)
+        ebd_graph.graph = convert_table_to_graph(table_e0015).graph
+        assert get_graph_fingerprint(ebd_graph) != fingerprint
@@ -0,0 +1,139 @@
+import attrs
+import pytest  # type:ignore[import]
+from networkx import DiGraph  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_table_to_graph
+from rebdhuhn.graph_patching import EbdTableRowChangeSet, patch_graph
+from rebdhuhn.models import EbdCheckResult, EbdTable, EbdTableRow, EbdTableSubRow
+from rebdhuhn.models.errors import GraphContainsLoopError, OutcomeCodeAmbiguousError, SubsequentStepNotFoundError
+
+from .examples import table_e0015, table_e0025
+
+
+def _assert_same_graph(actual: DiGraph, expected: DiGraph) -> None:
+    """
+    compares nodes and edges, but not their order
+    """
+    assert dict(actual.nodes(data="node")) == dict(expected.nodes(data="node"))
+    assert {(u, v): e for u, v, e in actual.edges(data="edge")} == {
+        (u, v): e for u, v, e in expected.edges(data="edge")
+    }
+
+
+def _get_row(table: EbdTable, step_number: str) -> EbdTableRow:
+    return next(row for row in table.rows if row.step_number == step_number)
+
+
+def _replace_rows(table: EbdTable, *rows: EbdTableRow) -> EbdTable:
+    replacements = {row.step_number: row for row in rows}
+    return attrs.evolve(table, rows=[replacements.get(row.step_number, row) for row in table.rows])
+
+
+class TestGraphPatching:
+    def test_modify_row(self):
+        row_4 = _get_row(table_e0025, "4")
+        modified_row_4 = attrs.evolve(
+            row_4,
+            description="Ist das eine neue Frage?",
+            sub_rows=[
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=True, subsequent_step_number=None),
+                    result_code="A99",
+                    note="Neuer Code",
+                ),
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=False, subsequent_step_number="5"),
+                    result_code=None,
+                    note=None,
+                ),
+            ],
+        )
+        ebd_graph = convert_table_to_graph(table_e0025)
+        convert_graph_to_dot(ebd_graph)  # caches the analysis of the graph
+        patch_graph(ebd_graph, EbdTableRowChangeSet(modified_rows=[modified_row_4]))
+        expected = convert_table_to_graph(_replace_rows(table_e0025, modified_row_4))
+        _assert_same_graph(ebd_graph.graph, expected.graph)
+        assert "A02" not in ebd_graph.graph  # the outcome is no longer referenced
+        assert convert_graph_to_dot(ebd_graph) == convert_graph_to_dot(attrs.evolve(ebd_graph))
+
+    def test_add_and_remove_rows(self):
+        row_10 = _get_row(table_e0015, "10")
+        table_without_row_10 = attrs.evolve(
+            table_e0015,
+            rows=[row for row in table_e0015.rows if row.step_number != "10"][:-1]
+            + [
+                attrs.evolve(
+                    _get_row(table_e0015, "9"),
+                    sub_rows=[
+                        EbdTableSubRow(
+                            check_result=EbdCheckResult(result=True, subsequent_step_number="Ende"),
+                            result_code=None,
+                            note=None,
+                        ),
+                        _get_row(table_e0015, "9").sub_rows[0],
+                    ],
+                )
+            ],
+        )
+        ebd_graph = convert_table_to_graph(table_e0015)
+        patch_graph(
+            ebd_graph,
+            EbdTableRowChangeSet(
+                modified_rows=[_get_row(table_without_row_10, "9")], removed_step_numbers=[row_10.step_number]
+            ),
+        )
+        _assert_same_graph(ebd_graph.graph, convert_table_to_graph(table_without_row_10).graph)
+        patch_graph(ebd_graph, EbdTableRowChangeSet(added_rows=[row_10], modified_rows=[_get_row(table_e0015, "9")]))
+        _assert_same_graph(ebd_graph.graph, convert_table_to_graph(table_e0015).graph)
+
+    def test_removing_the_first_step_reconnects_the_start_node(self):
+        table_without_step_1 = attrs.evolve(table_e0015, rows=table_e0015.rows[1:])
+        ebd_graph = convert_table_to_graph(table_e0015)
+        patch_graph(ebd_graph, EbdTableRowChangeSet(removed_step_numbers=["1"]))
+        _assert_same_graph(ebd_graph.graph, convert_table_to_graph(table_without_step_1).graph)
+
+    def test_removing_a_referenced_step_is_not_allowed(self):
+        ebd_graph = convert_table_to_graph(table_e0025)
+        with pytest.raises(SubsequentStepNotFoundError) as exc_info:
+            patch_graph(ebd_graph, EbdTableRowChangeSet(removed_step_numbers=["5"]))
+        assert (exc_info.value.step_number, exc_info.value.subsequent_step_number) == ("2", "5")
+        _assert_same_graph(ebd_graph.graph, convert_table_to_graph(table_e0025).graph)
+
+    def test_ambiguous_outcome_code(self):
+        row_5 = _get_row(table_e0025, "5")
+        ambiguous_row_5 = attrs.evolve(
+            row_5,
+            sub_rows=[attrs.evolve(row_5.sub_rows[0], result_code="A01", note="Anderer Hinweis"), row_5.sub_rows[1]],
+        )
+        ebd_graph = convert_table_to_graph(table_e0025)
+        with pytest.raises(OutcomeCodeAmbiguousError):
+            patch_graph(ebd_graph, EbdTableRowChangeSet(modified_rows=[ambiguous_row_5]))
+        _assert_same_graph(ebd_graph.graph, convert_table_to_graph(table_e0025).graph)
+
+    def test_loop_is_not_allowed(self):
+        row_5 = _get_row(table_e0025, "5")
+        looping_row_5 = attrs.evolve(
+            row_5,
+            sub_rows=[
+                row_5.sub_rows[0],
+                attrs.evolve(row_5.sub_rows[1], check_result=EbdCheckResult(result=False, subsequent_step_number="2")),
+            ],
+        )
+        ebd_graph = convert_table_to_graph(table_e0025)
+        with pytest.raises(GraphContainsLoopError) as exc_info:
+            patch_graph(ebd_graph, EbdTableRowChangeSet(modified_rows=[looping_row_5]))
+        assert exc_info.value.loop == ["5", "2"]
+        _assert_same_graph(ebd_graph.graph, convert_table_to_graph(table_e0025).graph)
+        assert convert_graph_to_dot(ebd_graph) == convert_graph_to_dot(convert_table_to_graph(table_e0025))
+
+    @pytest.mark.parametrize(
+        "change_set",
+        [
+            pytest.param(EbdTableRowChangeSet(added_rows=[_get_row(table_e0025, "3")]), id="add existing"),
+            pytest.param(EbdTableRowChangeSet(removed_step_numbers=["42"]), id="remove unknown"),
+            pytest.param(EbdTableRowChangeSet(removed_step_numbers=["A01"]), id="remove outcome"),
+        ],
+    )
+    def test_invalid_change_sets(self, change_set: EbdTableRowChangeSet):
+        with pytest.raises(ValueError):
+            patch_graph(convert_table_to_graph(table_e0025), change_set)
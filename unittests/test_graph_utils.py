@@ -0,0 +1,142 @@
+from typing import Dict, List
+
+import attrs
+import pytest  # type:ignore[import]
+from networkx import DiGraph, all_simple_paths, immediate_dominators  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_graph_to_plantuml, convert_table_to_graph
+from rebdhuhn.compact_graph import CompactEbdGraph
+from rebdhuhn.graph_fingerprint import get_graph_fingerprint
+from rebdhuhn.graph_utils import (
+    count_paths,
+    get_cached_last_common_ancestors,
+    get_compact_graph,
+    get_last_common_ancestors,
+    get_number_of_paths,
+    get_number_of_paths_per_outcome,
+)
+from rebdhuhn.models import EbdTable
+from rebdhuhn.models.errors import PathsNotGreaterThanOneError
+
+from .e0401 import e_0401
+from .e0454 import table_e0454
+from .e0459 import table_e0459
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+from .synthetic_tables import create_digraph_with_loops, create_ladder_table
+
+
+def _get_last_common_ancestors_by_enumerating_paths(graph: DiGraph) -> Dict[str, List[str]]:
+    """
+    the reference implementation: the last node of a path that is part of all paths from the start to the node
+    """
+    result: Dict[str, List[str]] = {}
+    for node in graph:
+        if graph.in_degree(node) <= 1:
+            continue
+        paths = list(all_simple_paths(graph, source="Start", target=node))
+        reference_path = paths.pop()[:-1]
+        common_ancestor = next(key for key in reversed(reference_path) if all(key in path for path in paths))
+        result.setdefault(common_ancestor, []).append(node)
+    return result
+
+
+class TestGraphUtils:
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0015),
+            pytest.param(table_e0025),
+            pytest.param(table_e0401),
+            pytest.param(e_0401),
+            pytest.param(table_e0454),
+            pytest.param(table_e0459),
+            pytest.param(create_ladder_table(10)),
+        ],
+    )
+    def test_same_result_as_path_enumeration(self, table: EbdTable):
+        graph = convert_table_to_graph(table).graph
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        common_ancestors = {
+            compact_graph.keys[common_ancestor]: [compact_graph.keys[node] for node in nodes]
+            for common_ancestor, nodes in get_last_common_ancestors(compact_graph).items()
+        }
+        assert common_ancestors == _get_last_common_ancestors_by_enumerating_paths(graph)
+
+    def test_large_table(self):
+        graph = convert_table_to_graph(create_ladder_table(200)).graph
+        compact_graph = CompactEbdGraph.from_digraph(graph)
+        common_ancestors = get_last_common_ancestors(compact_graph)
+        dominators = immediate_dominators(graph, "Start")
+        assert sum(len(nodes) for nodes in common_ancestors.values()) == 198  # the steps 3 to 200
+        for common_ancestor, nodes in common_ancestors.items():
+            for node in nodes:
+                assert dominators[compact_graph.keys[node]] == compact_graph.keys[common_ancestor]
+
+    def test_loops(self):
+        compact_graph = CompactEbdGraph.from_digraph(create_digraph_with_loops())
+        with pytest.raises(PathsNotGreaterThanOneError) as error:
+            get_last_common_ancestors(compact_graph)
+        assert (error.value.node_key, error.value.number_of_paths) == ("300", 1)
+        with pytest.raises(ValueError):
+            count_paths(compact_graph)
+
+    def test_analysis_is_cached(self, monkeypatch):
+        calls: List[CompactEbdGraph] = []
+
+        def _counting_get_last_common_ancestors(graph: CompactEbdGraph) -> Dict[int, List[int]]:
+            calls.append(graph)
+            return get_last_common_ancestors(graph)
+
+        monkeypatch.setattr("rebdhuhn.graph_utils.get_last_common_ancestors", _counting_get_last_common_ancestors)
+        ebd_graph = convert_table_to_graph(table_e0025)
+        dot_code = convert_graph_to_dot(ebd_graph)
+        plantuml_code = convert_graph_to_plantuml(ebd_graph)
+        assert convert_graph_to_dot(ebd_graph) == dot_code
+        assert convert_graph_to_plantuml(ebd_graph) == plantuml_code
+        assert len(calls) == 1
+        assert get_compact_graph(ebd_graph) is calls[0]
+        ebd_graph.graph = convert_table_to_graph(table_e0401).graph  # replacing the graph invalidates the cache
+        assert get_cached_last_common_ancestors(ebd_graph) == get_last_common_ancestors(get_compact_graph(ebd_graph))
+        assert len(calls) == 2
+        ebd_graph.invalidate_caches()
+        _ = get_cached_last_common_ancestors(ebd_graph)
+        assert len(calls) == 3
+
+    def test_changes_in_place_require_invalidation(self):
+        ebd_graph = convert_table_to_graph(table_e0003)
+        dot_code = convert_graph_to_dot(ebd_graph)
+        fingerprint = get_graph_fingerprint(ebd_graph)
+        node = ebd_graph.graph.nodes["A01"]["node"]
+        ebd_graph.graph.nodes["A01"]["node"] = attrs.evolve(node, note="CHANGED")
+        # all consumers keep using the same (cached) data until the caches are invalidated
+        assert convert_graph_to_dot(ebd_graph) == dot_code
+        assert get_graph_fingerprint(ebd_graph) == fingerprint
+        ebd_graph.invalidate_caches()
+        assert convert_graph_to_dot(ebd_graph) != dot_code
+        assert "CHANGED" in convert_graph_to_plantuml(ebd_graph)
+        assert get_graph_fingerprint(ebd_graph) != fingerprint
+        compact_graph = get_compact_graph(ebd_graph)
+        ebd_graph.graph.remove_node("A02")
+        assert get_compact_graph(ebd_graph) is not compact_graph
+        assert "A02" not in get_compact_graph(ebd_graph)
+
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0015), pytest.param(table_e0401), pytest.param(e_0401), pytest.param(table_e0459)],
+    )
+    def test_number_of_paths(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        graph = ebd_graph.graph
+        number_of_paths = get_number_of_paths(ebd_graph)
+        for node in graph:
+            expected = 1 if node == "Start" else len(list(all_simple_paths(graph, source="Start", target=node)))
+            assert number_of_paths[node] == expected
+        number_of_paths_per_outcome = get_number_of_paths_per_outcome(ebd_graph)
+        assert set(number_of_paths_per_outcome) == set(ebd_graph.get_outcome_codes())
+        assert all(number_of_paths_per_outcome[code] == number_of_paths[code] for code in number_of_paths_per_outcome)
+
+    def test_number_of_paths_of_large_table(self):
+        number_of_paths = get_number_of_paths(convert_table_to_graph(create_ladder_table(200)))
+        # the number of paths to the steps are the fibonacci numbers
+        assert [number_of_paths[str(step)] for step in range(1, 7)] == [1, 1, 2, 3, 5, 8]
+        assert number_of_paths["200"] == number_of_paths["199"] + number_of_paths["198"] > 2**128
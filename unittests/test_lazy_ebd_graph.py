@@ -0,0 +1,53 @@
+import copy
+import pickle
+
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_table_to_graph
+from rebdhuhn.models import EbdGraph, EbdTable
+from rebdhuhn.models.errors import EndeInWrongColumnError
+
+from .e0404 import e_0404
+from .e0462 import table_e0462
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+
+class TestLazyEbdGraph:
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0003), pytest.param(table_e0015), pytest.param(table_e0025), pytest.param(table_e0401)],
+    )
+    def test_lazy_graph_is_built_on_first_access(self, table: EbdTable):
+        lazy_graph = convert_table_to_graph(table, lazy=True)
+        eager_graph = convert_table_to_graph(table)
+        assert not lazy_graph.is_graph_built()
+        assert lazy_graph.ebd_code == table.metadata.ebd_code
+        assert lazy_graph.metadata == eager_graph.metadata
+        assert lazy_graph.get_number_of_nodes() == eager_graph.get_number_of_nodes()
+        assert lazy_graph.get_outcome_codes() == eager_graph.get_outcome_codes()
+        assert not lazy_graph.is_graph_built()
+        assert convert_graph_to_dot(lazy_graph) == convert_graph_to_dot(eager_graph)
+        assert lazy_graph.is_graph_built()
+        assert lazy_graph.get_number_of_nodes() == lazy_graph.graph.number_of_nodes()
+
+    def test_errors_are_deferred(self):
+        lazy_graph = convert_table_to_graph(e_0404, lazy=True)
+        assert lazy_graph.ebd_code == "E_0404"
+        with pytest.raises(EndeInWrongColumnError):
+            _ = lazy_graph.graph
+
+    def test_metadata_of_unconvertable_table(self):
+        lazy_graph = convert_table_to_graph(table_e0462, lazy=True)
+        assert lazy_graph.get_number_of_nodes() > 1
+        assert "A01" in lazy_graph.get_outcome_codes()
+
+    def test_lazy_graph_can_be_copied_and_pickled(self):
+        lazy_graph = convert_table_to_graph(table_e0025, lazy=True)
+        for copied_graph in [copy.deepcopy(lazy_graph), pickle.loads(pickle.dumps(lazy_graph))]:
+            assert not copied_graph.is_graph_built()
+            assert str(copied_graph.graph) == str(convert_table_to_graph(table_e0025).graph)
+        assert not lazy_graph.is_graph_built()
+
+    def test_either_graph_or_factory_is_required(self):
+        with pytest.raises(ValueError):
+            _ = EbdGraph(metadata=convert_table_to_graph(table_e0003).metadata)
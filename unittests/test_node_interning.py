@@ -0,0 +1,53 @@
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_table_to_graph
+from rebdhuhn.graph_conversion import get_all_edges, get_all_nodes
+from rebdhuhn.models import DecisionNode, EbdTable, OutcomeNode
+from rebdhuhn.node_interning import NodeInterner
+
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+
+class TestNodeInterning:
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0003), pytest.param(table_e0015), pytest.param(table_e0025), pytest.param(table_e0401)],
+    )
+    def test_interned_conversion_is_equal(self, table: EbdTable):
+        node_interner = NodeInterner()
+        assert get_all_nodes(table, node_interner) == get_all_nodes(table)
+        assert get_all_edges(table, node_interner) == get_all_edges(table)
+        assert convert_graph_to_dot(convert_table_to_graph(table, node_interner)) == convert_graph_to_dot(
+            convert_table_to_graph(table)
+        )
+
+    def test_nodes_are_shared_between_graphs(self):
+        node_interner = NodeInterner()
+        first_graph = convert_table_to_graph(table_e0003, node_interner)
+        assert node_interner.hits == 0
+        second_graph = convert_table_to_graph(table_e0003, node_interner)
+        for key in first_graph.graph.nodes:
+            assert first_graph.graph.nodes[key]["node"] is second_graph.graph.nodes[key]["node"]
+        assert node_interner.hit_rate == 0.5
+
+    def test_labels_are_shared(self):
+        node_interner = NodeInterner()
+        question = "".join(["Ist das ", "eine Frage?"])
+        other_question = "".join(["Ist das eine ", "Frage?"])
+        assert question is not other_question
+        first_node = node_interner.get_decision_node("1", question)
+        second_node = node_interner.get_decision_node("2", other_question)
+        assert first_node.question is second_node.question
+        assert node_interner.get_outcome_node("A01", None) == OutcomeNode(result_code="A01", note=None)
+
+    def test_table_is_bounded(self):
+        node_interner = NodeInterner(max_size=2)
+        first_node = node_interner.get_decision_node("1", "foo")
+        _ = node_interner.get_decision_node("2", "bar")
+        _ = node_interner.get_decision_node("3", "baz")
+        assert len(node_interner) == 2
+        assert node_interner.get_decision_node("1", "foo") is not first_node
+        assert node_interner.get_decision_node("1", "foo") == DecisionNode(step_number="1", question="foo")
+        assert (node_interner.hits, node_interner.misses) == (1, 4)
+        node_interner.clear()
+        assert len(node_interner) == 0 and node_interner.hit_rate == 0
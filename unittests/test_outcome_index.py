@@ -0,0 +1,75 @@
+import pytest  # type:ignore[import]
+from networkx import descendants  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.ebd_table_corpus import EbdTableCorpus
+from rebdhuhn.models import EbdTable, ToYesEdge
+from rebdhuhn.outcome_index import OutcomeCondition, get_outcome_conditions_by_ebd_code, get_outcome_index
+
+from .e0401 import e_0401
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+from .synthetic_tables import create_ladder_table
+
+
+class TestOutcomeIndex:
+    def test_conditions(self):
+        outcome_index = get_outcome_index(convert_table_to_graph(table_e0003))
+        assert outcome_index.result_codes == ["A01", "A02"]
+        assert outcome_index.get_conditions("A02") == [
+            OutcomeCondition(
+                step_number="1",
+                question="Erfolgt der Eingang der Bestellung fristgerecht?",
+                answer=True,
+                is_final=False,
+            ),
+            OutcomeCondition(
+                step_number="2",
+                question="Erfolgt die Bestellung zum Monatsersten 00:00 Uhr?",
+                answer=False,
+                is_final=True,
+            ),
+        ]
+        assert [
+            (condition.step_number, condition.answer) for condition in outcome_index.get_final_conditions("A01")
+        ] == [("1", False)]
+        assert "A03" not in outcome_index
+        with pytest.raises(KeyError):
+            outcome_index.get_conditions("A03")
+
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0015),
+            pytest.param(table_e0401),
+            pytest.param(e_0401),
+            pytest.param(create_ladder_table(30)),
+        ],
+    )
+    def test_same_result_as_networkx(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        graph = ebd_graph.graph
+        outcome_index = get_outcome_index(ebd_graph)
+        assert get_outcome_index(ebd_graph) is outcome_index
+        assert set(outcome_index.result_codes) == set(ebd_graph.get_outcome_codes())
+        for result_code in outcome_index.result_codes:
+            expected = {
+                (source, isinstance(edge, ToYesEdge), target == result_code)
+                for source, target, edge in graph.edges(data="edge")
+                if source != "Start" and (target == result_code or result_code in descendants(graph, target))
+            }
+            conditions = outcome_index.get_conditions(result_code)
+            assert len(conditions) == len(expected)
+            assert {
+                (condition.step_number, condition.answer, condition.is_final) for condition in conditions
+            } == expected
+
+    def test_corpus(self):
+        corpus = EbdTableCorpus([table_e0003, table_e0015, table_e0025])
+        conditions = get_outcome_conditions_by_ebd_code(
+            (corpus.get_graph(ebd_code) for ebd_code in corpus.ebd_codes), "A02"
+        )
+        assert list(conditions) == ["E_0003", "E_0015", "E_0025"]
+        assert conditions["E_0003"] == get_outcome_index(convert_table_to_graph(table_e0003)).get_conditions("A02")
+        assert not get_outcome_conditions_by_ebd_code(
+            (corpus.get_graph(ebd_code) for ebd_code in corpus.ebd_codes), "A99"
+        )
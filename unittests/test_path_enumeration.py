@@ -0,0 +1,57 @@
+from itertools import islice
+
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.graph_utils import get_number_of_paths
+from rebdhuhn.models import EbdTable
+from rebdhuhn.models.errors import PathEnumerationBudgetExceededError
+from rebdhuhn.path_enumeration import DecisionPath, PathEnumerationBudget, iter_decision_paths
+
+from .e0401 import e_0401
+from .e0459 import table_e0459
+from .examples import table_e0003, table_e0015, table_e0401
+from .synthetic_tables import create_ladder_table
+
+
+class TestPathEnumeration:
+    def test_decision_paths(self):
+        assert list(iter_decision_paths(convert_table_to_graph(table_e0003))) == [
+            DecisionPath(answers=(("1", True), ("2", True)), end_key="Ende"),
+            DecisionPath(answers=(("1", True), ("2", False)), end_key="A02"),
+            DecisionPath(answers=(("1", False),), end_key="A01"),
+        ]
+
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0015), pytest.param(table_e0401), pytest.param(e_0401), pytest.param(table_e0459)],
+    )
+    def test_number_of_decision_paths(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        number_of_paths = get_number_of_paths(ebd_graph)
+        expected = sum(
+            number_of_paths[key] for key in ebd_graph.get_outcome_codes() + ["Ende"] if key in number_of_paths
+        )
+        assert sum(1 for _ in iter_decision_paths(ebd_graph)) == expected
+
+    def test_paths_are_streamed(self):
+        ebd_graph = convert_table_to_graph(create_ladder_table(200))  # has more than 2**128 paths
+        first_paths = list(islice(iter_decision_paths(ebd_graph), 3))
+        assert len(first_paths) == 3
+        assert all(path.answers[:-1] == first_paths[0].answers[:-1] for path in first_paths[:2])
+
+    @pytest.mark.parametrize(
+        "budget, limit_name",
+        [
+            pytest.param(PathEnumerationBudget(max_number_of_paths=100), "max_number_of_paths", id="number of paths"),
+            pytest.param(PathEnumerationBudget(max_depth=50), "max_depth", id="depth"),
+            pytest.param(PathEnumerationBudget(max_seconds=0.05), "max_seconds", id="time"),
+        ],
+    )
+    def test_budget(self, budget: PathEnumerationBudget, limit_name: str):
+        ebd_graph = convert_table_to_graph(create_ladder_table(200))
+        paths = iter_decision_paths(ebd_graph, budget)
+        with pytest.raises(PathEnumerationBudgetExceededError) as error:
+            for _ in paths:
+                pass
+        assert error.value.limit_name == limit_name
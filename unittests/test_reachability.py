@@ -0,0 +1,67 @@
+import attrs
+import pytest  # type:ignore[import]
+from networkx import ancestors, descendants  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.compact_graph import CompactEbdGraph
+from rebdhuhn.models import EbdCheckResult, EbdTable, EbdTableRow, EbdTableSubRow
+from rebdhuhn.reachability import ReachabilityIndex, get_reachability_index
+
+from .e0401 import e_0401
+from .examples import table_e0003, table_e0015, table_e0401
+from .synthetic_tables import create_digraph_with_loops, create_ladder_table
+
+
+class TestReachability:
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0015),
+            pytest.param(table_e0401),
+            pytest.param(e_0401),
+            pytest.param(create_ladder_table(30)),
+        ],
+    )
+    def test_same_result_as_networkx(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        graph = ebd_graph.graph
+        index = get_reachability_index(ebd_graph)
+        assert get_reachability_index(ebd_graph) is index
+        order = {key: position for position, key in enumerate(index.get_topological_order())}
+        assert all(order[source] < order[target] for source, target in graph.edges)
+        for key in graph:
+            assert set(index.get_descendants(key)) == descendants(graph, key)
+            assert set(index.get_ancestors(key)) == ancestors(graph, key)
+        assert not index.get_unreachable_nodes()
+
+    def test_queries(self):
+        index = get_reachability_index(convert_table_to_graph(table_e0003))
+        assert index.leads_to("2", "A02")
+        assert not index.leads_to("2", "A01")
+        assert index.is_descendant("Ende", "Start")
+        assert index.get_reachable_outcomes("1") == ["A01", "A02"]
+        assert index.get_ancestors("A02") == ["Start", "1", "2"]
+
+    def test_dead_steps(self):
+        dead_row = EbdTableRow(
+            step_number="3",
+            description="Wird dieser Schritt je erreicht?",
+            sub_rows=[
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=True, subsequent_step_number="Ende"),
+                    result_code=None,
+                    note=None,
+                ),
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=False, subsequent_step_number=None),
+                    result_code="A03",
+                    note=None,
+                ),
+            ],
+        )
+        table = attrs.evolve(table_e0003, rows=table_e0003.rows + [dead_row])
+        assert get_reachability_index(convert_table_to_graph(table)).get_unreachable_nodes() == ["3", "A03"]
+
+    def test_loops(self):
+        with pytest.raises(ValueError):
+            ReachabilityIndex(CompactEbdGraph.from_digraph(create_digraph_with_loops()))
@@ -0,0 +1,50 @@
+import attrs
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_graph_to_dot, convert_graph_to_plantuml, convert_table_to_graph
+from rebdhuhn.compact_graph import CompactEbdGraph
+from rebdhuhn.models import EbdTable
+from rebdhuhn.subgraph_sharing import get_identical_subgraphs, get_structural_ids, share_identical_subgraphs
+
+from .examples import table_e0003, table_e0015, table_e0401
+from .synthetic_tables import create_row, table_with_identical_tails
+
+
+class TestSubgraphSharing:
+    def test_identical_subgraphs(self):
+        ebd_graph = convert_table_to_graph(table_with_identical_tails)
+        assert get_identical_subgraphs(ebd_graph) == [["2", "4"], ["3", "5"]]
+        shared_graph = share_identical_subgraphs(ebd_graph)
+        assert share_identical_subgraphs(ebd_graph) is shared_graph
+        assert list(shared_graph.graph) == ["Start", "1", "2", "A01", "3", "Ende", "A02", "6", "A03"]
+        assert list(shared_graph.graph.successors("6")) == ["2", "A03"]
+        assert shared_graph.graph.in_degree("2") == 2
+        assert shared_graph.graph.nodes["2"]["node"] is ebd_graph.graph.nodes["2"]["node"]
+        for _, target, edge in shared_graph.graph.edges(data="edge"):
+            assert edge.target is shared_graph.graph.nodes[target]["node"]
+
+    def test_yes_and_no_edge_are_kept_apart(self):
+        rows = [create_row("1", "Ist es eine Anmeldung?", yes="2", no="4")] + table_with_identical_tails.rows[1:5]
+        ebd_graph = convert_table_to_graph(attrs.evolve(table_with_identical_tails, rows=rows))
+        assert get_identical_subgraphs(ebd_graph) == [["2", "4"], ["3", "5"]]
+        shared_graph = share_identical_subgraphs(ebd_graph).graph
+        # both answers of step 1 lead to identical subgraphs, which must not collapse into a single edge
+        assert list(shared_graph.successors("1")) == ["2", "4"]
+        assert list(shared_graph.successors("4")) == ["3", "A01"]
+        assert "5" not in shared_graph
+
+    @pytest.mark.parametrize("table", [pytest.param(table_e0003), pytest.param(table_e0015), pytest.param(table_e0401)])
+    def test_graphs_without_identical_subgraphs_are_unchanged(self, table: EbdTable):
+        ebd_graph = convert_table_to_graph(table)
+        structural_ids = get_structural_ids(CompactEbdGraph.from_digraph(ebd_graph.graph))
+        assert len(set(structural_ids)) == len(structural_ids)
+        assert not get_identical_subgraphs(ebd_graph)
+        assert convert_graph_to_dot(ebd_graph, share_subgraphs=True) == convert_graph_to_dot(ebd_graph)
+
+    def test_shared_subgraphs_are_rendered_once(self):
+        ebd_graph = convert_table_to_graph(table_with_identical_tails)
+        dot_code = convert_graph_to_dot(ebd_graph, share_subgraphs=True)
+        assert '"4"' not in dot_code and '"5"' not in dot_code
+        assert '"6" -> "2" [label="Ja"]' in dot_code
+        assert convert_graph_to_dot(ebd_graph) != dot_code
+        assert "Ist der Zählpunkt bekannt?" in convert_graph_to_plantuml(ebd_graph, share_subgraphs=True)
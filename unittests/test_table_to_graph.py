@@ -7,7 +7,7 @@ from lxml import etree  # type:ignore[import]
 from networkx import DiGraph  # type:ignore[import]
 
 from rebdhuhn import convert_graph_to_plantuml, convert_plantuml_to_svg_kroki, convert_table_to_graph
-from rebdhuhn.graph_conversion import get_all_edges, get_all_nodes
+from rebdhuhn.graph_conversion import get_all_edges, get_all_nodes, get_all_nodes_and_edges
 from rebdhuhn.graphviz import convert_dot_to_svg_kroki, convert_graph_to_dot
 from rebdhuhn.kroki import Kroki
 from rebdhuhn.models import EbdGraph, EbdGraphMetaData
@@ -126,6 +126,22 @@ class TestEbdTableModels:
         actual = get_all_edges(table)
         assert actual == expected_result
 
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0003),
+            pytest.param(table_e0015),
+            pytest.param(table_e0025),
+            pytest.param(table_e0401),
+        ],
+    )
+    def test_get_all_nodes_and_edges(self, table: EbdTable):
+        nodes, edges = get_all_nodes_and_edges(table)
+        expected_nodes = list({node.get_key(): node for node in get_all_nodes(table)}.values())
+        assert nodes == expected_nodes
+        assert edges == get_all_edges(table)
+        assert len({node.get_key() for node in nodes}) == len(nodes)
+
     @pytest.mark.parametrize(
         "table,expected_description",
         [
@@ -0,0 +1,105 @@
+import attrs
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.models import EbdCheckResult, EbdTable, EbdTableRow, EbdTableSubRow
+from rebdhuhn.models.errors import (
+    EbdCrossReferenceNotSupportedError,
+    EndeInWrongColumnError,
+    GraphContainsLoopError,
+    OutcomeCodeAmbiguousError,
+    OutcomeNodeCreationError,
+    SubsequentStepNotFoundError,
+)
+from rebdhuhn.table_validation import get_conversion_errors
+
+from .e0266 import table_e0266
+from .e0404 import e_0404
+from .e0462 import table_e0462
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+_broken_table = attrs.evolve(
+    table_e0003,
+    rows=[
+        table_e0003.rows[0],
+        EbdTableRow(
+            step_number="2",
+            description="Erfolgt die Bestellung zum Monatsersten 00:00 Uhr?",
+            sub_rows=[
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=False, subsequent_step_number=None),
+                    result_code="A01",
+                    note="Ein anderer Hinweis",
+                ),
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=True, subsequent_step_number="7"),
+                    result_code=None,
+                    note=None,
+                ),
+            ],
+        ),
+        EbdTableRow(
+            step_number="3",
+            description="Gibt es ein Ergebnis?",
+            sub_rows=[
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=True, subsequent_step_number=None),
+                    result_code=None,
+                    note=None,
+                ),
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=False, subsequent_step_number=None),
+                    result_code=None,
+                    note=None,
+                ),
+            ],
+        ),
+    ],
+)
+
+
+class TestTableValidation:
+    @pytest.mark.parametrize(
+        "table",
+        [pytest.param(table_e0003), pytest.param(table_e0015), pytest.param(table_e0025), pytest.param(table_e0401)],
+    )
+    def test_valid_table(self, table: EbdTable):
+        assert get_conversion_errors(table) == []
+
+    @pytest.mark.parametrize(
+        "table, expected_error_type",
+        [
+            pytest.param(e_0404, EndeInWrongColumnError),
+            pytest.param(table_e0462, EbdCrossReferenceNotSupportedError),
+            pytest.param(table_e0266, GraphContainsLoopError),
+        ],
+    )
+    def test_same_error_as_conversion(self, table: EbdTable, expected_error_type: type):
+        errors = get_conversion_errors(table)
+        assert any(isinstance(error, expected_error_type) for _, error in errors)
+        with pytest.raises(expected_error_type):
+            convert_table_to_graph(table)
+
+    def test_all_errors_are_reported(self):
+        errors = get_conversion_errors([table_e0003, _broken_table])
+        assert [(location, type(error)) for location, error in errors] == [
+            ("E_0003.rows[1].sub_rows[0]", OutcomeCodeAmbiguousError),
+            ("E_0003.rows[1].sub_rows[1].check_result.subsequent_step_number", SubsequentStepNotFoundError),
+            ("E_0003.rows[2].sub_rows[0]", OutcomeNodeCreationError),
+            ("E_0003.rows[2].sub_rows[1]", OutcomeNodeCreationError),
+        ]
+
+    def test_loop_is_reported(self):
+        errors = get_conversion_errors(table_e0462)  # step 8 references the earlier step 4
+        loop_errors = [(location, error) for location, error in errors if isinstance(error, GraphContainsLoopError)]
+        assert [(location, error.loop) for location, error in loop_errors] == [
+            ("E_0462.rows[7].sub_rows[1].check_result.subsequent_step_number", ["4", "6", "7", "8"])
+        ]
+
+    def test_missing_subsequent_step_in_conversion(self):
+        table = attrs.evolve(table_e0003, rows=[table_e0003.rows[0]])  # the first row references step '2'
+        assert [location for location, _ in get_conversion_errors(table)] == [
+            "E_0003.rows[0].sub_rows[1].check_result.subsequent_step_number"
+        ]
+        with pytest.raises(SubsequentStepNotFoundError):
+            convert_table_to_graph(table)
@@ -0,0 +1,74 @@
+import cattrs
+import pytest  # type:ignore[import]
+
+from rebdhuhn import convert_table_to_graph
+from rebdhuhn.models import (
+    DecisionNode,
+    EbdCheckResult,
+    EbdTable,
+    EbdTableRow,
+    EbdTableSubRow,
+    OutcomeNode,
+    create_ebd_table_trusted,
+    create_trusted,
+    get_validation_errors,
+)
+
+from .e0459 import table_e0459
+from .examples import table_e0003, table_e0015, table_e0025, table_e0401
+
+
+class TestTrustedModels:
+    @pytest.mark.parametrize(
+        "table",
+        [
+            pytest.param(table_e0003),
+            pytest.param(table_e0015),
+            pytest.param(table_e0025),
+            pytest.param(table_e0401),
+            pytest.param(table_e0459),
+        ],
+    )
+    def test_create_ebd_table_trusted(self, table: EbdTable):
+        trusted_table = create_ebd_table_trusted(cattrs.unstructure(table))
+        assert trusted_table == table
+        assert get_validation_errors(trusted_table) == []
+        assert str(convert_table_to_graph(trusted_table).graph) == str(convert_table_to_graph(table).graph)
+
+    def test_create_trusted_skips_validators(self):
+        decision_node = create_trusted(DecisionNode, step_number="not a step number", question="Ist das so?")
+        assert decision_node.step_number == "not a step number"
+        assert hash(decision_node) == hash(
+            create_trusted(DecisionNode, step_number="not a step number", question="Ist das so?")
+        )
+        errors = get_validation_errors([decision_node, OutcomeNode(result_code="A01", note=None)])
+        assert [location for location, _ in errors] == ["[0].step_number"]
+
+    def test_create_trusted_uses_defaults(self):
+        row = create_trusted(
+            EbdTableRow,
+            step_number="1",
+            description="foo",
+            sub_rows=[
+                EbdTableSubRow(
+                    check_result=EbdCheckResult(result=True, subsequent_step_number="2"), result_code=None, note=None
+                ),
+            ],
+        )
+        assert row.use_cases is None
+        with pytest.raises(TypeError):
+            _ = create_trusted(DecisionNode, step_number="1")
+        with pytest.raises(TypeError):
+            _ = create_trusted(DecisionNode, step_number="1", question="foo", foo="bar")
+
+    def test_get_validation_errors_reports_all_errors_with_location(self):
+        table_as_dict = cattrs.unstructure(table_e0003)
+        table_as_dict["rows"][0]["sub_rows"][0]["result_code"] = "invalid"
+        table_as_dict["rows"][1]["sub_rows"][1]["check_result"]["result"] = False  # now there is no True sub row
+        table_as_dict["rows"][1]["step_number"] = "zwei"
+        errors = get_validation_errors([create_ebd_table_trusted(table_as_dict)])
+        assert [location for location, _ in errors] == [
+            "E_0003.rows[0].sub_rows[0].result_code",
+            "E_0003.rows[1].step_number",
+            "E_0003.rows[1].sub_rows",
+        ]